@@ -28,6 +28,25 @@ class AIService:
         """
         return ComparisonService.compare_images(image1_path, image2_path, use_mock)
 
+    @staticmethod
+    def compare_sets(
+        borrow_paths: list[str],
+        return_paths: list[str],
+        use_mock: bool = False
+    ) -> dict:
+        """
+        对比借出照片组和归还照片组（并行打分 + 最优配对 + 聚合）
+
+        Args:
+            borrow_paths: 借出照片路径列表
+            return_paths: 归还照片路径列表
+            use_mock: 是否使用 mock 结果
+
+        Returns:
+            对比结果字典
+        """
+        return ComparisonService.compare_photo_sets(borrow_paths, return_paths, use_mock)
+
     @staticmethod
     def create_comparison_task(image1_path: str, image2_path: str) -> str:
         """
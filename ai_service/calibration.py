@@ -0,0 +1,269 @@
+"""
+相似度阈值校准工具
+
+基于已存储的对比分数和鉴定师的最终结论，向量化扫描阈值网格，
+生成混淆矩阵和 ROC 曲线，并给出建议的阈值配置（无需重新解码图片）
+"""
+from typing import Any, Iterable
+
+import numpy as np
+
+from ai_service.config import (
+    DIMENSIONS,
+    SIMILARITY_THRESHOLD_HIGH,
+    SIMILARITY_THRESHOLD_LOW,
+    ConclusionType,
+)
+
+# 混淆矩阵的行列顺序（行：真实标签，列：预测结论）
+LABELS = [ConclusionType.AUTHENTIC, ConclusionType.SUSPICIOUS, ConclusionType.FAKE]
+LABEL_INDEX = {label: i for i, label in enumerate(LABELS)}
+
+
+def build_score_arrays(
+    rows: Iterable[tuple[dict[str, Any] | None, str | None]]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    将存储的对比结果转换为 NumPy 数组
+
+    Args:
+        rows: (comparison_result, final_conclusion) 序列
+
+    Returns:
+        (总体分数 (n,), 各维度分数 (n, 维度数，缺失为 NaN), 标签索引 (n,))
+    """
+    confidences: list[float] = []
+    dimension_scores: list[list[float]] = []
+    labels: list[int] = []
+
+    for result, conclusion in rows:
+        if not result or conclusion not in LABEL_INDEX:
+            continue
+        confidence = result.get("confidence")
+        if confidence is None:
+            continue
+
+        dimensions = result.get("dimensions") or {}
+        dimension_scores.append([
+            float(dimensions[name]["score"])
+            if isinstance(dimensions.get(name), dict) and dimensions[name].get("score") is not None
+            else np.nan
+            for name in DIMENSIONS
+        ])
+        confidences.append(float(confidence))
+        labels.append(LABEL_INDEX[conclusion])
+
+    return (
+        np.asarray(confidences, dtype=np.float64),
+        np.asarray(dimension_scores, dtype=np.float64).reshape(-1, len(DIMENSIONS)),
+        np.asarray(labels, dtype=np.int64),
+    )
+
+
+def classify(scores: np.ndarray, high: float, low: float) -> np.ndarray:
+    """
+    按阈值将分数映射为结论索引（与 ComparisonService 的判定规则一致）
+
+    Args:
+        scores: 分数数组
+        high: 真品阈值
+        low: 存疑阈值
+
+    Returns:
+        结论索引数组
+    """
+    return np.where(scores >= high, 0, np.where(scores >= low, 1, 2))
+
+
+def confusion_matrices(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray
+) -> np.ndarray:
+    """
+    批量计算阈值组合的混淆矩阵
+
+    对每个真实标签的分数排序一次，再用 searchsorted 统计 >= 阈值的数量，
+    复杂度为 O(n log n + 网格大小)，不随网格展开样本
+
+    Args:
+        scores: 分数数组 (n,)
+        labels: 标签索引数组 (n,)
+        highs: 真品阈值数组（任意形状）
+        lows: 存疑阈值数组（与 highs 可广播，要求 low <= high）
+
+    Returns:
+        混淆矩阵数组，形状为 highs.shape + (3, 3)
+    """
+    highs, lows = np.broadcast_arrays(np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64))
+    matrices = np.empty(highs.shape + (len(LABELS), len(LABELS)), dtype=np.int64)
+
+    for label in range(len(LABELS)):
+        class_scores = np.sort(scores[labels == label])
+        total = class_scores.size
+        above_high = total - np.searchsorted(class_scores, highs, side="left")
+        above_low = total - np.searchsorted(class_scores, lows, side="left")
+        matrices[..., label, 0] = above_high
+        matrices[..., label, 1] = above_low - above_high
+        matrices[..., label, 2] = total - above_low
+
+    return matrices
+
+
+def balanced_accuracy(matrices: np.ndarray) -> np.ndarray:
+    """
+    计算平衡准确率（各真实类别召回率的平均值，忽略无样本的类别）
+
+    Args:
+        matrices: 混淆矩阵数组 (..., 3, 3)
+
+    Returns:
+        平衡准确率数组
+    """
+    support = matrices.sum(axis=-1)
+    hits = np.diagonal(matrices, axis1=-2, axis2=-1)
+    present = support > 0
+    recall = np.divide(hits, support, out=np.zeros(hits.shape, dtype=np.float64), where=present)
+    return recall.sum(axis=-1) / np.maximum(present.sum(axis=-1), 1)
+
+
+def accuracy(matrices: np.ndarray) -> np.ndarray:
+    """计算准确率"""
+    total = matrices.sum(axis=(-2, -1))
+    hits = np.trace(matrices, axis1=-2, axis2=-1)
+    return hits / np.maximum(total, 1)
+
+
+def roc_curve(scores: np.ndarray, positive: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算 ROC 曲线（分数越高越倾向于正类）
+
+    Args:
+        scores: 分数数组，NaN 会被忽略
+        positive: 是否为正类的布尔数组
+
+    Returns:
+        (假阳性率, 真阳性率, 对应阈值)，阈值降序排列
+    """
+    valid = ~np.isnan(scores)
+    scores = scores[valid]
+    positive = positive[valid].astype(np.int64)
+
+    order = np.argsort(-scores, kind="mergesort")
+    scores = scores[order]
+    positive = positive[order]
+
+    # 只在分数变化处取点，保证相同分数归入同一阈值
+    distinct = np.r_[np.flatnonzero(np.diff(scores)), scores.size - 1] if scores.size else np.array([], dtype=np.int64)
+    true_positives = np.cumsum(positive)[distinct]
+    false_positives = (distinct + 1) - true_positives
+
+    total_positive = max(int(positive.sum()), 1)
+    total_negative = max(int(positive.size - positive.sum()), 1)
+
+    tpr = np.r_[0.0, true_positives / total_positive]
+    fpr = np.r_[0.0, false_positives / total_negative]
+    thresholds = np.r_[np.inf, scores[distinct]]
+    return fpr, tpr, thresholds
+
+
+def auc(fpr: np.ndarray, tpr: np.ndarray) -> float:
+    """梯形法计算曲线下面积"""
+    if fpr.size < 2:
+        return 0.0
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def sweep_thresholds(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    grid: np.ndarray | None = None
+) -> dict[str, np.ndarray]:
+    """
+    扫描 (high, low) 阈值网格
+
+    Args:
+        scores: 总体分数数组
+        labels: 标签索引数组
+        grid: 候选阈值，默认 0-100 的整数
+
+    Returns:
+        包含 highs、lows、matrices、balanced_accuracy、accuracy 的字典（仅 low <= high 的组合）
+    """
+    if grid is None:
+        grid = np.arange(0, 101, dtype=np.float64)
+
+    highs, lows = np.meshgrid(grid, grid, indexing="ij")
+    valid = lows <= highs
+    highs, lows = highs[valid], lows[valid]
+
+    matrices = confusion_matrices(scores, labels, highs, lows)
+    return {
+        "highs": highs,
+        "lows": lows,
+        "matrices": matrices,
+        "balanced_accuracy": balanced_accuracy(matrices),
+        "accuracy": accuracy(matrices),
+    }
+
+
+def propose_thresholds(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    grid: np.ndarray | None = None
+) -> dict[str, Any]:
+    """
+    给出建议阈值（平衡准确率最高，其次准确率最高）
+
+    Args:
+        scores: 总体分数数组
+        labels: 标签索引数组
+        grid: 候选阈值
+
+    Returns:
+        建议配置及其指标
+    """
+    sweep = sweep_thresholds(scores, labels, grid)
+    best = np.lexsort((sweep["accuracy"], sweep["balanced_accuracy"]))[-1]
+
+    return {
+        "SIMILARITY_THRESHOLD_HIGH": float(sweep["highs"][best]),
+        "SIMILARITY_THRESHOLD_LOW": float(sweep["lows"][best]),
+        "balanced_accuracy": float(sweep["balanced_accuracy"][best]),
+        "accuracy": float(sweep["accuracy"][best]),
+        "confusion_matrix": sweep["matrices"][best].tolist(),
+    }
+
+
+def evaluate_current(scores: np.ndarray, labels: np.ndarray) -> dict[str, Any]:
+    """评估当前配置的阈值"""
+    matrix = confusion_matrices(scores, labels, np.array(SIMILARITY_THRESHOLD_HIGH), np.array(SIMILARITY_THRESHOLD_LOW))
+    return {
+        "SIMILARITY_THRESHOLD_HIGH": SIMILARITY_THRESHOLD_HIGH,
+        "SIMILARITY_THRESHOLD_LOW": SIMILARITY_THRESHOLD_LOW,
+        "balanced_accuracy": float(balanced_accuracy(matrix)),
+        "accuracy": float(accuracy(matrix)),
+        "confusion_matrix": matrix.tolist(),
+    }
+
+
+def format_config(proposal: dict[str, Any]) -> str:
+    """
+    生成可直接粘贴到 ai_service/config.py 的配置片段
+
+    Args:
+        proposal: propose_thresholds 的返回值
+
+    Returns:
+        配置文本
+    """
+    high = proposal["SIMILARITY_THRESHOLD_HIGH"]
+    low = proposal["SIMILARITY_THRESHOLD_LOW"]
+    high_text = f"{high:g}"
+    low_text = f"{low:g}"
+    return (
+        "# 相似度阈值（由 scripts/calibrate_thresholds.py 校准生成）\n"
+        f"SIMILARITY_THRESHOLD_HIGH = {high_text}  # 高相似度（确认为真品）\n"
+        f"SIMILARITY_THRESHOLD_LOW = {low_text}   # 低相似度（存疑或仿品）\n"
+    )
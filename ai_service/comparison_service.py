@@ -3,12 +3,31 @@ AI 对比服务主接口
 
 提供统一的图片对比接口
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from ai_service.config import ConclusionType, DimensionStatus, SIMILARITY_THRESHOLD_HIGH, SIMILARITY_THRESHOLD_LOW
+from ai_service.utils.assignment import linear_sum_assignment
 from ai_service.utils.image_utils import load_image, calculate_ssim, generate_mock_comparison_result
 
+# 结论严重程度（照片组聚合时取最严重的结论）
+CONCLUSION_SEVERITY = {
+    ConclusionType.AUTHENTIC: 0,
+    ConclusionType.SUSPICIOUS: 1,
+    ConclusionType.FAKE: 2,
+}
+
+# 维度状态严重程度
+STATUS_SEVERITY = {
+    DimensionStatus.NORMAL: 0,
+    DimensionStatus.SUSPICIOUS: 1,
+    DimensionStatus.ABNORMAL: 2,
+}
+
 
 class ComparisonService:
     """AI 对比服务类"""
@@ -39,22 +58,27 @@ class ComparisonService:
             img2 = load_image(image2_path)
         except Exception as e:
             return {
-                "conclusion": ConclusionType.SUSPICIOUS.value,
+                "conclusion": ConclusionType.SUSPICIOUS,
                 "confidence": 0,
                 "dimensions": {},
                 "error": f"图片加载失败: {str(e)}"
             }
 
+        return ComparisonService._compare_loaded(img1, img2)
+
+    @staticmethod
+    def _compare_loaded(img1: np.ndarray, img2: np.ndarray) -> dict[str, Any]:
+        """对比两张已加载的图片"""
         # 计算整体相似度
         overall_similarity = calculate_ssim(img1, img2)
 
         # 生成结论
         if overall_similarity >= SIMILARITY_THRESHOLD_HIGH:
-            conclusion = ConclusionType.AUTHENTIC.value
+            conclusion = ConclusionType.AUTHENTIC
         elif overall_similarity >= SIMILARITY_THRESHOLD_LOW:
-            conclusion = ConclusionType.SUSPICIOUS.value
+            conclusion = ConclusionType.SUSPICIOUS
         else:
-            conclusion = ConclusionType.FAKE.value
+            conclusion = ConclusionType.FAKE
 
         # 生成分维度结果（简化版）
         # TODO: 在 4.3-4.4 实现专门的维度检测
@@ -85,6 +109,99 @@ class ComparisonService:
             "dimensions": dimensions
         }
 
+    @staticmethod
+    def compare_photo_sets(
+        borrow_paths: list[str],
+        return_paths: list[str],
+        use_mock: bool = False,
+        max_workers: int | None = None
+    ) -> dict[str, Any]:
+        """
+        对比借出照片组和归还照片组
+
+        每张照片只加载一次，所有 借出×归还 组合在线程池中并行打分
+        （numpy/PIL 计算会释放 GIL），再按相似度做一一配对（指派问题），
+        最后聚合配对结果：结论和各维度均取最差的一组，避免单张细节照片的异常被平均掉
+
+        Args:
+            borrow_paths: 借出照片路径列表
+            return_paths: 归还照片路径列表
+            use_mock: 是否使用 mock 结果（开发测试用）
+            max_workers: 并行线程数，默认为 CPU 核数
+
+        Returns:
+            对比结果字典，在单张对比结果的基础上增加：
+            pairs（配对明细）、unmatched_borrow / unmatched_return（未配对的照片）
+        """
+        if len(borrow_paths) == 1 and len(return_paths) == 1:
+            return ComparisonService.compare_images(borrow_paths[0], return_paths[0], use_mock)
+
+        workers = max_workers or os.cpu_count() or 1
+        pairs = [(i, j) for i in range(len(borrow_paths)) for j in range(len(return_paths))]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if use_mock:
+                results = list(executor.map(lambda _: generate_mock_comparison_result(), pairs))
+            else:
+                try:
+                    images = list(executor.map(load_image, [*borrow_paths, *return_paths]))
+                except Exception as e:
+                    return {
+                        "conclusion": ConclusionType.SUSPICIOUS,
+                        "confidence": 0,
+                        "dimensions": {},
+                        "error": f"图片加载失败: {str(e)}"
+                    }
+                borrow_images = images[:len(borrow_paths)]
+                return_images = images[len(borrow_paths):]
+                results = list(executor.map(
+                    lambda pair: ComparisonService._compare_loaded(borrow_images[pair[0]], return_images[pair[1]]),
+                    pairs
+                ))
+
+        # 相似度矩阵 -> 最大化总相似度的配对
+        scores = np.zeros((len(borrow_paths), len(return_paths)))
+        for (i, j), result in zip(pairs, results):
+            scores[i, j] = result["confidence"]
+        rows, cols = linear_sum_assignment(-scores)
+
+        matched = [results[i * len(return_paths) + j] for i, j in zip(rows, cols)]
+        aggregated = ComparisonService._aggregate(matched)
+        aggregated["pairs"] = [
+            {
+                "borrow_photo": borrow_paths[i],
+                "return_photo": return_paths[j],
+                "conclusion": result["conclusion"],
+                "confidence": float(result["confidence"]),
+            }
+            for i, j, result in zip(rows, cols, matched)
+        ]
+        matched_rows, matched_cols = set(rows.tolist()), set(cols.tolist())
+        aggregated["unmatched_borrow"] = [p for i, p in enumerate(borrow_paths) if i not in matched_rows]
+        aggregated["unmatched_return"] = [p for j, p in enumerate(return_paths) if j not in matched_cols]
+        return aggregated
+
+    @staticmethod
+    def _aggregate(results: list[dict[str, Any]]) -> dict[str, Any]:
+        """聚合多组配对的对比结果（取最差值）"""
+        worst = max(results, key=lambda r: (CONCLUSION_SEVERITY.get(r["conclusion"], 1), -r["confidence"]))
+
+        dimensions = {}
+        for result in results:
+            for name, dim in result.get("dimensions", {}).items():
+                current = dimensions.get(name)
+                if current is None or (
+                    (STATUS_SEVERITY.get(dim["status"], 1), -dim["score"])
+                    > (STATUS_SEVERITY.get(current["status"], 1), -current["score"])
+                ):
+                    dimensions[name] = dim
+
+        return {
+            "conclusion": worst["conclusion"],
+            "confidence": min(r["confidence"] for r in results),
+            "dimensions": dimensions,
+        }
+
     @staticmethod
     def _generate_description(dimension: str, score: int) -> str:
         """生成维度差异描述"""
@@ -0,0 +1,91 @@
+"""
+指派问题求解
+
+在借出照片和归还照片之间寻找总代价最小的一一配对（匈牙利算法）。
+已安装 scipy 时直接使用 scipy.optimize.linear_sum_assignment
+"""
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_linear_sum_assignment
+except ImportError:  # scipy 为可选依赖
+    _scipy_linear_sum_assignment = None
+
+
+def linear_sum_assignment(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    求解矩形代价矩阵的最小代价指派
+
+    与 scipy.optimize.linear_sum_assignment 的接口一致：
+    配对数为 min(行数, 列数)，结果按行号升序
+
+    Args:
+        cost: 代价矩阵 (n, m)
+
+    Returns:
+        (行号数组, 列号数组)
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.ndim != 2:
+        raise ValueError("代价矩阵必须是二维数组")
+    if cost.size == 0:
+        empty = np.array([], dtype=int)
+        return empty, empty
+
+    if _scipy_linear_sum_assignment is not None:
+        return _scipy_linear_sum_assignment(cost)
+
+    # 算法要求行数不超过列数，否则转置求解
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = _hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    return _hungarian(cost)
+
+
+def _hungarian(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """匈牙利算法（势函数 + 最短增广路），要求 n <= m，复杂度 O(n^2 m)"""
+    n, m = cost.shape
+    u = np.zeros(n + 1)          # 行势
+    v = np.zeros(m + 1)          # 列势
+    match = np.zeros(m + 1, dtype=int)  # match[j]: 与第 j 列配对的行（1 起始，0 表示未配对）
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            # 对所有未访问的列更新松弛量
+            free = ~used[1:]
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            improved = free & (slack < min_slack[1:])
+            min_slack[1:][improved] = slack[improved]
+            way[1:][improved] = j0
+
+            candidates = np.where(free, min_slack[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+
+            j0 = j1
+            if match[j0] == 0:
+                break
+
+        # 沿增广路翻转配对
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    cols = np.nonzero(match[1:])[0]
+    rows = match[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
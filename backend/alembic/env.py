@@ -3,13 +3,11 @@ Alembic 环境配置文件
 
 用于配置数据库迁移环境
 """
-import asyncio
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import pool
+from sqlalchemy import engine_from_config, pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import async_engine_from_config
 
 # 导入配置和模型
 from app.core.config import settings
@@ -30,6 +28,18 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """自动生成迁移时忽略由 DDL 维护、模型中没有的全文检索对象（见 app.models.artifact.SEARCH_DDL）"""
+    if reflected and compare_to is None:
+        if type_ == "table" and name.startswith("artifacts_fts"):
+            return False
+        if type_ == "column" and name == "search_vector":
+            return False
+        if type_ == "index" and name == "idx_artifacts_search_vector":
+            return False
+    return True
+
+
 # ==================== 其他配置值 ====================
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc
@@ -44,6 +54,8 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -56,41 +68,27 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
+        include_object=include_object,
+        # SQLite 不支持大部分 ALTER TABLE，使用 batch 模式（复制表）
+        render_as_batch=connection.dialect.name == "sqlite",
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
-async def run_async_migrations() -> None:
-    """异步模式运行迁移"""
-    connectable = async_engine_from_config(
+def run_migrations_online() -> None:
+    """在线模式运行迁移 - 连接数据库并执行迁移（与应用一致使用同步引擎）"""
+    connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    async with connectable.connect() as connection:
-        await connection.run_sync(do_run_migrations)
+    with connectable.connect() as connection:
+        do_run_migrations(connection)
 
-    await connectable.dispose()
-
-
-def run_migrations_online() -> None:
-    """在线模式运行迁移 - 连接数据库并执行迁移"""
-    if asyncio.is_event_loop_running():
-        # 如果事件循环已在运行，使用同步方式
-        connectable = engine_from_config(
-            config.get_section(config.config_ini_section, {}),
-            prefix="sqlalchemy.",
-            poolclass=pool.NullPool,
-        )
-
-        with connectable.connect() as connection:
-            do_run_migrations(connection)
-    else:
-        # 使用异步方式
-        asyncio.run(run_async_migrations())
+    connectable.dispose()
 
 
 # 根据上下文判断使用在线还是离线模式
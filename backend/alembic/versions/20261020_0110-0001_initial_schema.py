@@ -0,0 +1,109 @@
+"""initial schema
+
+基线迁移：创建基线版本的全部表（不含之后新增的 stored_files、borrow_photos、return_photos，见 0007）。
+基线版本通过 create_all 建表的数据库先执行 alembic stamp 0001 再升级
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-20 01:10:20.844860+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('artifacts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('artifact_id', sa.String(length=50), nullable=False, comment='文物编号（如 M-2024-001）'),
+    sa.Column('name', sa.String(length=200), nullable=False, comment='文物名称'),
+    sa.Column('author', sa.String(length=100), nullable=False, comment='作者'),
+    sa.Column('category', sa.String(length=50), nullable=False, comment='类别（书法/绘画/扇面等）'),
+    sa.Column('size', sa.String(length=50), nullable=True, comment='尺寸（如 120x60cm）'),
+    sa.Column('era', sa.String(length=50), nullable=True, comment='年代（如 北宋/元代/明代）'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # varchar 列没有默认的 GIN 操作符类，这里按普通索引创建
+    op.create_index('idx_artifacts_fulltext', 'artifacts', ['name', 'author'], unique=False)
+    op.create_index(op.f('ix_artifacts_artifact_id'), 'artifacts', ['artifact_id'], unique=True)
+    op.create_index(op.f('ix_artifacts_author'), 'artifacts', ['author'], unique=False)
+    op.create_index(op.f('ix_artifacts_category'), 'artifacts', ['category'], unique=False)
+    op.create_index(op.f('ix_artifacts_name'), 'artifacts', ['name'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False, comment='用户名（登录账号）'),
+    sa.Column('password_hash', sa.String(length=255), nullable=False, comment='密码哈希（bcrypt）'),
+    sa.Column('role', sa.String(length=20), nullable=False, comment='角色：admin/appraiser/staff'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('borrow_records',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('artifact_id', sa.Integer(), nullable=False, comment='关联的文物 ID'),
+    sa.Column('borrow_photo_url', sa.String(length=500), nullable=False, comment='借出照片路径'),
+    sa.Column('borrow_date', sa.Date(), nullable=False, comment='借出日期'),
+    sa.Column('expected_return_date', sa.Date(), nullable=True, comment='预计归还日期'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='状态：borrowed/returned'),
+    sa.Column('operator_id', sa.Integer(), nullable=False, comment='操作员 ID'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+    sa.ForeignKeyConstraint(['artifact_id'], ['artifacts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['operator_id'], ['users.id'], ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_borrow_records_artifact_id'), 'borrow_records', ['artifact_id'], unique=False)
+    op.create_index(op.f('ix_borrow_records_operator_id'), 'borrow_records', ['operator_id'], unique=False)
+    op.create_index(op.f('ix_borrow_records_status'), 'borrow_records', ['status'], unique=False)
+
+    op.create_table('return_records',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('borrow_record_id', sa.Integer(), nullable=False, comment='关联的借出记录 ID'),
+    sa.Column('return_photo_url', sa.String(length=500), nullable=False, comment='归还照片路径'),
+    sa.Column('return_date', sa.Date(), nullable=False, comment='归还日期'),
+    sa.Column('comparison_result', sa.JSON(), nullable=True, comment='AI 对比结果（详细）'),
+    sa.Column('final_conclusion', sa.String(length=20), nullable=True, comment='最终结论：authentic/suspicious/fake'),
+    sa.Column('operator_id', sa.Integer(), nullable=False, comment='操作员 ID'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+    sa.ForeignKeyConstraint(['borrow_record_id'], ['borrow_records.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['operator_id'], ['users.id'], ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_return_records_borrow_record_id'), 'return_records', ['borrow_record_id'], unique=True)
+    op.create_index(op.f('ix_return_records_final_conclusion'), 'return_records', ['final_conclusion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_return_records_final_conclusion'), table_name='return_records')
+    op.drop_index(op.f('ix_return_records_borrow_record_id'), table_name='return_records')
+    op.drop_table('return_records')
+
+    op.drop_index(op.f('ix_borrow_records_status'), table_name='borrow_records')
+    op.drop_index(op.f('ix_borrow_records_operator_id'), table_name='borrow_records')
+    op.drop_index(op.f('ix_borrow_records_artifact_id'), table_name='borrow_records')
+    op.drop_table('borrow_records')
+
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_table('users')
+
+    op.drop_index(op.f('ix_artifacts_name'), table_name='artifacts')
+    op.drop_index(op.f('ix_artifacts_category'), table_name='artifacts')
+    op.drop_index(op.f('ix_artifacts_author'), table_name='artifacts')
+    op.drop_index(op.f('ix_artifacts_artifact_id'), table_name='artifacts')
+    op.drop_index('idx_artifacts_fulltext', table_name='artifacts')
+    op.drop_table('artifacts')
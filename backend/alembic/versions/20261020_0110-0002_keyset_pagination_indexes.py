@@ -0,0 +1,30 @@
+"""keyset pagination indexes
+
+借出/归还记录列表按 (日期, id) 倒序游标分页所用的复合索引
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-20 01:10:41.675390+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_borrow_records_status_borrow_date_id', 'borrow_records', ['status', 'borrow_date', 'id'], unique=False)
+    op.create_index('ix_return_records_return_date_id', 'return_records', ['return_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_return_records_return_date_id', table_name='return_records')
+    op.drop_index('ix_borrow_records_status_borrow_date_id', table_name='borrow_records')
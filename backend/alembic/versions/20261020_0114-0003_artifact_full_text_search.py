@@ -0,0 +1,96 @@
+"""artifact full text search
+
+artifacts 增加 search_tokens 分词列并回填；PostgreSQL 增加 tsvector 生成列和 GIN 索引，
+SQLite 增加 FTS5 外部内容表和同步触发器。删除原先 name/author 上无效的 idx_artifacts_fulltext
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-20 01:14:52.512216+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.search import index_tokens
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+POSTGRES_DDL = [
+    "ALTER TABLE artifacts ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(search_tokens, ''))) STORED",
+    "CREATE INDEX idx_artifacts_search_vector ON artifacts USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE artifacts_fts USING fts5(search_tokens, content='artifacts', content_rowid='id')",
+    "CREATE TRIGGER artifacts_fts_ai AFTER INSERT ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts(rowid, search_tokens) VALUES (new.id, new.search_tokens); END",
+    "CREATE TRIGGER artifacts_fts_ad AFTER DELETE ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts(artifacts_fts, rowid, search_tokens) VALUES ('delete', old.id, old.search_tokens); END",
+    "CREATE TRIGGER artifacts_fts_au AFTER UPDATE OF search_tokens ON artifacts BEGIN "
+    "INSERT INTO artifacts_fts(artifacts_fts, rowid, search_tokens) VALUES ('delete', old.id, old.search_tokens); "
+    "INSERT INTO artifacts_fts(rowid, search_tokens) VALUES (new.id, new.search_tokens); END",
+    # 按回填后的 artifacts 重建索引
+    "INSERT INTO artifacts_fts(artifacts_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('artifacts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_tokens', sa.Text(), nullable=True, comment='全文检索分词（自动生成）'))
+        batch_op.drop_index('idx_artifacts_fulltext')
+
+    # 回填已有文物的分词
+    bind = op.get_bind()
+    artifacts = sa.table(
+        'artifacts',
+        sa.column('id', sa.Integer), sa.column('artifact_id', sa.String), sa.column('name', sa.String),
+        sa.column('author', sa.String), sa.column('category', sa.String), sa.column('era', sa.String),
+        sa.column('search_tokens', sa.Text),
+    )
+    update = (
+        artifacts.update()
+        .where(artifacts.c.id == sa.bindparam('pk'))
+        .values(search_tokens=sa.bindparam('tokens'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(artifacts.c.id, artifacts.c.artifact_id, artifacts.c.name,
+                      artifacts.c.author, artifacts.c.category, artifacts.c.era)
+            .where(artifacts.c.id > last_id)
+            .order_by(artifacts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [{'pk': row[0], 'tokens': index_tokens(*row[1:])} for row in rows])
+        last_id = rows[-1][0]
+
+    statements = {'postgresql': POSTGRES_DDL, 'sqlite': SQLITE_DDL}.get(bind.dialect.name, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('idx_artifacts_search_vector', table_name='artifacts')
+        op.drop_column('artifacts', 'search_vector')
+    elif dialect == 'sqlite':
+        for trigger in ('artifacts_fts_ai', 'artifacts_fts_ad', 'artifacts_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS artifacts_fts')
+
+    with op.batch_alter_table('artifacts', schema=None) as batch_op:
+        batch_op.create_index('idx_artifacts_fulltext', ['name', 'author'], unique=False)
+        batch_op.drop_column('search_tokens')
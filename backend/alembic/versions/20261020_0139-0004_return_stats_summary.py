@@ -0,0 +1,88 @@
+"""return stats summary
+
+新增 return_stats 汇总表：按 (月份, 类别, 操作员, 结论) 统计归还记录数，
+由 ReturnRecord 的 ORM 事件增量维护；升级时按已有归还记录回填
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-20 01:39:08.546445+08:00
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.create_table('return_stats',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('period', sa.Date(), nullable=False, comment='统计月份（当月第一天）'),
+    sa.Column('category', sa.String(length=50), nullable=False, comment='文物类别（归还时）'),
+    sa.Column('operator_id', sa.Integer(), nullable=False, comment='归还操作员 ID'),
+    sa.Column('conclusion', sa.String(length=20), nullable=False, comment='结论：authentic/suspicious/fake/pending'),
+    sa.Column('count', sa.Integer(), nullable=False, comment='归还记录数'),
+    sa.ForeignKeyConstraint(['operator_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period', 'category', 'operator_id', 'conclusion', name='uq_return_stats_key')
+    )
+    with op.batch_alter_table('return_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_return_stats_operator_id'), ['operator_id'], unique=False)
+
+    # 回填：按已有归还记录汇总（类别取文物当前类别，未确定结论记为 pending）
+    bind = op.get_bind()
+    return_records = sa.table(
+        'return_records',
+        sa.column('id', sa.Integer), sa.column('borrow_record_id', sa.Integer), sa.column('return_date', sa.Date),
+        sa.column('operator_id', sa.Integer), sa.column('final_conclusion', sa.String),
+    )
+    borrow_records = sa.table('borrow_records', sa.column('id', sa.Integer), sa.column('artifact_id', sa.Integer))
+    artifacts = sa.table('artifacts', sa.column('id', sa.Integer), sa.column('category', sa.String))
+    return_stats = sa.table(
+        'return_stats',
+        sa.column('period', sa.Date), sa.column('category', sa.String), sa.column('operator_id', sa.Integer),
+        sa.column('conclusion', sa.String), sa.column('count', sa.Integer),
+    )
+
+    counts = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(return_records.c.id, return_records.c.return_date, artifacts.c.category,
+                      return_records.c.operator_id, return_records.c.final_conclusion)
+            .select_from(return_records)
+            .join(borrow_records, return_records.c.borrow_record_id == borrow_records.c.id)
+            .join(artifacts, borrow_records.c.artifact_id == artifacts.c.id)
+            .where(return_records.c.id > last_id)
+            .order_by(return_records.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for _, return_date, category, operator_id, conclusion in rows:
+            counts[(return_date.replace(day=1), category, operator_id, conclusion or 'pending')] += 1
+        last_id = rows[-1][0]
+
+    if counts:
+        bind.execute(return_stats.insert(), [
+            {'period': period, 'category': category, 'operator_id': operator_id,
+             'conclusion': conclusion, 'count': count}
+            for (period, category, operator_id, conclusion), count in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('return_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_return_stats_operator_id'))
+
+    op.drop_table('return_stats')
@@ -0,0 +1,45 @@
+"""active loan unique index
+
+borrow_records(artifact_id) 上的部分唯一索引（WHERE status = 'borrowed'）：
+每件文物最多一条活跃借出记录，借出时直接插入，由数据库拒绝重复借出。
+已有数据中同一文物存在多条活跃借出记录时升级失败，需先人工处理
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-20 01:43:01.252230+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("status = 'borrowed'")
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT artifact_id, COUNT(*) FROM borrow_records WHERE status = 'borrowed' "
+        "GROUP BY artifact_id HAVING COUNT(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"artifact_id={artifact_id}（{count} 条）" for artifact_id, count in duplicates[:20])
+        raise RuntimeError(f"以下文物存在多条活跃借出记录，请先处理后再升级: {listed}")
+
+    with op.batch_alter_table('borrow_records', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_borrow_records_active_artifact', ['artifact_id'], unique=True,
+            postgresql_where=ACTIVE, sqlite_where=ACTIVE,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('borrow_records', schema=None) as batch_op:
+        batch_op.drop_index('uq_borrow_records_active_artifact')
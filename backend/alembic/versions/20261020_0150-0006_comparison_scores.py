@@ -0,0 +1,107 @@
+"""comparison scores
+
+从 return_records.comparison_result（JSON）中拆出对比分数：
+新增 return_records.confidence 列和 return_dimension_scores 维度分数表（按 (维度, 分数) / (维度, 状态) 建索引），
+由 ReturnRecord 的 ORM 事件在写入时维护；升级时按已有归还记录回填
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-20 01:50:32.371536+08:00
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.comparison import extract_scores
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('confidence', sa.Integer(), nullable=True, comment='AI 对比总体置信度 (0-100)'))
+        batch_op.create_index(batch_op.f('ix_return_records_confidence'), ['confidence'], unique=False)
+
+    op.create_table('return_dimension_scores',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('return_record_id', sa.Integer(), nullable=False, comment='关联的归还记录 ID'),
+    sa.Column('dimension', sa.String(length=30), nullable=False, comment='维度：seal/brushwork/paper/...'),
+    sa.Column('score', sa.Integer(), nullable=True, comment='相似度分数 (0-100)'),
+    sa.Column('status', sa.String(length=20), nullable=True, comment='状态：normal/suspicious/abnormal'),
+    sa.ForeignKeyConstraint(['return_record_id'], ['return_records.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('return_record_id', 'dimension', name='uq_return_dimension_scores_record_dimension')
+    )
+    with op.batch_alter_table('return_dimension_scores', schema=None) as batch_op:
+        batch_op.create_index('ix_return_dimension_scores_dimension_score', ['dimension', 'score'], unique=False)
+        batch_op.create_index('ix_return_dimension_scores_dimension_status', ['dimension', 'status'], unique=False)
+
+    # 回填：按 id 分批解析已有对比结果
+    bind = op.get_bind()
+    return_records = sa.table(
+        'return_records',
+        sa.column('id', sa.Integer), sa.column('comparison_result', sa.Text), sa.column('confidence', sa.Integer),
+    )
+    scores_table = sa.table(
+        'return_dimension_scores',
+        sa.column('return_record_id', sa.Integer), sa.column('dimension', sa.String),
+        sa.column('score', sa.Integer), sa.column('status', sa.String),
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(return_records.c.id, return_records.c.comparison_result)
+            .where(return_records.c.id > last_id, return_records.c.comparison_result.is_not(None))
+            .order_by(return_records.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        confidences, scores = [], []
+        for record_id, raw in rows:
+            try:
+                result = json.loads(raw) if isinstance(raw, str) else raw
+            except ValueError:
+                continue
+            confidence, dimension_scores = extract_scores(result)
+            if confidence is not None:
+                confidences.append({'record_id': record_id, 'confidence': confidence})
+            scores.extend(
+                {'return_record_id': record_id, 'dimension': dimension, 'score': score, 'status': status}
+                for dimension, score, status in dimension_scores
+            )
+
+        if confidences:
+            bind.execute(
+                return_records.update()
+                .where(return_records.c.id == sa.bindparam('record_id'))
+                .values(confidence=sa.bindparam('confidence')),
+                confidences
+            )
+        if scores:
+            bind.execute(scores_table.insert(), scores)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('return_dimension_scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_return_dimension_scores_dimension_status')
+        batch_op.drop_index('ix_return_dimension_scores_dimension_score')
+
+    op.drop_table('return_dimension_scores')
+
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_return_records_confidence'))
+        batch_op.drop_column('confidence')
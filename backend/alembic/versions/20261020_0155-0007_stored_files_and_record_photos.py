@@ -0,0 +1,73 @@
+"""stored files and record photos
+
+新增基线之后引入的表：stored_files（内容寻址存储的引用计数）、borrow_photos / return_photos（照片组）。
+早期版本的 0001 已包含这三张表，按该版本升级过的数据库跳过已存在的表
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-20 01:55:12.408172+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'stored_files' not in existing:
+        op.create_table('stored_files',
+        sa.Column('sha256', sa.String(length=64), nullable=False, comment='文件内容 sha256（十六进制）'),
+        sa.Column('path', sa.String(length=500), nullable=False, comment='存储路径（相对于 uploads 目录）'),
+        sa.Column('size', sa.BigInteger(), nullable=False, comment='文件字节数'),
+        sa.Column('ref_count', sa.Integer(), nullable=False, comment='引用计数'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+        sa.PrimaryKeyConstraint('sha256'),
+        sa.UniqueConstraint('path')
+        )
+
+    if 'borrow_photos' not in existing:
+        op.create_table('borrow_photos',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('borrow_record_id', sa.Integer(), nullable=False, comment='关联的借出记录 ID'),
+        sa.Column('photo_url', sa.String(length=500), nullable=False, comment='照片路径'),
+        sa.Column('position', sa.Integer(), nullable=False, comment='照片顺序（0 为主照片）'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+        sa.ForeignKeyConstraint(['borrow_record_id'], ['borrow_records.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_borrow_photos_borrow_record_id'), 'borrow_photos', ['borrow_record_id'], unique=False)
+
+    if 'return_photos' not in existing:
+        op.create_table('return_photos',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('return_record_id', sa.Integer(), nullable=False, comment='关联的归还记录 ID'),
+        sa.Column('photo_url', sa.String(length=500), nullable=False, comment='照片路径'),
+        sa.Column('position', sa.Integer(), nullable=False, comment='照片顺序（0 为主照片）'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='更新时间'),
+        sa.ForeignKeyConstraint(['return_record_id'], ['return_records.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_return_photos_return_record_id'), 'return_photos', ['return_record_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_return_photos_return_record_id'), table_name='return_photos')
+    op.drop_table('return_photos')
+
+    op.drop_index(op.f('ix_borrow_photos_borrow_record_id'), table_name='borrow_photos')
+    op.drop_table('borrow_photos')
+
+    op.drop_table('stored_files')
@@ -0,0 +1,86 @@
+"""return category snapshot
+
+新增 return_records.artifact_category：归还时文物类别的快照，统计汇总按此计入和扣减，
+之后修改文物类别不再导致扣减到错误的汇总行。
+已有记录只能取文物当前类别回填，并按回填结果重建 return_stats，使汇总与快照一致
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 02:01:45.205858+08:00
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('artifact_category', sa.String(length=50), nullable=True, comment='文物类别（归还时）'))
+
+    bind = op.get_bind()
+    return_records = sa.table(
+        'return_records',
+        sa.column('id', sa.Integer), sa.column('borrow_record_id', sa.Integer), sa.column('return_date', sa.Date),
+        sa.column('operator_id', sa.Integer), sa.column('final_conclusion', sa.String),
+        sa.column('artifact_category', sa.String),
+    )
+    borrow_records = sa.table('borrow_records', sa.column('id', sa.Integer), sa.column('artifact_id', sa.Integer))
+    artifacts = sa.table('artifacts', sa.column('id', sa.Integer), sa.column('category', sa.String))
+    return_stats = sa.table(
+        'return_stats',
+        sa.column('period', sa.Date), sa.column('category', sa.String), sa.column('operator_id', sa.Integer),
+        sa.column('conclusion', sa.String), sa.column('count', sa.Integer),
+    )
+
+    # 回填快照：取文物当前类别
+    bind.execute(
+        return_records.update().values(
+            artifact_category=sa.select(artifacts.c.category)
+            .select_from(borrow_records)
+            .join(artifacts, borrow_records.c.artifact_id == artifacts.c.id)
+            .where(borrow_records.c.id == return_records.c.borrow_record_id)
+            .scalar_subquery()
+        )
+    )
+
+    # 按快照重建汇总（未确定结论记为 pending）
+    counts = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(return_records.c.id, return_records.c.return_date, return_records.c.artifact_category,
+                      return_records.c.operator_id, return_records.c.final_conclusion)
+            .where(return_records.c.id > last_id, return_records.c.artifact_category.is_not(None))
+            .order_by(return_records.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for _, return_date, category, operator_id, conclusion in rows:
+            counts[(return_date.replace(day=1), category, operator_id, conclusion or 'pending')] += 1
+        last_id = rows[-1][0]
+
+    bind.execute(return_stats.delete())
+    if counts:
+        bind.execute(return_stats.insert(), [
+            {'period': period, 'category': category, 'operator_id': operator_id,
+             'conclusion': conclusion, 'count': count}
+            for (period, category, operator_id, conclusion), count in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.drop_column('artifact_category')
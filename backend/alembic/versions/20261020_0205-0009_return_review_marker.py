@@ -0,0 +1,32 @@
+"""return review marker
+
+新增 return_records.reviewed_at：鉴定师通过接口确认最终结论时写入，
+阈值校准只使用有此标记的记录（未复核记录的最终结论就是 AI 结论）。
+已有记录无法可靠区分是否复核过（updated_at 也会被其他修改更新），不回填
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 02:05:56.475396+08:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reviewed_at', sa.DateTime(timezone=True), nullable=True, comment='鉴定师复核时间'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('return_records', schema=None) as batch_op:
+        batch_op.drop_column('reviewed_at')
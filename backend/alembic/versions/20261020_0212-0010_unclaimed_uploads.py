@@ -0,0 +1,69 @@
+"""unclaimed uploads
+
+新增 stored_files.unclaimed / unclaimed_at：上传的引用在被记录确认前记为未确认，
+清理任务释放超过 TEMP_UPLOAD_TTL_HOURS 仍未确认的引用。
+已有记录按“引用计数 - 照片占用的引用数”回填（早期没有照片组的记录按主照片计），
+回填的未确认引用从升级时开始计算过期时间
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 02:12:31.508114+08:00
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unclaimed', sa.Integer(), server_default='0', nullable=False, comment='尚未被记录确认的上传引用数（包含在 ref_count 中）'))
+        batch_op.add_column(sa.Column('unclaimed_at', sa.DateTime(timezone=True), nullable=True, comment='最近一次未确认上传的时间'))
+
+    stored_files = sa.table(
+        'stored_files',
+        sa.column('path', sa.String), sa.column('ref_count', sa.Integer),
+        sa.column('unclaimed', sa.Integer), sa.column('unclaimed_at', sa.DateTime(timezone=True)),
+    )
+    borrow_records = sa.table('borrow_records', sa.column('id', sa.Integer), sa.column('borrow_photo_url', sa.String))
+    return_records = sa.table('return_records', sa.column('id', sa.Integer), sa.column('return_photo_url', sa.String))
+    borrow_photos = sa.table('borrow_photos', sa.column('borrow_record_id', sa.Integer), sa.column('photo_url', sa.String))
+    return_photos = sa.table('return_photos', sa.column('return_record_id', sa.Integer), sa.column('photo_url', sa.String))
+
+    def count(statement):
+        return statement.with_only_columns(sa.func.count()).scalar_subquery()
+
+    claimed = (
+        count(sa.select(borrow_photos).where(borrow_photos.c.photo_url == stored_files.c.path))
+        + count(sa.select(return_photos).where(return_photos.c.photo_url == stored_files.c.path))
+        + count(sa.select(borrow_records).where(
+            borrow_records.c.borrow_photo_url == stored_files.c.path,
+            ~sa.exists().where(borrow_photos.c.borrow_record_id == borrow_records.c.id),
+        ))
+        + count(sa.select(return_records).where(
+            return_records.c.return_photo_url == stored_files.c.path,
+            ~sa.exists().where(return_photos.c.return_record_id == return_records.c.id),
+        ))
+    )
+    bind = op.get_bind()
+    bind.execute(stored_files.update().values(unclaimed=stored_files.c.ref_count - claimed))
+    bind.execute(stored_files.update().where(stored_files.c.unclaimed < 0).values(unclaimed=0))
+    bind.execute(
+        stored_files.update().where(stored_files.c.unclaimed > 0)
+        .values(unclaimed_at=datetime.now(timezone.utc))
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.drop_column('unclaimed_at')
+        batch_op.drop_column('unclaimed')
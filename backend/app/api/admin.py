@@ -7,15 +7,20 @@ from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.deps import get_current_user, PermissionChecker
+from app.core.deps import get_current_user, invalidate_principal, PermissionChecker
+from app.core.security import get_password_hash_async
 from app.models.user import User
-from app.schemas.user import UserResponse, UserCreate
+from app.schemas.user import UserResponse, UserCreate, UserUpdate
+from app.schemas.admin import DatabasePoolMetrics, UploadSweepReport
 from app.schemas.common import MessageResponse
 from app.models.user import User
 from app.services.borrow_service import BorrowRecordService
 from app.services.return_service import ReturnRecordService
-from app.core.database import get_db
+from app.services.upload_sweeper import UploadSweeper
+from app.services.user_service import UserService
+from app.core.database import async_engine, engine, get_db
 
 router = APIRouter(prefix="/admin", tags=["系统管理"])
 
@@ -31,31 +36,42 @@ def get_all_users(
 
 
 @router.post("/users", response_model=UserResponse, status_code=201)
-def create_user(
+async def create_user(
     data: UserCreate,
     db: Session = Depends(get_db),
     _current_user: User = Depends(PermissionChecker(["admin"])),
 ):
     """创建新用户（仅管理员）"""
-    from app.core.security import get_password_hash
-
     # 检查用户名是否存在
-    existing = db.query(User).filter(User.username == data.username).first()
+    existing = await run_in_threadpool(UserService.get_by_username, db, data.username)
     if existing:
         raise HTTPException(status_code=400, detail="用户名已存在")
 
-    new_user = User(
-        username=data.username,
-        password_hash=get_password_hash(data.password),
-        role=data.role
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    password_hash = await get_password_hash_async(data.password)
+    new_user = await run_in_threadpool(UserService.create, db, data.username, password_hash, data.role)
 
     return UserResponse.model_validate(new_user)
 
 
+@router.put("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    data: UserUpdate,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(PermissionChecker(["admin"])),
+):
+    """修改用户角色或密码（仅管理员），立即对该用户的后续请求生效"""
+    user = await run_in_threadpool(UserService.get_by_id, db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="用户不存在")
+
+    password_hash = await get_password_hash_async(data.password) if data.password is not None else None
+    user = await run_in_threadpool(UserService.update, db, user, data.role, password_hash)
+    invalidate_principal(user_id)
+
+    return UserResponse.model_validate(user)
+
+
 @router.delete("/users/{user_id}", response_model=MessageResponse)
 def delete_user(
     user_id: int,
@@ -72,10 +88,45 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_principal(user_id)
 
     return MessageResponse(message="用户删除成功", success=True)
 
 
+@router.post("/uploads/sweep", response_model=UploadSweepReport)
+def sweep_uploads(
+    dry_run: bool = True,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(PermissionChecker(["admin"])),
+):
+    """
+    清理上传目录（仅管理员）
+
+    删除过期的临时文件和未被任何记录引用的孤立文件，
+    默认 dry_run=true 只统计不删除
+    """
+    return UploadSweeper.sweep(db, dry_run=dry_run)
+
+
+@router.get("/metrics/db-pool", response_model=DatabasePoolMetrics)
+def get_db_pool_metrics(
+    _current_user: User = Depends(PermissionChecker(["admin"])),
+):
+    """
+    数据库连接池指标（仅管理员）
+
+    取连接等待时间高、溢出连接或超时增加说明连接池不够用；
+    等待时间低而 SQL 执行时间高说明瓶颈在数据库
+    """
+    return DatabasePoolMetrics(
+        sync_engine=engine.pool.metrics.snapshot(engine.pool),
+        async_engine=(
+            async_engine.sync_engine.pool.metrics.snapshot(async_engine.sync_engine.pool)
+            if async_engine is not None else None
+        ),
+    )
+
+
 @router.get("/backup", response_model=MessageResponse)
 def trigger_backup(
     _current_user: User = Depends(PermissionChecker(["admin"])),
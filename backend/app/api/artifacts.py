@@ -3,10 +3,13 @@
 
 处理文物信息的 CRUD 操作
 """
+import io
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.deps import get_current_user, PermissionChecker
 from app.models.user import User
@@ -15,10 +18,13 @@ from app.schemas.artifact import (
     ArtifactUpdate,
     ArtifactResponse,
     ArtifactListResponse,
+    ArtifactImportReport,
 )
 from app.schemas.common import MessageResponse
-from app.services.artifact_service import ArtifactService
-from app.core.database import get_db
+from app.services.artifact_import import IMPORT_FORMAT_PATTERN, ArtifactImporter
+from app.services.artifact_service import ArtifactService, AsyncArtifactService
+from app.core.database import get_async_db, get_db
+from app.utils.pagination import TOTAL_EXACT, TOTAL_MODE_PATTERN
 
 router = APIRouter(prefix="/artifacts", tags=["文物管理"])
 
@@ -28,14 +34,42 @@ def get_artifacts(
     skip: Annotated[int, Query(ge=0, description="跳过记录数")] = 0,
     limit: Annotated[int, Query(ge=1, le=100, description="返回记录数")] = 10,
     artifact_id: Annotated[Optional[str], Query(description="文物编号筛选")] = None,
+    cursor: Annotated[Optional[str], Query(description="分页游标（上一页的 next_cursor）")] = None,
+    total_mode: Annotated[
+        str, Query(pattern=TOTAL_MODE_PATTERN, description="总数计算方式：exact 精确 / estimate 近似 / none 不计算")
+    ] = TOTAL_EXACT,
     db: Session = Depends(get_db),
 ):
     """
     获取文物列表
 
-    支持分页和按文物编号筛选
+    支持分页和按文物编号筛选。翻页时传入上一页的 next_cursor，
+    深分页不再随页码变慢（skip 仍可用，但需要扫描前面的记录）
     """
-    artifacts, total = ArtifactService.get_all(db, skip=skip, limit=limit, artifact_id=artifact_id)
+    artifacts, total, next_cursor = ArtifactService.get_all(
+        db, skip=skip, limit=limit, artifact_id=artifact_id, cursor=cursor, total_mode=total_mode
+    )
+
+    return ArtifactListResponse(
+        total=total,
+        items=[ArtifactResponse.model_validate(a) for a in artifacts],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/search", response_model=ArtifactListResponse)
+def search_artifacts(
+    q: Annotated[str, Query(min_length=1, max_length=100, description="检索关键词（编号、名称、作者、类别、年代）")],
+    skip: Annotated[int, Query(ge=0, description="跳过记录数")] = 0,
+    limit: Annotated[int, Query(ge=1, le=100, description="返回记录数")] = 20,
+    db: Session = Depends(get_db),
+):
+    """
+    全文检索文物
+
+    中文按二元组匹配（多个关键词需全部命中），结果按相关度排序
+    """
+    artifacts, total = ArtifactService.search(db, q, skip=skip, limit=limit)
 
     return ArtifactListResponse(
         total=total,
@@ -67,6 +101,7 @@ def get_artifact(
 async def create_artifact(
     data: ArtifactCreate,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     _current_user: User = Depends(get_current_user),
 ):
     """
@@ -75,7 +110,11 @@ async def create_artifact(
     所有角色都可以创建文物
     """
     try:
-        artifact = ArtifactService.create(db, data)
+        if async_db is not None:
+            artifact = await AsyncArtifactService.create(async_db, data)
+        else:
+            # 同步会话放到线程池中执行，不阻塞事件循环
+            artifact = await run_in_threadpool(ArtifactService.create, db, data)
         return ArtifactResponse.model_validate(artifact)
     except ValueError as e:
         raise HTTPException(
@@ -84,11 +123,44 @@ async def create_artifact(
         )
 
 
+@router.post("/import", response_model=ArtifactImportReport)
+def import_artifacts(
+    file: Annotated[UploadFile, File(description="CSV（带表头）或 JSONL 文件，字段同创建文物")],
+    file_format: Annotated[
+        Optional[str], Query(alias="format", pattern=IMPORT_FORMAT_PATTERN, description="文件格式，默认按扩展名判断")
+    ] = None,
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(PermissionChecker(["admin"])),
+):
+    """
+    批量导入文物（仅管理员）
+
+    逐行校验并按批插入，编号已存在的行跳过；
+    返回导入、跳过、失败的行数及逐行错误原因
+    """
+    file_format = file_format or ArtifactImporter.detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无法判断文件格式，请使用 .csv / .jsonl 文件或指定 format 参数"
+        )
+
+    # 按文本流逐行读取上传文件，不整体载入内存
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return ArtifactImporter.run(db, stream, file_format)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="文件必须是 UTF-8 编码")
+    finally:
+        stream.detach()
+
+
 @router.put("/{artifact_id}", response_model=ArtifactResponse)
 async def update_artifact(
     artifact_id: int,
     data: ArtifactUpdate,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     _current_user: User = Depends(get_current_user),
 ):
     """
@@ -96,14 +168,20 @@ async def update_artifact(
 
     所有角色都可以更新文物信息
     """
-    artifact = ArtifactService.get_by_id(db, artifact_id)
+    if async_db is not None:
+        artifact = await AsyncArtifactService.get_by_id(async_db, artifact_id)
+    else:
+        artifact = await run_in_threadpool(ArtifactService.get_by_id, db, artifact_id)
     if not artifact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="文物不存在"
         )
 
-    updated_artifact = ArtifactService.update(db, artifact, data)
+    if async_db is not None:
+        updated_artifact = await AsyncArtifactService.update(async_db, artifact, data)
+    else:
+        updated_artifact = await run_in_threadpool(ArtifactService.update, db, artifact, data)
     return ArtifactResponse.model_validate(updated_artifact)
 
 
@@ -111,6 +189,7 @@ async def update_artifact(
 async def delete_artifact(
     artifact_id: int,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     _current_user: User = Depends(PermissionChecker(["admin"])),
 ):
     """
@@ -118,14 +197,20 @@ async def delete_artifact(
 
     仅管理员可以删除文物
     """
-    artifact = ArtifactService.get_by_id(db, artifact_id)
+    if async_db is not None:
+        artifact = await AsyncArtifactService.get_by_id(async_db, artifact_id)
+    else:
+        artifact = await run_in_threadpool(ArtifactService.get_by_id, db, artifact_id)
     if not artifact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="文物不存在"
         )
 
-    ArtifactService.delete(db, artifact)
+    if async_db is not None:
+        await AsyncArtifactService.delete(async_db, artifact)
+    else:
+        await run_in_threadpool(ArtifactService.delete, db, artifact)
 
     return MessageResponse(
         message="文物删除成功",
@@ -6,15 +6,17 @@
 import logging
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.deps import ACCESS_TOKEN_COOKIE, get_current_user
+from app.core.security import create_access_token, get_password_hash_async, verify_and_update_password
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
+from app.services.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
@@ -42,44 +44,38 @@ def simple_login():
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     用户注册
 
     创建新用户账号（仅管理员可用）
     """
     # 检查用户名是否已存在
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await run_in_threadpool(UserService.get_by_username, db, user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="用户名已存在"
         )
 
-    # 创建新用户
-    new_user = User(
-        username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
-        role=user_data.role
-    )
-
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    return new_user
+    # 创建新用户（哈希在专用线程池中计算）
+    password_hash = await get_password_hash_async(user_data.password)
+    return await run_in_threadpool(UserService.create, db, user_data.username, password_hash, user_data.role)
 
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, response: Response, db: Session = Depends(get_db)):
     """
     用户登录
 
-    验证用户名和密码，返回访问令牌
+    验证用户名和密码，返回访问令牌。
+    同时写入 HttpOnly 的访问令牌 Cookie，供 <img> 访问需要认证的上传文件和缩略图。
+    密码验证在专用线程池中进行，不阻塞其他请求；
+    哈希的成本参数过时时自动按当前参数重新哈希
     """
     try:
         # 查找用户
-        user = db.query(User).filter(User.username == user_data.username).first()
+        user = await run_in_threadpool(UserService.get_by_username, db, user_data.username)
 
         # 验证用户是否存在
         if not user:
@@ -89,11 +85,14 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             )
 
         # 验证密码
-        if not verify_password(user_data.password, user.password_hash):
+        valid, new_hash = await verify_and_update_password(user_data.password, user.password_hash)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="用户名或密码错误"
             )
+        if new_hash:
+            user = await run_in_threadpool(UserService.update, db, user, password_hash=new_hash)
 
         # 创建访问令牌
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -102,6 +101,15 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             expires_delta=access_token_expires
         )
 
+        response.set_cookie(
+            ACCESS_TOKEN_COOKIE,
+            access_token,
+            max_age=int(access_token_expires.total_seconds()),
+            httponly=True,
+            samesite="strict",
+            secure=settings.ENVIRONMENT == "production",
+        )
+
         user_response = UserResponse.model_validate(user)
 
         return Token(
@@ -130,14 +138,17 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-def logout():
+def logout(response: Response):
     """
     用户注销（可选）
 
     注意：由于使用 JWT，无需在服务器端注销。
-    客户端删除 token 即可。
+    客户端删除 token 即可，这里清除上传文件访问用的 Cookie。
     如果需要实现黑名单，可以使用 Redis 存储。
     """
+    response.delete_cookie(
+        ACCESS_TOKEN_COOKIE, httponly=True, samesite="strict", secure=settings.ENVIRONMENT == "production"
+    )
     return {
         "message": "注销成功",
         "note": "客户端应删除存储的 token"
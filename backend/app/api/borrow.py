@@ -7,8 +7,11 @@ from datetime import date
 from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
 from app.core.deps import get_current_user, PermissionChecker
 from app.models.user import User
 from app.schemas.borrow import (
@@ -17,9 +20,10 @@ from app.schemas.borrow import (
     BorrowRecordListResponse,
 )
 from app.schemas.common import MessageResponse
-from app.services.borrow_service import BorrowRecordService
-from app.utils.file import FileUploadService
-from app.core.database import get_db
+from app.services.borrow_service import AsyncBorrowRecordService, BorrowRecordService
+from app.utils.file import TEMP_DIR, FileUploadService
+from app.core.database import get_async_db, get_db
+from app.utils.pagination import TOTAL_EXACT, TOTAL_MODE_PATTERN
 
 router = APIRouter(prefix="/borrow-records", tags=["借出记录"])
 
@@ -29,21 +33,26 @@ def get_borrow_records(
     skip: Annotated[int, Query(ge=0, description="跳过记录数")] = 0,
     limit: Annotated[int, Query(ge=1, le=100, description="返回记录数")] = 10,
     artifact_id: Annotated[Optional[str], Query(description="文物编号筛选")] = None,
+    cursor: Annotated[Optional[str], Query(description="分页游标（上一页的 next_cursor）")] = None,
+    total_mode: Annotated[
+        str, Query(pattern=TOTAL_MODE_PATTERN, description="总数计算方式：exact 精确 / estimate 近似 / none 不计算")
+    ] = TOTAL_EXACT,
     db: Session = Depends(get_db),
 ):
     """
     获取借出记录列表
 
     默认只显示未归还的记录
-    支持按文物编号筛选
+    支持按文物编号筛选，翻页时传入上一页的 next_cursor
     """
-    records, total = BorrowRecordService.get_all(
-        db, skip=skip, limit=limit, artifact_id=artifact_id
+    records, total, next_cursor = BorrowRecordService.get_all(
+        db, skip=skip, limit=limit, artifact_id=artifact_id, cursor=cursor, total_mode=total_mode
     )
 
     return BorrowRecordListResponse(
         total=total,
-        items=[BorrowRecordResponse.model_validate(r) for r in records]
+        items=[BorrowRecordResponse.model_validate(r) for r in records],
+        next_cursor=next_cursor
     )
 
 
@@ -91,19 +100,23 @@ def get_borrow_record_by_artifact_id(
 @router.post("", response_model=BorrowRecordResponse, status_code=status.HTTP_201_CREATED)
 async def create_borrow_record(
     artifact_id: Annotated[int, Query(description="文物 ID")],
-    borrow_photo: Annotated[UploadFile, File(description="借出照片")],
+    # FastAPI 不支持 Optional[list[UploadFile]] 形式的文件参数，默认值 None 表示未上传
+    borrow_photo: Annotated[list[UploadFile], File(description="借出照片（可多张，第一张为主照片）")] = None,
+    photo_path: Annotated[list[str] | None, Query(description="已上传的临时照片路径（可多张，代替 borrow_photo）")] = None,
     borrow_date: Annotated[date, Query(description="借出日期")] = None,
     expected_return_date: Annotated[date | None, Query(description="预计归还日期")] = None,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     _current_user: User = Depends(PermissionChecker()),  # 所有登录用户可创建
 ):
     """
     创建借出记录（借出存档）
 
-    上传借出照片并创建借出记录
+    上传借出照片（照片组：多角度、细节照片）并创建借出记录
+    已通过 /upload 或 /upload/batch 预览过的照片可传 photo_path，直接移入正式目录，无需再次上传
 
     流程：
-    1. 上传借出照片
+    1. 上传借出照片（或确认临时照片）
     2. 创建借出记录
     3. 文物状态标记为"已借出"
     """
@@ -112,25 +125,33 @@ async def create_borrow_record(
         borrow_date = date.today()
 
     # 保存上传的照片
-    photo_path = await FileUploadService.validate_and_save_upload(
+    saved = await FileUploadService.save_photos(
         borrow_photo,
-        subdirectory="borrow"
+        photo_path,
+        subdirectory="borrow",
+        db=db
     )
+    photo_urls = [path for path, _ in saved]
 
     # 创建借出记录数据
     data = BorrowRecordCreate(
         artifact_id=artifact_id,
-        borrow_photo_url=photo_path,
+        borrow_photo_url=photo_urls[0],
+        photo_urls=photo_urls,
         borrow_date=borrow_date,
         expected_return_date=expected_return_date
     )
 
     try:
-        record = BorrowRecordService.create(db, data, operator=_current_user)
+        if async_db is not None:
+            record = await AsyncBorrowRecordService.create(async_db, data, operator=_current_user)
+        else:
+            # 同步会话放到线程池中执行，不阻塞事件循环
+            record = await run_in_threadpool(BorrowRecordService.create, db, data, _current_user)
         return BorrowRecordResponse.model_validate(record)
     except ValueError as e:
-        # 删除已上传的照片
-        FileUploadService.delete_file(photo_path)
+        # 删除已上传的照片（临时照片放回临时目录，便于重试）
+        await run_in_threadpool(FileUploadService.discard_photos, saved, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -157,7 +178,8 @@ def delete_borrow_record(
         )
 
     # 删除关联的照片文件
-    FileUploadService.delete_file(record.borrow_photo_url)
+    for photo_url in record.photo_urls():
+        FileUploadService.delete_file(photo_url, db)
 
     # 删除记录
     BorrowRecordService.delete(db, record)
@@ -171,6 +193,7 @@ def delete_borrow_record(
 @router.post("/upload", response_model=dict)
 async def upload_photo(
     file: Annotated[UploadFile, File(description="照片文件")],
+    db: Session = Depends(get_db),
     _current_user: User = Depends(PermissionChecker()),
 ):
     """
@@ -181,7 +204,8 @@ async def upload_photo(
     # 保存照片
     photo_path = await FileUploadService.validate_and_save_upload(
         file,
-        subdirectory="temp"  # 临时目录，确认后会移动
+        subdirectory=TEMP_DIR,  # 临时目录，确认后会移动
+        db=db
     )
 
     return {
@@ -189,3 +213,42 @@ async def upload_photo(
         "photo_url": FileUploadService.get_file_url(photo_path),
         "photo_path": photo_path
     }
+
+
+@router.post("/upload/batch", response_model=dict)
+async def upload_photos(
+    files: Annotated[list[UploadFile], File(description="照片文件（多角度、细节照片）")],
+    db: Session = Depends(get_db),
+    _current_user: User = Depends(PermissionChecker()),
+):
+    """
+    批量上传照片
+
+    照片组的预览上传接口，返回的 photo_path 可在创建借出/归还记录时一并确认
+    """
+    if len(files) > settings.MAX_PHOTOS_PER_RECORD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"照片过多。每次最多 {settings.MAX_PHOTOS_PER_RECORD} 张"
+        )
+
+    photo_paths: list[str] = []
+    try:
+        for file in files:
+            photo_paths.append(await FileUploadService.validate_and_save_upload(
+                file,
+                subdirectory=TEMP_DIR,
+                db=db
+            ))
+    except HTTPException:
+        for photo_path in photo_paths:
+            FileUploadService.delete_file(photo_path, db, unclaimed=True)
+        raise
+
+    return {
+        "message": f"成功上传 {len(photo_paths)} 张照片",
+        "photos": [
+            {"photo_url": FileUploadService.get_file_url(path), "photo_path": path}
+            for path in photo_paths
+        ]
+    }
@@ -0,0 +1,57 @@
+"""
+数据导出 API 路由
+
+供审计使用的全量导出：文物、借出记录、归还记录（含比对结论），
+响应体流式生成，不受列表接口 limit 上限约束
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import PermissionChecker
+from app.models.user import User
+from app.services.export_service import (
+    DATASET_PATTERN,
+    EXPORT_FORMAT_PATTERN,
+    FORMAT_NDJSON,
+    ExportService,
+)
+
+router = APIRouter(prefix="/exports", tags=["数据导出"])
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: Annotated[
+        str, Path(pattern=DATASET_PATTERN, description="数据集：artifacts / borrow-records / return-records")
+    ],
+    file_format: Annotated[
+        str, Query(alias="format", pattern=EXPORT_FORMAT_PATTERN, description="导出格式：ndjson / csv")
+    ] = FORMAT_NDJSON,
+    gzip: Annotated[bool, Query(description="是否 gzip 压缩")] = False,
+    db: Session = Depends(get_db),
+    _: User = Depends(PermissionChecker(["admin"])),
+):
+    """
+    流式导出数据集（仅管理员）
+
+    按主键顺序输出全部记录，以附件形式下载
+
+    Args:
+        dataset: 数据集名称
+        file_format: ndjson / csv
+        gzip: 是否 gzip 压缩
+        db: 数据库会话（仅用于取得数据库引擎，导出使用独立会话）
+
+    Returns:
+        StreamingResponse
+    """
+    filename = ExportService.filename(dataset, file_format, gzip)
+    return StreamingResponse(
+        ExportService.stream(db.get_bind(), dataset, file_format, compress=gzip),
+        media_type=ExportService.media_type(file_format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
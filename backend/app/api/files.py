@@ -0,0 +1,37 @@
+"""
+上传文件访问路由
+
+挂载 /uploads：校验登录状态和路径后返回文件。
+UPLOAD_SERVE_MODE=static 时由应用发送文件，x-accel 时文件内容由 nginx 通过 X-Accel-Redirect 发送
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.deps import get_file_user
+from app.models.user import User
+from app.utils.file_response import UPLOAD_CACHE_CONTROL, upload_file_response
+from app.utils.resumable_upload import RESUMABLE_DIR
+
+router = APIRouter(prefix="/uploads", tags=["上传文件"])
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def get_upload_file(file_path: str, _current_user: User = Depends(get_file_user)):
+    """
+    访问上传文件（需登录，<img> 请求使用登录时写入的 Cookie）
+
+    禁止访问 uploads 目录之外的文件、隐藏文件（缩略图缓存等）和未完成的断点续传
+    """
+    upload_dir = settings.UPLOAD_DIR.resolve()
+    full_path = (upload_dir / file_path).resolve()
+    relative = full_path.relative_to(upload_dir).parts if upload_dir in full_path.parents else ()
+
+    if (
+        not relative
+        or relative[0] == RESUMABLE_DIR
+        or any(part.startswith(".") for part in relative)
+        or not full_path.is_file()
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+
+    return upload_file_response(full_path, headers={"Cache-Control": UPLOAD_CACHE_CONTROL})
@@ -0,0 +1,55 @@
+"""
+图片缩略图 API 路由
+
+按需生成并缓存缩放后的照片，供列表和详情页展示
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.core.deps import get_file_user
+from app.models.user import User
+from app.utils.file_response import UPLOAD_CACHE_CONTROL, upload_file_response
+from app.utils.image_cache import ImageDerivativeCache
+
+router = APIRouter(prefix="/images", tags=["图片"])
+
+# 缩略图内容由 ETag 唯一确定，与原图一样只允许浏览器长期缓存（x-accel 模式下由 nginx 发送缓存文件）
+CACHE_CONTROL = UPLOAD_CACHE_CONTROL
+
+
+@router.get("/{photo_path:path}")
+def get_image_derivative(
+    photo_path: str,
+    request: Request,
+    w: Annotated[int, Query(ge=16, le=4096, description="宽度（对齐到允许的档位）")] = 640,
+    format: Annotated[str, Query(pattern="^(webp|jpeg|png)$", description="输出格式")] = "webp",
+    q: Annotated[int, Query(ge=1, le=95, description="输出质量（对齐到允许的档位，PNG 忽略）")] = 80,
+    _current_user: User = Depends(get_file_user),
+):
+    """
+    获取缩放后的照片（需登录，与 /uploads 一样接受登录 Cookie）
+
+    photo_path 为相对于 uploads 目录的路径（如 borrow/xxx.jpg），
+    缩略图首次请求时生成并缓存，之后直接返回缓存文件；
+    ETag 由原图和对齐后的参数决定，If-None-Match 匹配时不读取、不生成缩略图
+    """
+    try:
+        derivative = ImageDerivativeCache.lookup(photo_path, w, format, q)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="图片不存在")
+
+    headers = {"ETag": f'"{derivative.etag}"', "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if f'"{derivative.etag}"' in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        cache_path = ImageDerivativeCache.ensure(derivative)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="图片不存在")
+    except OSError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"无法处理的图片: {str(e)}")
+
+    return upload_file_response(cache_path, media_type=derivative.media_type, headers=headers)
@@ -7,7 +7,9 @@ from datetime import date
 from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.deps import get_current_user, PermissionChecker
 from app.models.user import User
@@ -17,10 +19,12 @@ from app.schemas.return_record import (
     UpdateConclusionRequest,
 )
 from app.schemas.common import MessageResponse
-from app.services.return_service import ReturnRecordService
-from app.services.borrow_service import BorrowRecordService
+from app.services.return_service import AsyncReturnRecordService, ReturnRecordService
+from app.services.borrow_service import AsyncBorrowRecordService, BorrowRecordService
 from app.utils.file import FileUploadService
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.utils.comparison import DIMENSION_PATTERN, DIMENSION_STATUS_PATTERN
+from app.utils.pagination import TOTAL_EXACT, TOTAL_MODE_PATTERN
 
 router = APIRouter(prefix="/return-records", tags=["归还记录"])
 
@@ -30,14 +34,64 @@ def get_return_records(
     skip: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 10,
     artifact_id: Annotated[Optional[str], Query()] = None,
+    cursor: Annotated[Optional[str], Query()] = None,
+    total_mode: Annotated[str, Query(pattern=TOTAL_MODE_PATTERN)] = TOTAL_EXACT,
     db: Session = Depends(get_db),
 ):
-    """获取归还记录列表"""
-    records, total = ReturnRecordService.get_all(db, skip=skip, limit=limit, artifact_id=artifact_id)
+    """获取归还记录列表（翻页时传入上一页的 next_cursor）"""
+    records, total, next_cursor = ReturnRecordService.get_all(
+        db, skip=skip, limit=limit, artifact_id=artifact_id, cursor=cursor, total_mode=total_mode
+    )
+
+    return ReturnRecordListResponse(
+        total=total,
+        items=[ReturnRecordResponse.model_validate(r) for r in records],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/search", response_model=ReturnRecordListResponse)
+def search_return_records(
+    dimension: Annotated[Optional[str], Query(pattern=DIMENSION_PATTERN, description="对比维度")] = None,
+    min_score: Annotated[Optional[int], Query(ge=0, le=100, description="维度最低分数")] = None,
+    max_score: Annotated[Optional[int], Query(ge=0, le=100, description="维度最高分数")] = None,
+    status: Annotated[Optional[str], Query(pattern=DIMENSION_STATUS_PATTERN, description="维度状态")] = None,
+    min_confidence: Annotated[Optional[int], Query(ge=0, le=100, description="最低总体置信度")] = None,
+    max_confidence: Annotated[Optional[int], Query(ge=0, le=100, description="最高总体置信度")] = None,
+    final_conclusion: Annotated[Optional[str], Query(pattern="^(authentic|suspicious|fake)$")] = None,
+    date_from: Annotated[Optional[date], Query(description="归还日期起")] = None,
+    date_to: Annotated[Optional[date], Query(description="归还日期止")] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    cursor: Annotated[Optional[str], Query()] = None,
+    total_mode: Annotated[str, Query(pattern=TOTAL_MODE_PATTERN)] = TOTAL_EXACT,
+    db: Session = Depends(get_db),
+):
+    """
+    按对比分数筛选归还记录
+
+    例：dimension=seal&max_score=79 查询印章分数低于 80 的归还记录；
+    未指定 dimension 时，分数/状态条件匹配任一维度
+    """
+    records, total, next_cursor = ReturnRecordService.search(
+        db,
+        dimension=dimension,
+        min_score=min_score,
+        max_score=max_score,
+        status=status,
+        min_confidence=min_confidence,
+        max_confidence=max_confidence,
+        final_conclusion=final_conclusion,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        cursor=cursor,
+        total_mode=total_mode,
+    )
 
     return ReturnRecordListResponse(
         total=total,
-        items=[ReturnRecordResponse.model_validate(r) for r in records]
+        items=[ReturnRecordResponse.model_validate(r) for r in records],
+        next_cursor=next_cursor
     )
 
 
@@ -57,23 +111,31 @@ def get_return_record(
 @router.post("", response_model=ReturnRecordResponse, status_code=201)
 async def create_return_record(
     borrow_record_id: Annotated[int, Query(description="借出记录 ID")],
-    return_photo: Annotated[UploadFile, File(description="归还照片")],
+    return_photo: Annotated[list[UploadFile], File(description="归还照片（可多张，第一张为主照片）")] = None,
+    photo_path: Annotated[list[str] | None, Query(description="已上传的临时照片路径（可多张，代替 return_photo）")] = None,
     use_mock: Annotated[bool, Query(description="是否使用 mock AI 结果")] = False,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     _current_user: User = Depends(PermissionChecker()),
 ):
     """
     创建归还记录（收回对比）
 
+    支持照片组：所有 借出×归还 照片并行对比，按相似度一一配对后聚合结果
+    已通过 /borrow-records/upload 或 /upload/batch 预览过的照片可传 photo_path，直接移入正式目录
+
     流程：
     1. 验证借出记录存在
-    2. 上传归还照片
+    2. 上传归还照片（或确认临时照片）
     3. 调用 AI 对比服务
     4. 保存对比结果
     5. 更新借出记录状态为已归还
     """
     # 检查借出记录
-    borrow_record = BorrowRecordService.get_by_id(db, borrow_record_id)
+    if async_db is not None:
+        borrow_record = await AsyncBorrowRecordService.get_by_id(async_db, borrow_record_id)
+    else:
+        borrow_record = await run_in_threadpool(BorrowRecordService.get_by_id, db, borrow_record_id)
     if not borrow_record:
         raise HTTPException(status_code=404, detail="借出记录不存在")
 
@@ -81,7 +143,8 @@ async def create_return_record(
         raise HTTPException(status_code=400, detail="该借出记录已归还")
 
     # 保存归还照片
-    photo_path = await FileUploadService.validate_and_save_upload(return_photo, "return")
+    saved = await FileUploadService.save_photos(return_photo, photo_path, "return", db=db)
+    photo_urls = [path for path, _ in saved]
 
     # 调用 AI 对比服务
     try:
@@ -93,10 +156,11 @@ async def create_return_record(
         sys.path.insert(0, str(Path(__file__).parent.parent.parent))
         from ai_service.api import AIService
 
-        # 执行 AI 对比
-        comparison_result = AIService.compare(
-            borrow_record.borrow_photo_url,
-            photo_path,
+        # 执行 AI 对比（照片组并行对比，CPU 密集，放到线程池中执行）
+        comparison_result = await run_in_threadpool(
+            AIService.compare_sets,
+            borrow_record.photo_urls(),
+            photo_urls,
             use_mock=use_mock
         )
 
@@ -106,13 +170,22 @@ async def create_return_record(
         comparison_result = generate_mock_comparison_result()
 
     # 创建归还记录
-    record = ReturnRecordService.create(
-        db,
+    record_data = dict(
         borrow_record_id=borrow_record_id,
-        return_photo_url=photo_path,
+        return_photo_url=photo_urls[0],
         comparison_result=comparison_result,
-        operator_id=_current_user.id
+        operator_id=_current_user.id,
+        photo_urls=photo_urls
     )
+    try:
+        if async_db is not None:
+            record = await AsyncReturnRecordService.create(async_db, **record_data)
+        else:
+            record = await run_in_threadpool(ReturnRecordService.create, db, **record_data)
+    except ValueError as e:
+        # 对比期间已被并发归还或照片已被确认：事务已整体回滚，撤销本次保存的照片
+        await run_in_threadpool(FileUploadService.discard_photos, saved, db)
+        raise HTTPException(status_code=400, detail=str(e))
 
     return ReturnRecordResponse.model_validate(record)
 
@@ -171,8 +244,8 @@ def delete_return_record(
         raise HTTPException(status_code=404, detail="归还记录不存在")
 
     # 删除关联照片
-    if record.return_photo_url:
-        FileUploadService.delete_file(record.return_photo_url)
+    for photo_url in record.photo_urls():
+        FileUploadService.delete_file(photo_url, db)
 
     db.delete(record)
     db.commit()
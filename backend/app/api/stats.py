@@ -0,0 +1,45 @@
+"""
+统计 API 路由
+
+为仪表盘提供归还结论统计和逾期借出统计
+"""
+from datetime import date
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.schemas.stats import ConclusionStatsResponse, OverdueStatsResponse
+from app.services.stats_service import GROUP_BY_PATTERN, StatsService
+
+router = APIRouter(prefix="/stats", tags=["统计"])
+
+
+@router.get("/conclusions", response_model=ConclusionStatsResponse)
+def get_conclusion_stats(
+    group_by: Annotated[
+        str, Query(pattern=GROUP_BY_PATTERN, description="分组方式：month 月份 / year 年份 / category 类别 / operator 操作员")
+    ] = "month",
+    date_from: Annotated[Optional[date], Query(description="起始日期（按所在月份计）")] = None,
+    date_to: Annotated[Optional[date], Query(description="截止日期（按所在月份计，含当月）")] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    """
+    归还结论统计
+
+    统计真品 / 存疑 / 仿品 / 尚无结论的归还记录数，读取增量维护的汇总表
+    """
+    return StatsService.conclusion_stats(db, group_by=group_by, date_from=date_from, date_to=date_to)
+
+
+@router.get("/overdue", response_model=OverdueStatsResponse)
+def get_overdue_stats(
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    """逾期借出统计（预计归还日期已过仍未归还）"""
+    return StatsService.overdue_stats(db)
@@ -0,0 +1,118 @@
+"""
+上传 API 路由
+
+断点续传上传（类似 tus 协议），用于在不稳定网络下上传大尺寸扫描件：
+1. POST   /uploads/resumable              创建上传会话
+2. PATCH  /uploads/resumable/{id}         按 Upload-Offset 上传分片
+3. HEAD   /uploads/resumable/{id}         查询已接收的偏移量（断线后续传）
+4. POST   /uploads/resumable/{id}/complete 完成上传，返回 photo_path
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import get_db
+from app.core.deps import PermissionChecker
+from app.models.user import User
+from app.schemas.common import MessageResponse
+from app.schemas.upload import (
+    ResumableUploadComplete,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
+)
+from app.utils.file import FileUploadService
+from app.utils.resumable_upload import ResumableUploadService
+
+router = APIRouter(prefix="/uploads", tags=["上传"])
+
+
+def _offset_headers(upload: dict) -> dict:
+    return {
+        "Upload-Offset": str(upload["offset"]),
+        "Upload-Length": str(upload["size"]),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("/resumable", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+def create_resumable_upload(
+    data: ResumableUploadCreate,
+    response: Response,
+    current_user: User = Depends(PermissionChecker()),
+):
+    """
+    创建断点续传上传会话
+
+    文件大小上限为 MAX_RESUMABLE_UPLOAD_SIZE，单个分片不超过 MAX_UPLOAD_SIZE
+    """
+    upload = ResumableUploadService.create(data.filename, data.size, current_user.id)
+    response.headers["Location"] = f"/api/uploads/resumable/{upload['upload_id']}"
+    return upload
+
+
+@router.head("/resumable/{upload_id}")
+def head_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(PermissionChecker()),
+):
+    """查询已接收的偏移量（Upload-Offset 响应头）"""
+    upload = ResumableUploadService.status(upload_id, current_user.id)
+    return Response(status_code=status.HTTP_200_OK, headers=_offset_headers(upload))
+
+
+@router.get("/resumable/{upload_id}", response_model=ResumableUploadResponse)
+def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(PermissionChecker()),
+):
+    """查询上传状态"""
+    return ResumableUploadService.status(upload_id, current_user.id)
+
+
+@router.patch("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def patch_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: Annotated[int, Header(alias="Upload-Offset", ge=0, description="分片起始位置")],
+    current_user: User = Depends(PermissionChecker()),
+):
+    """
+    上传分片
+
+    请求体为原始字节（Content-Type: application/offset+octet-stream），
+    Upload-Offset 必须等于已接收的字节数；响应头 Upload-Offset 为写入后的偏移量
+    """
+    offset = await ResumableUploadService.append(upload_id, upload_offset, request.stream(), current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(offset)})
+
+
+@router.post("/resumable/{upload_id}/complete", response_model=ResumableUploadComplete)
+async def complete_resumable_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(PermissionChecker()),
+):
+    """
+    完成上传
+
+    校验图片并存入临时目录，返回的 photo_path 可直接用于创建借出/归还记录
+    """
+    saved = await run_in_threadpool(ResumableUploadService.complete, upload_id, current_user.id, db)
+    return ResumableUploadComplete(
+        photo_path=saved.relative_path,
+        photo_url=FileUploadService.get_file_url(saved.relative_path),
+        sha256=saved.sha256,
+        size=saved.size,
+    )
+
+
+@router.delete("/resumable/{upload_id}", response_model=MessageResponse)
+def abort_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(PermissionChecker()),
+):
+    """取消上传"""
+    ResumableUploadService.abort(upload_id, current_user.id)
+    return MessageResponse(message="上传已取消", success=True)
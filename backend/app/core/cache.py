@@ -0,0 +1,259 @@
+"""
+古玩字画智能对比系统 - 查询缓存
+
+按主键/业务键缓存很少变化的行（文物、活跃借出记录），在写入后主动失效：
+- memory: 进程内 TTL + LRU 缓存，多个 worker 各自缓存，最长 CACHE_TTL_SECONDS 内可能读到旧数据
+  （活跃借出记录、当前用户等不能长时间过期的数据改用较短的有效期，见 shared_ttl）
+- redis: 使用 REDIS_* 配置，所有 worker 共享同一份缓存，失效对所有 worker 立即生效
+- none: 不缓存
+
+缓存的是列值而不是 ORM 对象：命中时通过 Session.merge(load=False) 把对象放回会话，
+不发出查询，之后的修改、删除和关系懒加载都照常工作
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, TypeVar
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 缓存“不存在”的结果（如文物当前没有活跃借出记录）
+_MISSING = {"__missing__": True}
+
+
+class MemoryCache:
+    """进程内 TTL + LRU 缓存（值不做序列化，也可以缓存任意 Python 对象）"""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Redis 缓存（多 worker 共享）"""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis 需要安装 redis（pip install redis）")
+        self._client = redis.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+        self._errors = (redis.RedisError,)
+
+    def get(self, key: str) -> str | None:
+        try:
+            return self._client.get(key)
+        except self._errors as e:
+            # Redis 不可用时退回数据库查询
+            logger.warning(f"[CACHE] Redis get failed: {e}")
+            return None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            self._client.set(key, value, ex=ttl)
+        except self._errors as e:
+            logger.warning(f"[CACHE] Redis set failed: {e}")
+
+    def delete(self, *keys: str) -> None:
+        try:
+            self._client.delete(*keys)
+        except self._errors as e:
+            logger.error(f"[CACHE] Redis delete failed, entries may stay stale until TTL: {e}")
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{settings.CACHE_KEY_PREFIX}*"):
+            self._client.delete(key)
+
+
+class NullCache:
+    """不缓存"""
+
+    def get(self, key: str) -> str | None:
+        return None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+def _create_backend():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.REDIS_URL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(settings.CACHE_MAX_ENTRIES)
+    return NullCache()
+
+
+cache = _create_backend()
+
+
+def cache_key(*parts: Any) -> str:
+    """生成缓存键，如 cache_key("artifact", "id", 1) -> "antique:artifact:id:1" """
+    return settings.CACHE_KEY_PREFIX + ":".join(str(part) for part in parts)
+
+
+def _encode_row(instance: Any, exclude: tuple[str, ...] = ()) -> str:
+    """将 ORM 对象的列值编码为 JSON（exclude 中的列不缓存，访问时按需加载）"""
+    data = {}
+    for attr in instance.__mapper__.column_attrs:
+        if attr.key in exclude:
+            continue
+        value = getattr(instance, attr.key)
+        data[attr.key] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _decode_row(db: Session, model: type[T], raw: str) -> T | None:
+    """将缓存的列值还原为会话中的持久化对象（不发出查询）"""
+    data = json.loads(raw)
+    if data == _MISSING:
+        return None
+    for attr in model.__mapper__.column_attrs:
+        value = data.get(attr.key)
+        if isinstance(value, str):
+            python_type = attr.columns[0].type.python_type
+            if python_type in (date, datetime):
+                data[attr.key] = python_type.fromisoformat(value)
+    instance = model.__mapper__.class_manager.new_instance()
+    for key, value in data.items():
+        setattr(instance, key, value)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+
+def get_cached_row(db: Session, key: str, model: type[T]) -> tuple[bool, T | None]:
+    """
+    从缓存读取一行
+
+    Args:
+        db: 数据库会话
+        key: 缓存键
+        model: ORM 模型类
+
+    Returns:
+        (是否命中, 会话中的对象或缓存的 None)
+    """
+    raw = cache.get(key)
+    if raw is None:
+        return False, None
+    return True, _decode_row(db, model, raw)
+
+
+def set_cached_row(
+    key: str,
+    instance: Any | None,
+    ttl: int | None = None,
+    exclude: tuple[str, ...] = (),
+) -> None:
+    """
+    写入缓存
+
+    Args:
+        key: 缓存键
+        instance: ORM 对象，None 表示缓存“不存在”
+        ttl: 有效期（秒），默认 CACHE_TTL_SECONDS
+        exclude: 不缓存的列（如密码哈希）
+    """
+    raw = json.dumps(_MISSING) if instance is None else _encode_row(instance, exclude)
+    cache.set(key, raw, ttl or settings.CACHE_TTL_SECONDS)
+
+
+def cached_row(
+    db: Session,
+    key: str,
+    model: type[T],
+    loader,
+    cache_missing: bool = False,
+    ttl: int | None = None,
+    exclude: tuple[str, ...] = (),
+) -> T | None:
+    """
+    读穿缓存：命中时还原对象，未命中时调用 loader 查询并写入缓存
+
+    Args:
+        db: 数据库会话
+        key: 缓存键
+        model: ORM 模型类
+        loader: 无参函数，返回查询结果（对象或 None）
+        cache_missing: 是否缓存 None 结果（需要在对应的写入处失效）
+        ttl: 有效期（秒），默认 CACHE_TTL_SECONDS
+        exclude: 不缓存的列
+
+    Returns:
+        会话中的对象或 None
+    """
+    hit, instance = get_cached_row(db, key, model)
+    if hit:
+        return instance
+
+    instance = loader()
+    if instance is not None or cache_missing:
+        set_cached_row(key, instance, ttl, exclude)
+    return instance
+
+
+def shared_ttl(ttl: int, local_ttl: int) -> int:
+    """
+    需要及时对所有 worker 生效的缓存的有效期
+
+    redis 缓存由所有 worker 共享，invalidate 对所有 worker 立即生效，使用 ttl；
+    进程内缓存的失效只作用于执行写入的 worker，改用不超过 local_ttl 的有效期，
+    限制其他 worker 读到旧数据的时间
+
+    Args:
+        ttl: 共享缓存的有效期（秒）
+        local_ttl: 进程内缓存的有效期上限（秒）
+
+    Returns:
+        有效期（秒）
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return ttl
+    return min(ttl, local_ttl)
+
+
+def invalidate(*keys: str) -> None:
+    """使缓存失效（在写入提交之后调用）"""
+    cache.delete(*keys)
@@ -31,6 +31,7 @@ class Settings(BaseSettings):
     DB_USER: str = "postgres"
     DB_PASSWORD: str = ""
     USE_SQLITE: bool = True  # 开发环境使用 SQLite
+    USE_ASYNC_DB: bool = False  # 异步接口使用 AsyncSession（SQLite 需要 aiosqlite，PostgreSQL 需要 asyncpg）
 
     @property
     def DATABASE_URL(self) -> str:
@@ -41,15 +42,75 @@ class Settings(BaseSettings):
             return f"sqlite:///{db_path}"
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """构建异步数据库连接 URL（aiosqlite / asyncpg 驱动）"""
+        url = self.DATABASE_URL
+        if url.startswith("sqlite://"):
+            return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # ==================== 数据库连接池配置 ====================
+    DB_POOL_SIZE: int = 5  # 常驻连接数
+    DB_MAX_OVERFLOW: int = 10  # 连接池满时允许额外打开的连接数
+    DB_POOL_TIMEOUT: int = 30  # 取连接的最长等待时间（秒），超时报错
+    DB_POOL_RECYCLE: int = 3600  # 连接的最长使用时间（秒），超过后重建
+    DB_POOL_SLOW_CHECKOUT_MS: int = 100  # 取连接等待超过该值（毫秒）时记录警告
+
+    # ==================== SQLite 配置（USE_SQLITE 时生效）====================
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL：读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 下 NORMAL 只在检查点时 fsync
+    SQLITE_BUSY_TIMEOUT: int = 5000  # 等待写锁的时间（毫秒）
+    SQLITE_CACHE_SIZE: int = 64  # 每个连接的页缓存（MB）
+    SQLITE_MMAP_SIZE: int = 256  # 内存映射读取的上限（MB），0 表示关闭
+    SQLITE_SERIALIZE_WRITES: bool = True  # 进程内写事务排队执行，读事务并行
+
+    # ==================== 列表查询配置 ====================
+    LIST_TOTAL_CACHE_SECONDS: int = 30  # total_mode=estimate 时近似总数的缓存时间（秒）
+
     # ==================== JWT 认证配置 ====================
     SECRET_KEY: str = Field(default="your-secret-key-change-this-in-production", min_length=32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 小时
+    AUTH_TOKEN_CACHE_SECONDS: int = 300  # 已验证 token 的进程内缓存时间（秒），不超过 token 有效期
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000  # 已验证 token 缓存的最大条目数
+    AUTH_PRINCIPAL_CACHE_SECONDS: int = 60  # 当前用户信息的缓存时间（秒），仅 CACHE_BACKEND=redis 时使用
+    AUTH_PRINCIPAL_LOCAL_CACHE_SECONDS: int = 5  # 进程内缓存用户信息的时间（秒），失效只作用于当前 worker，其他 worker 最多延迟这么久
+
+    # ==================== 密码哈希配置 ====================
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt 成本参数，调高后旧哈希在用户下次登录时自动重新哈希
+    PASSWORD_HASH_WORKERS: int = 2  # 专用哈希线程数（同时进行的哈希计算上限）
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 排队等待哈希的请求上限，超出返回 503
 
     # ==================== 文件上传配置 ====================
     MAX_UPLOAD_SIZE: int = 10  # MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 流式读取上传文件的分块大小（字节）
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "gif", "webp"]
     UPLOAD_DIR: Path = Field(default_factory=lambda: Path(__file__).parent.parent.parent / "uploads")
+    UPLOAD_CONTENT_ADDRESSED: bool = False  # 按 sha256 去重存储上传文件（uploads/cas/）
+    UPLOAD_SERVE_MODE: str = "static"  # 上传文件的发送方式：static（由应用发送）/ x-accel（由 nginx 发送）
+    UPLOAD_ACCEL_PREFIX: str = "/protected-uploads/"  # x-accel 模式下 nginx 中对应 uploads 目录的 internal location
+    MAX_PHOTOS_PER_RECORD: int = 10  # 每条借出/归还记录最多的照片数（照片组）
+    MAX_RESUMABLE_UPLOAD_SIZE: int = 100  # 断点续传上传的文件大小上限（MB），单个分片仍受 MAX_UPLOAD_SIZE 限制
+    MAX_IMPORT_SIZE: int = 200  # 文物批量导入文件（CSV/JSONL）的大小上限（MB）
+
+    # ==================== 上传文件清理配置 ====================
+    UPLOAD_SWEEP_ENABLED: bool = False  # 是否在后台定期清理过期临时文件和孤立文件（会删除文件，默认关闭，可先用 dry_run 检查）
+    UPLOAD_SWEEP_INTERVAL_MINUTES: int = 60  # 清理间隔（分钟）
+    TEMP_UPLOAD_TTL_HOURS: int = 24  # uploads/temp 中未确认文件、未完成的断点续传的保留时间（小时）
+    ORPHAN_UPLOAD_GRACE_HOURS: int = 24  # 未被任何记录引用的文件的保留时间（小时）
+    UPLOAD_SWEEP_WORKERS: int = 8  # 并行扫描/删除的线程数
+
+    # ==================== 图片缩略图配置 ====================
+    IMAGE_CACHE_SUBDIR: str = ".derivatives"  # 缩略图缓存目录（位于 uploads 目录下）
+    IMAGE_CACHE_MAX_SIZE: int = 1024  # 缩略图缓存上限（MB），超出后按最近最少使用淘汰
+    IMAGE_DERIVATIVE_WIDTHS: List[int] = [160, 320, 640, 960, 1280, 1920]  # 允许生成的宽度
+    IMAGE_DERIVATIVE_QUALITIES: List[int] = [50, 65, 80, 95]  # 允许的输出质量（webp/jpeg，请求的质量对齐到最近的一档）
+
+    @property
+    def IMAGE_CACHE_DIR(self) -> Path:
+        """缩略图缓存目录"""
+        return self.UPLOAD_DIR / self.IMAGE_CACHE_SUBDIR
 
     # ==================== AI 服务配置 ====================
     AI_SERVICE_TYPE: str = "mock"  # mock, openai_vision, clip, custom
@@ -82,6 +143,13 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",")]
         return v
 
+    # ==================== 缓存配置 ====================
+    CACHE_BACKEND: str = "memory"  # memory（进程内）/ redis（多 worker 共享，使用下方 REDIS_* 配置）/ none
+    CACHE_TTL_SECONDS: int = 300  # 缓存有效期（秒），写入时主动失效
+    ACTIVE_LOAN_LOCAL_CACHE_SECONDS: int = 2  # 进程内缓存活跃借出记录的时间（秒），借出/归还后其他 worker 最多延迟这么久
+    CACHE_MAX_ENTRIES: int = 10000  # memory 后端的最大条目数（最近最少使用淘汰）
+    CACHE_KEY_PREFIX: str = "antique:"  # 缓存键前缀（共用 Redis 时区分应用）
+
     # ==================== Redis 配置（可选）====================
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -3,27 +3,143 @@
 
 配置 SQLAlchemy engine 和 session
 """
+import logging
+import threading
 from logging.config import dictConfig
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, instrument_engine
 from app.models.base import Base  # 使用统一的 Base
 
+logger = logging.getLogger(__name__)
+
 # ==================== SQLAlchemy 配置 ====================
 
-# 创建数据库引擎
+# 创建数据库引擎（连接池大小见 DB_POOL_* 配置，指标见 app.core.db_pool）
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_pre_ping=True,  # 连接前检查连接是否有效
-    pool_recycle=3600,  # 1小时后回收连接
+    pool_recycle=settings.DB_POOL_RECYCLE,  # 超过该时间后回收连接
     echo=settings.DEBUG,  # 开发环境打印 SQL
 )
+instrument_engine(engine)
 
 # 创建 SessionLocal 类
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎（USE_ASYNC_DB 开启时创建）
+# expire_on_commit=False：提交后仍可读取已加载的属性，避免在事件循环外触发隐式加载
+async_engine = None
+AsyncSessionLocal = None
+if settings.USE_ASYNC_DB:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        echo=settings.DEBUG,
+    )
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+# ==================== SQLite 生产配置 ====================
+#
+# SQLite 同一时刻只允许一个写事务。默认的回滚日志模式下读写互相阻塞，
+# 并发写入在 pysqlite 默认的 5 秒超时后报 "database is locked"。
+# - WAL：读取不阻塞写入，写入也不阻塞读取
+# - synchronous=NORMAL：WAL 下只在检查点时 fsync，断电可能丢失最近的提交，但不会损坏数据库
+# - cache_size / mmap_size：加大页缓存，读取直接走内存映射
+# - busy_timeout：拿不到写锁时由 SQLite 等待，而不是立即失败
+# - foreign_keys：SQLite 默认不检查外键，打开后与 PostgreSQL 行为一致（借出不存在的文物由外键拒绝）
+# 另外，进程内的写事务通过一把锁排队执行（SQLITE_SERIALIZE_WRITES），
+# 读事务不受影响，写线程在 Python 锁上按顺序等待，而不是在 SQLite 的忙等待中轮询
+
+_sqlite_write_lock = threading.Lock()
+_WRITE_LOCK_KEY = "sqlite_write_lock"
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """新建 SQLite 连接时设置 PRAGMA（connect 事件）"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}")
+        # 负数表示 KiB
+        cursor.execute(f"PRAGMA cache_size={-settings.SQLITE_CACHE_SIZE * 1024}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def enable_sqlite_profile(target: Engine) -> None:
+    """
+    为 SQLite 引擎启用生产配置（WAL 和各项 PRAGMA）
+
+    Args:
+        target: 同步引擎（异步引擎传入 async_engine.sync_engine）
+    """
+    event.listen(target, "connect", apply_sqlite_pragmas)
+
+
+def _acquire_write_lock(session: Session) -> None:
+    """会话第一次写入前获取写锁（同一事务内只获取一次）"""
+    if session.info.get(_WRITE_LOCK_KEY):
+        return
+    if _sqlite_write_lock.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT / 1000):
+        session.info[_WRITE_LOCK_KEY] = True
+    else:
+        # 等待超时（如同一线程嵌套使用两个写会话）时不再排队，交给 SQLite 的 busy_timeout
+        logger.warning("[SQLITE] Write lock wait timed out, falling back to busy_timeout")
+
+
+def _release_write_lock(session: Session, transaction: SessionTransaction) -> None:
+    """最外层事务结束（提交、回滚或关闭会话）时释放写锁"""
+    if transaction.parent is None and session.info.pop(_WRITE_LOCK_KEY, False):
+        _sqlite_write_lock.release()
+
+
+def enable_write_serialization(session_factory: sessionmaker) -> None:
+    """
+    进程内串行化写事务，读事务可以并行
+
+    在会话 flush 或执行 INSERT/UPDATE/DELETE 语句前获取写锁，事务结束时释放。
+    多个 worker 进程之间仍由 SQLite 的 busy_timeout 协调
+
+    Args:
+        session_factory: 同步会话工厂
+    """
+    event.listen(session_factory, "before_flush", lambda session, context, instances: _acquire_write_lock(session))
+    event.listen(
+        session_factory,
+        "do_orm_execute",
+        lambda state: _acquire_write_lock(state.session) if state.is_insert or state.is_update or state.is_delete else None,
+    )
+    event.listen(session_factory, "after_transaction_end", _release_write_lock)
+
+
+if settings.USE_SQLITE:
+    enable_sqlite_profile(engine)
+    if async_engine is not None:
+        enable_sqlite_profile(async_engine.sync_engine)
+    if settings.SQLITE_SERIALIZE_WRITES:
+        enable_write_serialization(SessionLocal)
+
 
 # ==================== 数据库依赖 ====================
 
@@ -45,6 +161,25 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    获取异步数据库会话的依赖项
+
+    USE_ASYNC_DB 关闭时返回 None，调用方退回同步会话（在线程池中执行）
+
+    使用方法：
+        @app.post("/artifacts")
+        async def create(db: AsyncSession | None = Depends(get_async_db)):
+            ...
+    """
+    if AsyncSessionLocal is None:
+        yield None
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # ==================== 日志配置 ====================
 
 dictConfig(
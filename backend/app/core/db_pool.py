@@ -0,0 +1,163 @@
+"""
+古玩字画智能对比系统 - 数据库连接池指标
+
+记录连接池的取连接等待时间、溢出连接使用和超时次数，以及 SQL 执行耗时。
+负载升高时对比两者即可判断请求是在等连接池（等待时间高、超时增加）
+还是在等数据库（SQL 耗时高）
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.schemas.admin import PoolMetricsReport
+
+logger = logging.getLogger(__name__)
+
+# 计算分位数时保留的最近样本数
+METRICS_WINDOW = 1000
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    """已排序样本的分位数"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class PoolMetrics:
+    """连接池指标（线程安全）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.queries = 0
+        self._waits: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._query_times: deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    def record_checkout(self, wait: float, overflow: int) -> None:
+        """记录一次成功取得连接（wait 为等待秒数，overflow 为当前溢出连接数）"""
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(wait)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+            if wait * 1000 >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+                logger.warning(f"[DB POOL] Slow checkout: waited {wait * 1000:.1f} ms")
+
+    def record_timeout(self, wait: float) -> None:
+        """记录一次取连接超时"""
+        with self._lock:
+            self.timeouts += 1
+            self._waits.append(wait)
+        logger.error(f"[DB POOL] Checkout timed out after {wait * 1000:.1f} ms")
+
+    def record_query(self, duration: float) -> None:
+        """记录一条 SQL 的执行耗时（秒）"""
+        with self._lock:
+            self.queries += 1
+            self._query_times.append(duration)
+
+    def snapshot(self, pool: QueuePool) -> PoolMetricsReport:
+        """
+        生成当前指标
+
+        Args:
+            pool: 指标所属的连接池
+
+        Returns:
+            连接池指标
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            query_times = sorted(self._query_times)
+            return PoolMetricsReport(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                peak_overflow=self.peak_overflow,
+                checkouts=self.checkouts,
+                overflow_checkouts=self.overflow_checkouts,
+                slow_checkouts=self.slow_checkouts,
+                timeouts=self.timeouts,
+                wait_ms_avg=sum(waits) / len(waits) * 1000 if waits else 0.0,
+                wait_ms_p95=_percentile(waits, 0.95) * 1000,
+                wait_ms_max=waits[-1] * 1000 if waits else 0.0,
+                queries=self.queries,
+                query_ms_avg=sum(query_times) / len(query_times) * 1000 if query_times else 0.0,
+                query_ms_p95=_percentile(query_times, 0.95) * 1000,
+            )
+
+
+class _InstrumentedPoolMixin:
+    """在取连接时计时的连接池（等待包括排队等待空闲连接和新建连接）"""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.overflow())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，保留累计的指标
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """带指标的 QueuePool（同步引擎）"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """带指标的 AsyncAdaptedQueuePool（异步引擎）"""
+
+
+def instrument_engine(target: Engine) -> None:
+    """
+    记录引擎上每条 SQL 的执行耗时，写入其连接池的指标
+
+    Args:
+        target: 使用 Instrumented* 连接池的同步引擎（异步引擎传入 async_engine.sync_engine）
+    """
+    metrics = target.pool.metrics  # 连接池重建后仍共享同一个 metrics
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics.record_query(time.perf_counter() - started)
+
+    @event.listens_for(target, "handle_error")
+    def _discard_timer(context):
+        # 执行失败时不会触发 after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
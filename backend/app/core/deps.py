@@ -5,16 +5,85 @@
 """
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import cache_key, get_cached_row, invalidate, set_cached_row, shared_ttl
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.security import decode_access_token_cached
 from app.models.user import User, UserRole
 
 # HTTP Bearer 认证方案
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# 登录时写入的访问令牌 Cookie，只用于 <img> 等无法携带 Authorization 头的上传文件请求
+ACCESS_TOKEN_COOKIE = "access_token"
+
+
+def principal_cache_key(user_id: int | str) -> str:
+    """当前用户信息的缓存键"""
+    return cache_key("user", "id", user_id)
+
+
+def principal_cache_ttl() -> int:
+    """
+    当前用户信息的缓存时间（秒）
+
+    进程内缓存的失效只作用于当前 worker，其他 worker 在删除用户、修改角色后
+    最多延迟 AUTH_PRINCIPAL_LOCAL_CACHE_SECONDS 秒（见 shared_ttl）
+    """
+    return shared_ttl(settings.AUTH_PRINCIPAL_CACHE_SECONDS, settings.AUTH_PRINCIPAL_LOCAL_CACHE_SECONDS)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """使用户信息缓存失效（删除用户、修改角色或密码后调用，进程内缓存只作用于当前 worker）"""
+    invalidate(principal_cache_key(user_id))
+
+
+def _load_principal(db: Session, user_id: str) -> User | None:
+    """从数据库查询用户并写入缓存（不缓存密码哈希）"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        set_cached_row(
+            principal_cache_key(user_id), user,
+            ttl=principal_cache_ttl(), exclude=("password_hash",),
+        )
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="无效的认证凭据",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _authenticate(token: str, db: Session) -> User:
+    """按访问令牌获取用户（token 和用户信息都有缓存），认证失败时抛出 401"""
+    # 解码 token
+    payload = decode_access_token_cached(token)
+
+    if payload is None:
+        raise _credentials_exception()
+
+    # 获取用户 ID
+    user_id: Optional[int] = payload.get("sub")
+    if user_id is None:
+        raise _credentials_exception()
+
+    # 先查缓存，未命中再查询数据库
+    hit, user = get_cached_row(db, principal_cache_key(user_id), User)
+    if not hit:
+        user = await run_in_threadpool(_load_principal, db, user_id)
+    if user is None:
+        raise _credentials_exception()
+
+    return user
 
 
 async def get_current_user(
@@ -24,6 +93,9 @@ async def get_current_user(
     """
     获取当前认证用户
 
+    token 验证结果和用户信息都有缓存，命中时不访问数据库；
+    未命中时在线程池中查询，不阻塞事件循环
+
     Args:
         credentials: HTTP Bearer credentials
         db: 数据库会话
@@ -34,30 +106,35 @@ async def get_current_user(
     Raises:
         HTTPException: 认证失败时
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="无效的认证凭据",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    return await _authenticate(credentials.credentials, db)
 
-    # 解码 token
-    token = credentials.credentials
-    payload = decode_access_token(token)
 
-    if payload is None:
-        raise credentials_exception
+async def get_file_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    获取访问上传文件的认证用户
 
-    # 获取用户 ID
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    先取 Authorization 头，没有时取登录写入的 access_token Cookie（<img> 请求无法携带请求头）。
+    Cookie 只在上传文件、缩略图这类只读 GET 接口上接受，其他接口仍只认 Authorization 头
 
-    # 从数据库查询用户
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    Args:
+        request: 请求对象
+        credentials: HTTP Bearer credentials（可选）
+        db: 数据库会话
 
-    return user
+    Returns:
+        当前用户对象
+
+    Raises:
+        HTTPException: 认证失败时
+    """
+    token = credentials.credentials if credentials else request.cookies.get(ACCESS_TOKEN_COOKIE)
+    if not token:
+        raise _credentials_exception()
+    return await _authenticate(token, db)
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,113 @@
+"""
+ASGI 中间件
+
+在进入路由之前处理请求体大小限制等通用逻辑
+"""
+import json
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# multipart 表单除文件内容外的额外开销（边界、字段头、其他表单字段）
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class RequestSizeLimitMiddleware:
+    """
+    请求体大小限制中间件（纯 ASGI 实现，不缓冲请求体）
+
+    - 带 Content-Length 的请求：超过限制时直接返回 413，不读取任何请求体
+    - 分块传输（无 Content-Length）的请求：边接收边计数，超过限制立即返回 413，
+      并向应用发送断开消息以停止继续读取
+
+    Args:
+        app: 下游 ASGI 应用
+        max_body_size: 允许的最大请求体字节数
+        path_limits: 按路径单独设置的限制（如多张照片的批量上传）
+    """
+
+    METHODS_WITH_BODY = {"POST", "PUT", "PATCH"}
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: dict[str, int] | None = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.METHODS_WITH_BODY:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"].rstrip("/"), self.max_body_size)
+        content_length = self._get_content_length(scope)
+
+        if content_length is not None:
+            if content_length > limit:
+                await self._send_rejection(send, limit)
+                return
+            # 服务器保证请求体不会超过声明的长度，无需逐块计数
+            await self.app(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    if not response_started:
+                        await self._send_rejection(send, limit)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            # 已返回 413 时丢弃应用后续的响应消息
+            if rejected and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # 中止读取后应用可能抛出客户端断开等异常，响应已经发送，无需再处理
+            if not rejected:
+                raise
+
+    @staticmethod
+    def _get_content_length(scope: Scope) -> int | None:
+        """读取 Content-Length 请求头，缺失或非法时返回 None"""
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    async def _send_rejection(send: Send, limit: int) -> None:
+        """发送 413 响应"""
+        body = json.dumps(
+            {"detail": f"请求体过大。最大允许 {limit // (1024 * 1024)}MB"},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -3,17 +3,32 @@
 
 密码哈希、JWT token 等
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, TypeVar
 
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import MemoryCache
 from app.core.config import settings
 
+T = TypeVar("T")
+
 # ==================== 密码哈希 ====================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 成本低于 PASSWORD_HASH_ROUNDS 的已有哈希会被标记为需要更新（见 verify_and_update_password）
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS)
+
+# bcrypt 计算时释放 GIL，专用线程池即可并行；线程数就是同时进行的哈希计算上限，
+# 不占用处理普通请求的线程池
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# 正在计算和排队的哈希请求数上限，超出时直接返回 503，避免登录高峰时请求无限堆积
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_PENDING)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -43,6 +58,58 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """
+    在专用线程池中执行哈希计算
+
+    Raises:
+        HTTPException: 排队的哈希请求已满时（503）
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录请求过多，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_slots.release()
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    验证密码（不阻塞事件循环）
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希后的密码
+
+    Returns:
+        (密码是否匹配, 新哈希)，已有哈希的成本参数过时时返回按当前参数生成的新哈希，否则为 None
+
+    Raises:
+        HTTPException: 哈希请求过多时（503）
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    获取密码哈希（不阻塞事件循环）
+
+    Args:
+        password: 明文密码
+
+    Returns:
+        哈希后的密码
+
+    Raises:
+        HTTPException: 哈希请求过多时（503）
+    """
+    return await _run_hashing(pwd_context.hash, password)
+
+
 # ==================== JWT Token ====================
 
 
@@ -85,3 +152,33 @@ def decode_access_token(token: str) -> dict[str, Any] | None:
         return payload
     except JWTError:
         return None
+
+
+# 已验证的 token -> payload（进程内，只缓存验证通过的 token）
+_token_cache = MemoryCache(settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+
+def decode_access_token_cached(token: str) -> dict[str, Any] | None:
+    """
+    解码访问令牌，验证结果在进程内缓存
+
+    同一 token 在 AUTH_TOKEN_CACHE_SECONDS 内（且不超过其过期时间）不再重复验签和解析
+
+    Args:
+        token: JWT token 字符串
+
+    Returns:
+        解码后的数据，失败返回 None
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+
+    ttl = min(settings.AUTH_TOKEN_CACHE_SECONDS, int(payload.get("exp", 0) - time.time()))
+    if ttl > 0:
+        _token_cache.set(token, payload, ttl)
+    return payload
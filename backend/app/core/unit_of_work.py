@@ -0,0 +1,84 @@
+"""
+工作单元
+
+一次业务操作涉及多个服务（如归还：创建归还记录、更新借出状态、写入照片组）时，
+各服务只向会话写入（add / execute），不各自提交，由工作单元统一提交一次：
+- 全部成功才提交，任一步骤（包括提交本身）失败整体回滚，不会出现归还记录已保存而借出状态未更新的中间状态
+- 提交后不使已加载的对象过期，数据库生成的字段已通过 RETURNING 取回，省去提交后的 refresh 查询
+- 缓存失效等副作用登记为提交后回调，只在提交成功后执行
+
+用法:
+    with UnitOfWork(db) as uow:
+        db.add(record)
+        uow.after_commit(invalidate, key)
+"""
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class UnitOfWork:
+    """同步会话的工作单元（上下文管理器，正常退出时提交，异常时回滚）"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._callbacks: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+        self._expire_on_commit = db.expire_on_commit
+
+    def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """登记提交成功后执行的回调"""
+        self._callbacks.append((callback, args))
+
+    def _run_callbacks(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback, args in callbacks:
+            callback(*args)
+
+    def __enter__(self) -> "UnitOfWork":
+        self.db.expire_on_commit = False
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        try:
+            if exc_type is None:
+                try:
+                    self.db.commit()
+                except Exception:
+                    # 提交时的约束冲突等：回滚后会话可继续使用
+                    self.db.rollback()
+                    raise
+            else:
+                self.db.rollback()
+        finally:
+            self.db.expire_on_commit = self._expire_on_commit
+        if exc_type is None:
+            self._run_callbacks()
+
+
+class AsyncUnitOfWork(UnitOfWork):
+    """异步会话的工作单元（async with）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._callbacks = []
+        self._expire_on_commit = db.sync_session.expire_on_commit
+
+    async def __aenter__(self) -> "AsyncUnitOfWork":
+        self.db.sync_session.expire_on_commit = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        try:
+            if exc_type is None:
+                try:
+                    await self.db.commit()
+                except Exception:
+                    await self.db.rollback()
+                    raise
+            else:
+                await self.db.rollback()
+        finally:
+            self.db.sync_session.expire_on_commit = self._expire_on_commit
+        if exc_type is None:
+            self._run_callbacks()
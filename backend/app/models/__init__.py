@@ -8,6 +8,10 @@ from app.models.user import User, UserRole
 from app.models.artifact import Artifact
 from app.models.borrow_record import BorrowRecord, BorrowStatus
 from app.models.return_record import ReturnRecord, ConclusionType
+from app.models.record_photo import BorrowPhoto, ReturnPhoto
+from app.models.stored_file import StoredFile
+from app.models.return_stat import ReturnStat
+from app.models.comparison_score import ReturnDimensionScore
 
 # 导出所有模型，用于 Alembic 自动发现
 __all__ = [
@@ -21,4 +25,9 @@ __all__ = [
     "BorrowStatus",
     "ReturnRecord",
     "ConclusionType",
+    "BorrowPhoto",
+    "ReturnPhoto",
+    "StoredFile",
+    "ReturnStat",
+    "ReturnDimensionScore",
 ]
\ No newline at end of file
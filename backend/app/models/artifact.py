@@ -3,10 +3,11 @@
 
 定义文物信息表结构
 """
-from sqlalchemy import String, Index
+from sqlalchemy import DDL, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel, TimestampMixin
+from app.utils.search import index_tokens
 
 
 class Artifact(BaseModel, TimestampMixin):
@@ -67,6 +68,13 @@ class Artifact(BaseModel, TimestampMixin):
         comment="年代（如 北宋/元代/明代）"
     )
 
+    # 全文检索分词（由编号、名称、作者、类别、年代生成，见 app.utils.search）
+    search_tokens: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+        comment="全文检索分词（自动生成）"
+    )
+
     # 时间戳（从 TimestampMixin 继承 created_at, updated_at）
 
     # ==================== 关系定义 ====================
@@ -76,10 +84,44 @@ class Artifact(BaseModel, TimestampMixin):
         cascade="all, delete-orphan"
     )
 
-    # 定义索引
-    __table_args__ = (
-        Index('idx_artifacts_fulltext', 'name', 'author', postgresql_using='gin'),
-    )
-
     def __repr__(self) -> str:
-        return f"<Artifact(id={self.id}, artifact_id={self.artifact_id!r}, name={self.name!r})>"
\ No newline at end of file
+        return f"<Artifact(id={self.id}, artifact_id={self.artifact_id!r}, name={self.name!r})>"
+
+    def build_search_tokens(self) -> None:
+        """根据检索字段重新生成 search_tokens"""
+        self.search_tokens = index_tokens(self.artifact_id, self.name, self.author, self.category, self.era)
+
+
+@event.listens_for(Artifact, "before_insert")
+@event.listens_for(Artifact, "before_update")
+def _refresh_search_tokens(mapper, connection, target: Artifact) -> None:
+    """写入前同步检索分词"""
+    target.build_search_tokens()
+
+
+# ==================== 全文检索索引 ====================
+# PostgreSQL：由 search_tokens 生成 tsvector 列并建立 GIN 索引
+# SQLite：FTS5 外部内容表，由触发器与 artifacts 表保持同步
+SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE artifacts ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(search_tokens, ''))) STORED",
+        "CREATE INDEX idx_artifacts_search_vector ON artifacts USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE artifacts_fts USING fts5(search_tokens, content='artifacts', content_rowid='id')",
+        "CREATE TRIGGER artifacts_fts_ai AFTER INSERT ON artifacts BEGIN "
+        "INSERT INTO artifacts_fts(rowid, search_tokens) VALUES (new.id, new.search_tokens); END",
+        "CREATE TRIGGER artifacts_fts_ad AFTER DELETE ON artifacts BEGIN "
+        "INSERT INTO artifacts_fts(artifacts_fts, rowid, search_tokens) VALUES ('delete', old.id, old.search_tokens); END",
+        "CREATE TRIGGER artifacts_fts_au AFTER UPDATE OF search_tokens ON artifacts BEGIN "
+        "INSERT INTO artifacts_fts(artifacts_fts, rowid, search_tokens) VALUES ('delete', old.id, old.search_tokens); "
+        "INSERT INTO artifacts_fts(rowid, search_tokens) VALUES (new.id, new.search_tokens); END",
+    ],
+}
+
+for _dialect, _statements in SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Artifact.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+event.listen(Artifact.__table__, "before_drop", DDL("DROP TABLE IF EXISTS artifacts_fts").execute_if(dialect="sqlite"))
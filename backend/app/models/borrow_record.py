@@ -6,7 +6,7 @@
 from datetime import date
 from enum import Enum
 
-from sqlalchemy import Date, ForeignKey, String
+from sqlalchemy import Date, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -94,6 +94,34 @@ class BorrowRecord(BaseModel):
         cascade="all, delete-orphan"
     )
 
+    photos: Mapped[list["BorrowPhoto"]] = relationship(
+        "BorrowPhoto",
+        back_populates="borrow_record",
+        cascade="all, delete-orphan",
+        order_by="BorrowPhoto.position"
+    )
+
+    # 定义索引
+    # 列表按 (borrow_date, id) 倒序游标分页，默认只看 borrowed 状态；
+    # B-tree 索引可反向扫描，无需单独声明 DESC
+    # 每件文物最多一条活跃借出记录：部分唯一索引（PostgreSQL 和 SQLite 均原生支持），
+    # 借出时直接插入，并发借出同一文物由数据库拒绝
+    __table_args__ = (
+        Index('ix_borrow_records_status_borrow_date_id', 'status', 'borrow_date', 'id'),
+        Index(
+            'uq_borrow_records_active_artifact', 'artifact_id',
+            unique=True,
+            postgresql_where=text("status = 'borrowed'"),
+            sqlite_where=text("status = 'borrowed'"),
+        ),
+    )
+
+    def photo_urls(self) -> list[str]:
+        """获取照片组路径（早期记录没有照片组时只有主照片）"""
+        if self.photos:
+            return [photo.photo_url for photo in self.photos]
+        return [self.borrow_photo_url]
+
     def is_active(self) -> bool:
         """是否为活跃借出记录（未归还）"""
         return self.status == BorrowStatus.BORROWED.value
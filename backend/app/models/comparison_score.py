@@ -0,0 +1,112 @@
+"""
+对比维度分数模型
+
+AI 对比结果中各维度的分数和状态，从 ReturnRecord.comparison_result 中拆出，
+按 (dimension, score) 建索引，支持“印章分数低于 80 的归还记录”这类查询，无需逐行解析 JSON。
+return_records.confidence 和本表由 ReturnRecord 的 ORM 事件在同一次 flush 中维护：
+分数行用一条多行 INSERT 写入，不逐行取回主键
+"""
+from sqlalchemy import ForeignKey, Index, Integer, String, UniqueConstraint, delete, event, insert, inspect
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+from app.models.return_record import ReturnRecord
+from app.utils.comparison import extract_scores
+
+
+class ReturnDimensionScore(Base):
+    """
+    对比维度分数模型
+
+    每条归还记录每个维度一行
+    """
+    __tablename__ = "return_dimension_scores"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    return_record_id: Mapped[int] = mapped_column(
+        ForeignKey("return_records.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="关联的归还记录 ID"
+    )
+
+    dimension: Mapped[str] = mapped_column(String(30), nullable=False, comment="维度：seal/brushwork/paper/...")
+
+    score: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="相似度分数 (0-100)")
+
+    status: Mapped[str | None] = mapped_column(String(20), nullable=True, comment="状态：normal/suspicious/abnormal")
+
+    # ==================== 关系定义 ====================
+    return_record: Mapped["ReturnRecord"] = relationship(
+        "ReturnRecord",
+        back_populates="dimension_scores",
+        viewonly=True
+    )
+
+    # 唯一约束的前导列 return_record_id 同时用于按归还记录查找和删除
+    __table_args__ = (
+        UniqueConstraint('return_record_id', 'dimension', name='uq_return_dimension_scores_record_dimension'),
+        Index('ix_return_dimension_scores_dimension_score', 'dimension', 'score'),
+        Index('ix_return_dimension_scores_dimension_status', 'dimension', 'status'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReturnDimensionScore(return_record_id={self.return_record_id}, "
+            f"dimension={self.dimension!r}, score={self.score}, status={self.status!r})>"
+        )
+
+
+def _insert_scores(connection, target: ReturnRecord) -> None:
+    """写入归还记录的维度分数（一条多行 INSERT）"""
+    _, scores = extract_scores(target.comparison_result)
+    if scores:
+        connection.execute(insert(ReturnDimensionScore.__table__), [
+            {"return_record_id": target.id, "dimension": dimension, "score": score, "status": status}
+            for dimension, score, status in scores
+        ])
+
+
+def _delete_scores(connection, target: ReturnRecord) -> None:
+    """删除归还记录的维度分数"""
+    connection.execute(
+        delete(ReturnDimensionScore.__table__).where(ReturnDimensionScore.return_record_id == target.id)
+    )
+
+
+def _comparison_changed(target: ReturnRecord) -> bool:
+    """comparison_result 是否被替换（JSON 列需整体赋值才会被检测到）"""
+    return inspect(target).attrs.comparison_result.history.has_changes()
+
+
+@event.listens_for(ReturnRecord, "before_insert")
+def _set_confidence(mapper, connection, target: ReturnRecord) -> None:
+    """写入前取出总体置信度"""
+    target.confidence = extract_scores(target.comparison_result)[0]
+
+
+@event.listens_for(ReturnRecord, "before_update")
+def _refresh_confidence(mapper, connection, target: ReturnRecord) -> None:
+    """对比结果被替换时同步总体置信度"""
+    if _comparison_changed(target):
+        target.confidence = extract_scores(target.comparison_result)[0]
+
+
+@event.listens_for(ReturnRecord, "after_insert")
+def _write_scores(mapper, connection, target: ReturnRecord) -> None:
+    """新归还记录写入维度分数"""
+    _insert_scores(connection, target)
+
+
+@event.listens_for(ReturnRecord, "after_update")
+def _rewrite_scores(mapper, connection, target: ReturnRecord) -> None:
+    """对比结果被替换时重写维度分数"""
+    if _comparison_changed(target):
+        _delete_scores(connection, target)
+        _insert_scores(connection, target)
+
+
+@event.listens_for(ReturnRecord, "before_delete")
+def _remove_scores(mapper, connection, target: ReturnRecord) -> None:
+    """删除归还记录（含级联删除）前删除维度分数，不依赖数据库外键级联"""
+    _delete_scores(connection, target)
@@ -0,0 +1,93 @@
+"""
+记录照片模型
+
+借出/归还记录的照片组（多角度、细节照片）
+"""
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import BaseModel
+
+
+class BorrowPhoto(BaseModel):
+    """
+    借出照片模型
+
+    一条借出记录可以有多张照片，position 为 0 的照片同时保存在
+    BorrowRecord.borrow_photo_url 中作为主照片
+    """
+    __tablename__ = "borrow_photos"
+
+    # 主键
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    # 关联的借出记录 ID（外键）
+    borrow_record_id: Mapped[int] = mapped_column(
+        ForeignKey("borrow_records.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="关联的借出记录 ID"
+    )
+
+    # 照片路径
+    photo_url: Mapped[str] = mapped_column(
+        String(500),
+        nullable=False,
+        comment="照片路径"
+    )
+
+    # 照片顺序
+    position: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="照片顺序（0 为主照片）"
+    )
+
+    # ==================== 关系定义 ====================
+    borrow_record: Mapped["BorrowRecord"] = relationship(
+        "BorrowRecord",
+        back_populates="photos"
+    )
+
+
+class ReturnPhoto(BaseModel):
+    """
+    归还照片模型
+
+    一条归还记录可以有多张照片，position 为 0 的照片同时保存在
+    ReturnRecord.return_photo_url 中作为主照片
+    """
+    __tablename__ = "return_photos"
+
+    # 主键
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    # 关联的归还记录 ID（外键）
+    return_record_id: Mapped[int] = mapped_column(
+        ForeignKey("return_records.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="关联的归还记录 ID"
+    )
+
+    # 照片路径
+    photo_url: Mapped[str] = mapped_column(
+        String(500),
+        nullable=False,
+        comment="照片路径"
+    )
+
+    # 照片顺序
+    position: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="照片顺序（0 为主照片）"
+    )
+
+    # ==================== 关系定义 ====================
+    return_record: Mapped["ReturnRecord"] = relationship(
+        "ReturnRecord",
+        back_populates="photos"
+    )
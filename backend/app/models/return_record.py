@@ -3,11 +3,11 @@
 
 定义文物归还和 AI 对比结果表结构
 """
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import Date, ForeignKey, String, JSON
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -51,6 +51,7 @@ class ReturnRecord(BaseModel):
     return_date: Mapped[date] = mapped_column(
         Date,
         nullable=False,
+        active_history=True,
         comment="归还日期"
     )
 
@@ -61,18 +62,44 @@ class ReturnRecord(BaseModel):
         comment="AI 对比结果（详细）"
     )
 
+    # 总体置信度（写入时从 comparison_result 中取出，便于按分数筛选）
+    confidence: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        index=True,
+        comment="AI 对比总体置信度 (0-100)"
+    )
+
     # 最终结论（可被鉴定师修改）
+    # 归还日期、结论、操作员是统计汇总的分组键，active_history 保证修改时能取到旧值（见 app.models.return_stat）
     final_conclusion: Mapped[str | None] = mapped_column(
         String(20),
         nullable=True,
         index=True,
+        active_history=True,
         comment="最终结论：authentic/suspicious/fake"
     )
 
+    # 人工复核时间：鉴定师确认最终结论时写入；为空表示最终结论仍是 AI 的自动结论
+    reviewed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="鉴定师复核时间"
+    )
+
+    # 文物类别快照（归还时写入，统计汇总按此分组，之后修改文物类别不影响已有记录的扣减）
+    artifact_category: Mapped[str | None] = mapped_column(
+        String(50),
+        nullable=True,
+        active_history=True,
+        comment="文物类别（归还时）"
+    )
+
     # 操作员 ID（外键）
     operator_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="RESTRICT"),
         nullable=False,
+        active_history=True,
         comment="操作员 ID"
     )
 
@@ -89,6 +116,32 @@ class ReturnRecord(BaseModel):
         back_populates="return_records"
     )
 
+    photos: Mapped[list["ReturnPhoto"]] = relationship(
+        "ReturnPhoto",
+        back_populates="return_record",
+        cascade="all, delete-orphan",
+        order_by="ReturnPhoto.position"
+    )
+
+    # 维度分数由 ORM 事件随 comparison_result 写入和删除（见 app.models.comparison_score），这里只读
+    dimension_scores: Mapped[list["ReturnDimensionScore"]] = relationship(
+        "ReturnDimensionScore",
+        back_populates="return_record",
+        viewonly=True
+    )
+
+    # 定义索引
+    # 列表按 (return_date, id) 倒序游标分页
+    __table_args__ = (
+        Index('ix_return_records_return_date_id', 'return_date', 'id'),
+    )
+
+    def photo_urls(self) -> list[str]:
+        """获取照片组路径（早期记录没有照片组时只有主照片）"""
+        if self.photos:
+            return [photo.photo_url for photo in self.photos]
+        return [self.return_photo_url]
+
     def get_conclusion_display(self) -> str:
         """获取结论的中文显示"""
         if self.final_conclusion == ConclusionType.AUTHENTIC.value:
@@ -101,6 +154,8 @@ class ReturnRecord(BaseModel):
 
     def get_confidence(self) -> int | None:
         """获取置信度分数"""
+        if self.confidence is not None:
+            return self.confidence
         if self.comparison_result:
             return self.comparison_result.get("confidence")
         return None
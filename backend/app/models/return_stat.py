@@ -0,0 +1,197 @@
+"""
+归还统计汇总模型
+
+按 (月份, 类别, 操作员, 结论) 汇总归还记录数量，供统计接口直接读取，
+不必每次对 return_records / borrow_records / artifacts 做连接和 GROUP BY。
+汇总行由 ReturnRecord 的 ORM 事件在同一次 flush（同一事务）中增量维护；
+类别取归还时写入 ReturnRecord.artifact_category 的快照，之后修改文物类别不影响已有汇总行，
+结论修改和删除也按快照扣减
+"""
+from datetime import date
+
+from sqlalchemy import Connection, Date, ForeignKey, Integer, String, UniqueConstraint, event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.artifact import Artifact
+from app.models.base import Base
+from app.models.borrow_record import BorrowRecord
+from app.models.return_record import ReturnRecord
+
+# 尚无结论（未做 AI 对比且未人工确认）的归还记录
+PENDING_CONCLUSION = "pending"
+
+
+def month_start(value: date) -> date:
+    """统计周期：所在月份的第一天"""
+    return value.replace(day=1)
+
+
+class ReturnStat(Base):
+    """
+    归还统计汇总模型
+
+    每行是一个 (月份, 类别, 操作员, 结论) 组合的归还记录数
+    """
+    __tablename__ = "return_stats"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    period: Mapped[date] = mapped_column(Date, nullable=False, comment="统计月份（当月第一天）")
+
+    category: Mapped[str] = mapped_column(String(50), nullable=False, comment="文物类别（归还时）")
+
+    operator_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="归还操作员 ID"
+    )
+
+    conclusion: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="结论：authentic/suspicious/fake/pending"
+    )
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="归还记录数")
+
+    __table_args__ = (
+        UniqueConstraint('period', 'category', 'operator_id', 'conclusion', name='uq_return_stats_key'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReturnStat(period={self.period}, category={self.category!r}, "
+            f"operator_id={self.operator_id}, conclusion={self.conclusion!r}, count={self.count})>"
+        )
+
+
+def apply_stat_delta(
+    connection: Connection,
+    period: date,
+    category: str,
+    operator_id: int,
+    conclusion: str | None,
+    delta: int
+) -> None:
+    """
+    调整一个汇总行的计数（不存在时插入）
+
+    扣减（delta < 0）只更新计数足够的已有行，不会插入或产生负数行
+
+    Args:
+        connection: 当前事务的数据库连接
+        period: 统计月份
+        category: 文物类别
+        operator_id: 操作员 ID
+        conclusion: 结论（None 记为 pending）
+        delta: 计数变化量
+    """
+    key = {
+        "period": month_start(period),
+        "category": category,
+        "operator_id": operator_id,
+        "conclusion": conclusion or PENDING_CONCLUSION,
+    }
+    table = ReturnStat.__table__
+    key_match = [table.c[column] == value for column, value in key.items()]
+    if delta < 0:
+        connection.execute(
+            table.update()
+            .where(*key_match, table.c.count >= -delta)
+            .values(count=table.c.count + delta)
+        )
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        connection.execute(
+            dialect_insert(table)
+            .values(**key, count=delta)
+            .on_conflict_do_update(
+                index_elements=list(key),
+                set_={"count": table.c.count + delta},
+            )
+        )
+        return
+
+    # 其他数据库：先更新，不存在时再插入
+    result = connection.execute(
+        table.update()
+        .where(*key_match)
+        .values(count=table.c.count + delta)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**key, count=delta))
+
+
+def _artifact_category(connection: Connection, borrow_record_id: int) -> str | None:
+    """查询借出记录对应文物的类别"""
+    return connection.scalar(
+        select(Artifact.category)
+        .join(BorrowRecord, BorrowRecord.artifact_id == Artifact.id)
+        .where(BorrowRecord.id == borrow_record_id)
+    )
+
+
+def _committed(target: ReturnRecord, attribute: str):
+    """取属性修改前的值（未修改时为当前值）"""
+    history = inspect(target).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(target, attribute)
+
+
+def _snapshot_category(connection: Connection, target: ReturnRecord) -> str | None:
+    """归还记录修改前的类别快照（早期记录没有快照时取文物当前类别）"""
+    category = _committed(target, "artifact_category")
+    if category is None:
+        category = _artifact_category(connection, target.borrow_record_id)
+    return category
+
+
+@event.listens_for(ReturnRecord, "before_insert")
+def _take_category_snapshot(mapper, connection, target: ReturnRecord) -> None:
+    """写入归还时文物的类别快照"""
+    if target.artifact_category is None:
+        target.artifact_category = _artifact_category(connection, target.borrow_record_id)
+
+
+@event.listens_for(ReturnRecord, "after_insert")
+def _count_new_return(mapper, connection, target: ReturnRecord) -> None:
+    """新归还记录计入汇总"""
+    if target.artifact_category is not None:
+        apply_stat_delta(
+            connection, target.return_date, target.artifact_category, target.operator_id, target.final_conclusion, 1
+        )
+
+
+@event.listens_for(ReturnRecord, "after_update")
+def _move_updated_return(mapper, connection, target: ReturnRecord) -> None:
+    """结论、归还日期、操作员或类别快照变化时，从旧汇总行移到新汇总行"""
+    fields = ("return_date", "operator_id", "final_conclusion", "artifact_category")
+    old_key = tuple(_committed(target, name) for name in fields)
+    new_key = tuple(getattr(target, name) for name in fields)
+    if old_key == new_key:
+        return
+    old_category = _snapshot_category(connection, target)
+    new_category = target.artifact_category or old_category
+    if old_category is not None:
+        apply_stat_delta(connection, old_key[0], old_category, old_key[1], old_key[2], -1)
+    if new_category is not None:
+        apply_stat_delta(connection, new_key[0], new_category, new_key[1], new_key[2], 1)
+
+
+@event.listens_for(ReturnRecord, "before_delete")
+def _uncount_deleted_return(mapper, connection, target: ReturnRecord) -> None:
+    """删除归还记录（含级联删除）时从汇总中扣除（在借出记录和文物删除之前执行）"""
+    category = _snapshot_category(connection, target)
+    if category is not None:
+        apply_stat_delta(
+            connection,
+            _committed(target, "return_date"),
+            category,
+            _committed(target, "operator_id"),
+            _committed(target, "final_conclusion"),
+            -1
+        )
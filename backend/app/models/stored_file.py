@@ -0,0 +1,69 @@
+"""
+内容寻址存储文件模型
+
+记录按 sha256 存储的上传文件及其引用计数
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class StoredFile(BaseModel):
+    """
+    存储文件模型
+
+    内容相同的上传文件只保存一份，ref_count 记录被引用的次数，
+    归零时删除文件和记录。
+    其中 unclaimed 个引用属于尚未被记录确认的上传，
+    超过 TEMP_UPLOAD_TTL_HOURS 仍未确认时由清理任务释放
+    """
+    __tablename__ = "stored_files"
+
+    # 文件内容 sha256（主键）
+    sha256: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="文件内容 sha256（十六进制）"
+    )
+
+    # 存储路径
+    path: Mapped[str] = mapped_column(
+        String(500),
+        unique=True,
+        nullable=False,
+        comment="存储路径（相对于 uploads 目录）"
+    )
+
+    # 文件大小
+    size: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        comment="文件字节数"
+    )
+
+    # 引用计数
+    ref_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="引用计数"
+    )
+
+    # 未确认的上传引用数
+    unclaimed: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="尚未被记录确认的上传引用数（包含在 ref_count 中）"
+    )
+
+    # 最近一次未确认上传的时间
+    unclaimed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="最近一次未确认上传的时间"
+    )
@@ -30,9 +30,26 @@ from app.schemas.return_record import (
     ComparisonResultSchema,
     DimensionResultSchema,
 )
+from app.schemas.artifact_history import (
+    HistoryReturnRecord,
+    HistoryBorrowRecord,
+    ArtifactHistoryResponse,
+)
+from app.schemas.admin import UploadSweepReport
+from app.schemas.stats import (
+    ConclusionStatsItem,
+    ConclusionStatsResponse,
+    OverdueStatsResponse,
+)
+from app.schemas.upload import (
+    ResumableUploadCreate,
+    ResumableUploadResponse,
+    ResumableUploadComplete,
+)
 from app.schemas.common import (
     PaginationParams,
     PaginatedResponse,
+    RecordPhotoResponse,
     ErrorResponse,
     MessageResponse,
     HealthResponse,
@@ -62,9 +79,24 @@ __all__ = [
     "UpdateConclusionRequest",
     "ComparisonResultSchema",
     "DimensionResultSchema",
+    # ArtifactHistory schemas
+    "HistoryReturnRecord",
+    "HistoryBorrowRecord",
+    "ArtifactHistoryResponse",
+    # Admin schemas
+    "UploadSweepReport",
+    # Stats schemas
+    "ConclusionStatsItem",
+    "ConclusionStatsResponse",
+    "OverdueStatsResponse",
+    # Upload schemas
+    "ResumableUploadCreate",
+    "ResumableUploadResponse",
+    "ResumableUploadComplete",
     # Common schemas
     "PaginationParams",
     "PaginatedResponse",
+    "RecordPhotoResponse",
     "ErrorResponse",
     "MessageResponse",
     "HealthResponse",
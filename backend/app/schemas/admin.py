@@ -0,0 +1,46 @@
+"""
+系统管理相关的 Pydantic Schemas
+
+定义上传文件清理、数据库连接池指标等管理功能的数据结构
+"""
+from pydantic import BaseModel, Field
+
+
+class UploadSweepReport(BaseModel):
+    """上传文件清理结果 Schema"""
+    dry_run: bool = Field(..., description="是否仅统计不删除")
+    skipped: bool = Field(False, description="其他进程正在清理，本次跳过")
+    scanned: int = Field(..., description="扫描的文件数")
+    referenced: int = Field(..., description="被记录引用的路径数")
+    expired_temp: int = Field(..., description="过期的临时文件数")
+    orphaned: int = Field(..., description="孤立文件数（未被任何记录引用）")
+    deleted: int = Field(..., description="实际删除的文件数")
+    bytes_freed: int = Field(..., description="释放的字节数")
+    duration_ms: int = Field(..., description="耗时（毫秒）")
+
+
+class PoolMetricsReport(BaseModel):
+    """数据库连接池指标 Schema（分位数基于最近 1000 个样本）"""
+    pool_size: int = Field(..., description="连接池常驻连接数")
+    max_overflow: int = Field(..., description="允许的溢出连接数")
+    timeout_seconds: float = Field(..., description="取连接的超时时间（秒）")
+    checked_out: int = Field(..., description="当前被占用的连接数")
+    idle: int = Field(..., description="当前空闲的连接数")
+    overflow: int = Field(..., description="当前的溢出连接数")
+    peak_overflow: int = Field(..., description="溢出连接数峰值")
+    checkouts: int = Field(..., description="累计取连接次数")
+    overflow_checkouts: int = Field(..., description="使用溢出连接的取连接次数")
+    slow_checkouts: int = Field(..., description="等待超过 DB_POOL_SLOW_CHECKOUT_MS 的取连接次数")
+    timeouts: int = Field(..., description="取连接超时次数")
+    wait_ms_avg: float = Field(..., description="取连接平均等待时间（毫秒）")
+    wait_ms_p95: float = Field(..., description="取连接等待时间 P95（毫秒）")
+    wait_ms_max: float = Field(..., description="取连接最长等待时间（毫秒）")
+    queries: int = Field(..., description="累计执行的 SQL 条数")
+    query_ms_avg: float = Field(..., description="SQL 平均执行时间（毫秒）")
+    query_ms_p95: float = Field(..., description="SQL 执行时间 P95（毫秒）")
+
+
+class DatabasePoolMetrics(BaseModel):
+    """数据库连接池指标 Schema"""
+    sync_engine: PoolMetricsReport = Field(..., description="同步引擎连接池")
+    async_engine: PoolMetricsReport | None = Field(None, description="异步引擎连接池（USE_ASYNC_DB 关闭时为空）")
@@ -74,5 +74,24 @@ class ArtifactResponse(ArtifactBase):
 
 class ArtifactListResponse(BaseModel):
     """文物列表响应 Schema"""
-    total: int = Field(..., description="总数")
+    total: int | None = Field(..., description="总数（total_mode=none 时为空）")
     items: list[ArtifactResponse] = Field(..., description="文物列表")
+    next_cursor: str | None = Field(None, description="下一页游标，没有下一页时为空")
+
+
+class ArtifactImportError(BaseModel):
+    """批量导入的错误行 Schema"""
+    line: int = Field(..., description="行号（CSV 为文件中的行号，含表头）")
+    artifact_id: str | None = Field(None, description="文物编号（无法解析时为空）")
+    message: str = Field(..., description="错误原因")
+
+
+class ArtifactImportReport(BaseModel):
+    """批量导入结果 Schema"""
+    total: int = Field(..., description="读取的数据行数")
+    imported: int = Field(..., description="成功导入的行数")
+    skipped: int = Field(..., description="编号已存在或文件中重复而跳过的行数")
+    failed: int = Field(..., description="解析或校验失败的行数")
+    errors: list[ArtifactImportError] = Field(default_factory=list, description="跳过和失败的行")
+    errors_truncated: bool = Field(False, description="错误行过多，errors 只列出前一部分")
+    duration_ms: int = Field(..., description="耗时（毫秒）")
@@ -0,0 +1,52 @@
+"""
+文物历史记录相关的 Pydantic Schemas
+
+定义文物借出归还历史的数据结构
+"""
+from datetime import date, datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.artifact import ArtifactResponse
+from app.schemas.common import RecordPhotoResponse
+
+
+class HistoryReturnRecord(BaseModel):
+    """历史记录中的归还记录 Schema"""
+    id: int
+    return_photo_url: str = Field(..., description="归还照片路径")
+    return_date: date = Field(..., description="归还日期")
+    comparison_result: Optional[dict[str, Any]] = Field(None, description="AI 对比结果（JSON）")
+    final_conclusion: Optional[str] = Field(None, description="最终结论：authentic/suspicious/fake")
+    operator_id: int
+    created_at: datetime
+    photos: list[RecordPhotoResponse] = Field(default_factory=list, description="照片组")
+
+    class Config:
+        """配置"""
+        from_attributes = True
+
+
+class HistoryBorrowRecord(BaseModel):
+    """历史记录中的借出记录 Schema（含对应的归还记录）"""
+    id: int
+    borrow_photo_url: str = Field(..., description="借出照片路径")
+    borrow_date: date = Field(..., description="借出日期")
+    expected_return_date: Optional[date] = Field(None, description="预计归还日期")
+    status: str = Field(..., description="状态：borrowed/returned")
+    operator_id: int
+    created_at: datetime
+    photos: list[RecordPhotoResponse] = Field(default_factory=list, description="照片组")
+    return_record: Optional[HistoryReturnRecord] = Field(None, description="归还记录（未归还时为空）")
+
+    class Config:
+        """配置"""
+        from_attributes = True
+
+
+class ArtifactHistoryResponse(BaseModel):
+    """文物历史记录响应 Schema"""
+    artifact: ArtifactResponse = Field(..., description="文物信息")
+    total: int = Field(..., description="借出记录总数")
+    items: list[HistoryBorrowRecord] = Field(..., description="借出归还记录（按借出日期倒序）")
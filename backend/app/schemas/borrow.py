@@ -10,6 +10,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import RecordPhotoResponse
+
 
 class BorrowRecordBase(BaseModel):
     """借出记录基础 Schema"""
@@ -25,7 +27,10 @@ class BorrowRecordBase(BaseModel):
 
 class BorrowRecordCreate(BorrowRecordBase):
     """创建借出记录 Schema"""
-    pass
+    photo_urls: list[str] = Field(
+        default_factory=list,
+        description="照片组路径（含主照片），为空时只有主照片"
+    )
 
 
 class BorrowRecordResponse(BorrowRecordBase):
@@ -35,6 +40,9 @@ class BorrowRecordResponse(BorrowRecordBase):
     operator_id: int
     created_at: datetime
 
+    # 照片组（多角度、细节照片）
+    photos: list[RecordPhotoResponse] = Field(default_factory=list, description="照片组")
+
     # 关联的文物信息（可选）
     artifact: Optional[ArtifactResponse] = None
 
@@ -45,8 +53,9 @@ class BorrowRecordResponse(BorrowRecordBase):
 
 class BorrowRecordListResponse(BaseModel):
     """借出记录列表响应 Schema"""
-    total: int = Field(..., description="总数")
+    total: int | None = Field(..., description="总数（total_mode=none 时为空）")
     items: list[BorrowRecordResponse] = Field(..., description="借出记录列表")
+    next_cursor: str | None = Field(None, description="下一页游标，没有下一页时为空")
 
 
 # 解决前向引用问题
@@ -26,6 +26,17 @@ class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T] = Field(..., description="数据列表")
 
 
+class RecordPhotoResponse(BaseModel):
+    """记录照片响应 Schema"""
+    id: int
+    photo_url: str = Field(..., description="照片路径")
+    position: int = Field(..., description="照片顺序（0 为主照片）")
+
+    class Config:
+        """配置"""
+        from_attributes = True
+
+
 class ErrorResponse(BaseModel):
     """错误响应 Schema"""
     detail: str = Field(..., description="错误详情")
@@ -10,6 +10,8 @@ from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import RecordPhotoResponse
+
 
 class DimensionResultSchema(BaseModel):
     """单个维度对比结果 Schema"""
@@ -52,10 +54,15 @@ class ReturnRecordResponse(ReturnRecordBase):
     """归还记录响应 Schema"""
     id: int
     comparison_result: Optional[dict[str, Any]] = Field(None, description="AI 对比结果（JSON）")
+    confidence: Optional[int] = Field(None, description="AI 对比总体置信度 (0-100)")
     final_conclusion: Optional[str] = Field(None, description="最终结论：authentic/suspicious/fake")
+    reviewed_at: Optional[datetime] = Field(None, description="鉴定师复核时间（为空表示最终结论仍为 AI 自动结论）")
     operator_id: int
     created_at: datetime
 
+    # 照片组（多角度、细节照片）
+    photos: list[RecordPhotoResponse] = Field(default_factory=list, description="照片组")
+
     # 关联的借出记录信息（可选）
     borrow_record: Optional[BorrowRecordResponse] = None
 
@@ -66,8 +73,9 @@ class ReturnRecordResponse(ReturnRecordBase):
 
 class ReturnRecordListResponse(BaseModel):
     """归还记录列表响应 Schema"""
-    total: int = Field(..., description="总数")
+    total: int | None = Field(..., description="总数（total_mode=none 时为空）")
     items: list[ReturnRecordResponse] = Field(..., description="归还记录列表")
+    next_cursor: str | None = Field(None, description="下一页游标，没有下一页时为空")
 
 
 class UpdateConclusionRequest(BaseModel):
@@ -0,0 +1,39 @@
+"""
+统计相关的 Pydantic Schemas
+
+定义归还结论统计和逾期借出统计的数据结构
+"""
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ConclusionStatsItem(BaseModel):
+    """按分组汇总的结论数量 Schema"""
+    key: str = Field(..., description="分组值：月份（YYYY-MM）/ 年份 / 类别 / 操作员用户名")
+    authentic: int = Field(0, description="真品数")
+    suspicious: int = Field(0, description="存疑数")
+    fake: int = Field(0, description="仿品数")
+    pending: int = Field(0, description="尚无结论数")
+    total: int = Field(0, description="归还记录总数")
+
+
+class ConclusionStatsResponse(BaseModel):
+    """归还结论统计响应 Schema"""
+    group_by: str = Field(..., description="分组方式：month/year/category/operator")
+    items: list[ConclusionStatsItem] = Field(..., description="分组统计")
+    total: ConclusionStatsItem = Field(..., description="全部分组合计（key 为 all）")
+
+
+class OverdueCategoryItem(BaseModel):
+    """按类别的逾期借出数量 Schema"""
+    category: str = Field(..., description="文物类别")
+    count: int = Field(..., description="逾期未归还数")
+
+
+class OverdueStatsResponse(BaseModel):
+    """逾期借出统计响应 Schema"""
+    total: int = Field(..., description="逾期未归还总数")
+    oldest_expected_return_date: Optional[date] = Field(None, description="最早的预计归还日期")
+    by_category: list[OverdueCategoryItem] = Field(..., description="按类别统计")
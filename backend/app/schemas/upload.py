@@ -0,0 +1,28 @@
+"""
+文件上传相关的 Pydantic Schemas
+
+定义断点续传上传会话的数据结构
+"""
+from pydantic import BaseModel, Field
+
+
+class ResumableUploadCreate(BaseModel):
+    """创建断点续传上传 Schema"""
+    filename: str = Field(..., min_length=1, max_length=255, description="原始文件名")
+    size: int = Field(..., gt=0, description="文件总字节数")
+
+
+class ResumableUploadResponse(BaseModel):
+    """断点续传上传状态 Schema"""
+    upload_id: str = Field(..., description="上传会话 ID")
+    filename: str = Field(..., description="原始文件名")
+    size: int = Field(..., description="文件总字节数")
+    offset: int = Field(..., description="已接收的字节数（下一个分片的起始位置）")
+
+
+class ResumableUploadComplete(BaseModel):
+    """断点续传上传完成 Schema"""
+    photo_path: str = Field(..., description="照片路径（可作为创建记录时的 photo_path）")
+    photo_url: str = Field(..., description="照片访问 URL")
+    sha256: str = Field(..., description="文件内容 sha256")
+    size: int = Field(..., description="文件字节数")
@@ -0,0 +1,194 @@
+"""
+文物批量导入服务
+
+流式读取 CSV / JSONL 文件，逐行用 ArtifactCreate 校验，按批插入：
+每批一条多行 INSERT ... ON CONFLICT (artifact_id) DO NOTHING RETURNING artifact_id，
+编号已存在的行跳过并逐行报告，不需要逐行预查询和逐行提交。
+每批单独提交，导入中途失败时已提交的批次保留
+"""
+import csv
+import json
+import logging
+import time
+from typing import Any, Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.artifact import Artifact
+from app.schemas.artifact import ArtifactCreate, ArtifactImportError, ArtifactImportReport
+from app.utils.search import index_tokens
+
+logger = logging.getLogger(__name__)
+
+# 支持的文件格式
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+IMPORT_FORMAT_PATTERN = f"^({FORMAT_CSV}|{FORMAT_JSONL})$"
+
+# 报告中最多列出的错误行数
+MAX_REPORTED_ERRORS = 1000
+
+
+class ArtifactImporter:
+    """文物批量导入服务类"""
+
+    BATCH_SIZE = 1000  # 每批插入的行数
+
+    @staticmethod
+    def detect_format(filename: str | None) -> str | None:
+        """根据文件扩展名判断格式（.csv / .jsonl / .ndjson），无法判断时返回 None"""
+        suffix = (filename or "").rsplit(".", 1)[-1].lower()
+        if suffix == "csv":
+            return FORMAT_CSV
+        if suffix in ("jsonl", "ndjson"):
+            return FORMAT_JSONL
+        return None
+
+    @staticmethod
+    def iter_rows(stream: TextIO, file_format: str) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+        """
+        逐行读取文件
+
+        Args:
+            stream: 文本流（CSV 需以 newline="" 打开）
+            file_format: csv / jsonl
+
+        Yields:
+            (行号, 行数据, 解析错误)，解析失败时行数据为 None
+        """
+        if file_format == FORMAT_CSV:
+            reader = csv.DictReader(stream)
+            for row in reader:
+                # 空单元格视为未填写
+                yield reader.line_num, {k: (v or None) for k, v in row.items() if k is not None}, None
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"JSON 解析失败: {e.msg}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "每行必须是一个 JSON 对象"
+                continue
+            yield line_number, row, None
+
+    @staticmethod
+    def _insert_batch(db: Session, rows: list[dict[str, Any]]) -> set[str]:
+        """
+        插入一批文物，跳过编号已存在的行
+
+        Returns:
+            实际插入的文物编号
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = (
+                dialect_insert(Artifact)
+                .on_conflict_do_nothing(index_elements=[Artifact.artifact_id])
+                .returning(Artifact.artifact_id)
+            )
+            return set(db.scalars(statement, rows))
+
+        # 其他数据库：预查询本批已存在的编号
+        existing = set(db.scalars(
+            select(Artifact.artifact_id).where(Artifact.artifact_id.in_([row["artifact_id"] for row in rows]))
+        ))
+        new_rows = [row for row in rows if row["artifact_id"] not in existing]
+        if new_rows:
+            db.execute(insert(Artifact), new_rows)
+        return {row["artifact_id"] for row in new_rows}
+
+    @staticmethod
+    def run(db: Session, stream: TextIO, file_format: str, batch_size: int = BATCH_SIZE) -> ArtifactImportReport:
+        """
+        执行导入
+
+        Args:
+            db: 数据库会话
+            stream: 文本流
+            file_format: csv / jsonl
+            batch_size: 每批插入的行数
+
+        Returns:
+            导入结果（含逐行错误）
+        """
+        started = time.perf_counter()
+        total = imported = skipped = failed = 0
+        errors: list[ArtifactImportError] = []
+        batch: list[dict[str, Any]] = []
+        batch_lines: dict[str, int] = {}
+
+        def report(line: int, artifact_id: str | None, message: str) -> None:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(ArtifactImportError(line=line, artifact_id=artifact_id, message=message))
+
+        def flush() -> None:
+            nonlocal imported, skipped
+            if not batch:
+                return
+            inserted = ArtifactImporter._insert_batch(db, batch)
+            db.commit()
+            imported += len(inserted)
+            for artifact_id, line in batch_lines.items():
+                if artifact_id not in inserted:
+                    skipped += 1
+                    report(line, artifact_id, f"文物编号 '{artifact_id}' 已存在")
+            batch.clear()
+            batch_lines.clear()
+
+        for line, row, parse_error in ArtifactImporter.iter_rows(stream, file_format):
+            total += 1
+            if parse_error:
+                failed += 1
+                report(line, None, parse_error)
+                continue
+
+            try:
+                data = ArtifactCreate.model_validate(row)
+            except ValidationError as e:
+                failed += 1
+                message = "; ".join(
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+                report(line, row.get("artifact_id") if isinstance(row.get("artifact_id"), str) else None, message)
+                continue
+
+            if data.artifact_id in batch_lines:
+                skipped += 1
+                report(line, data.artifact_id, f"文物编号 '{data.artifact_id}' 与第 {batch_lines[data.artifact_id]} 行重复")
+                continue
+
+            values = data.model_dump()
+            # 批量插入不触发 ORM 事件，检索分词在这里生成
+            values["search_tokens"] = index_tokens(
+                data.artifact_id, data.name, data.author, data.category, data.era
+            )
+            batch.append(values)
+            batch_lines[data.artifact_id] = line
+            if len(batch) >= batch_size:
+                flush()
+
+        flush()
+
+        result = ArtifactImportReport(
+            total=total,
+            imported=imported,
+            skipped=skipped,
+            failed=failed,
+            errors=errors,
+            errors_truncated=skipped + failed > len(errors),
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+        logger.info(
+            f"[IMPORT] artifacts total={total} imported={imported} skipped={skipped} "
+            f"failed={failed} duration_ms={result.duration_ms}"
+        )
+        return result
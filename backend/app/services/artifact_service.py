@@ -5,33 +5,51 @@
 """
 from typing import Any
 
+from sqlalchemy import func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_key, cached_row, invalidate
 from app.models.artifact import Artifact
 from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.utils.pagination import TOTAL_EXACT, keyset_paginate
+from app.utils.search import query_tokens
 
 
 class ArtifactService:
     """文物服务类"""
 
+    @staticmethod
+    def cache_keys(artifact: Artifact) -> list[str]:
+        """文物相关的缓存键（按 ID、按编号，以及该文物的活跃借出记录）"""
+        return [
+            cache_key("artifact", "id", artifact.id),
+            cache_key("artifact", "code", artifact.artifact_id),
+            cache_key("borrow", "active", artifact.id),
+        ]
+
     @staticmethod
     def get_all(
         db: Session,
         skip: int = 0,
         limit: int = 100,
-        artifact_id: str | None = None
-    ) -> tuple[list[Artifact], int]:
+        artifact_id: str | None = None,
+        cursor: str | None = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[list[Artifact], int | None, str | None]:
         """
-        获取文物列表
+        获取文物列表（按 id 排序）
 
         Args:
             db: 数据库会话
             skip: 跳过记录数
             limit: 返回记录数
             artifact_id: 文物编号筛选（精确匹配）
+            cursor: 分页游标（上一页的 next_cursor）
+            total_mode: 总数计算方式（exact/estimate/none）
 
         Returns:
-            (文物列表, 总数)
+            (文物列表, 总数, 下一页游标)
         """
         query = db.query(Artifact)
 
@@ -39,18 +57,82 @@ class ArtifactService:
         if artifact_id:
             query = query.filter(Artifact.artifact_id == artifact_id)
 
-        # 获取总数
-        total = query.count()
+        # 按主键游标分页，总数在同一条查询中计算
+        artifacts, total, next_cursor = keyset_paginate(
+            query, [Artifact.id], limit, cursor=cursor, descending=False, offset=skip, total_mode=total_mode
+        )
+
+        return artifacts, total, next_cursor
+
+    @staticmethod
+    def search(
+        db: Session,
+        keyword: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> tuple[list[Artifact], int]:
+        """
+        全文检索文物（编号、名称、作者、类别、年代），按相关度排序
+
+        PostgreSQL 使用 tsvector + GIN 索引，SQLite 使用 FTS5，
+        其他数据库退化为对 search_tokens 的 LIKE 匹配（不排序相关度）
 
-        # 分页
-        artifacts = query.offset(skip).limit(limit).all()
+        Args:
+            db: 数据库会话
+            keyword: 检索关键词（中文按二元组匹配）
+            skip: 跳过记录数
+            limit: 返回记录数
 
-        return artifacts, total
+        Returns:
+            (文物列表, 命中总数)
+        """
+        tokens = query_tokens(keyword)
+        if not tokens:
+            return [], 0
+
+        query = db.query(Artifact)
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            search_vector = literal_column("artifacts.search_vector")
+            ts_query = func.plainto_tsquery(literal_column("'simple'::regconfig"), " ".join(tokens))
+            query = query.filter(search_vector.op("@@")(ts_query))
+            order_by = [func.ts_rank(search_vector, ts_query).desc(), Artifact.id]
+        elif dialect == "sqlite":
+            fts = literal_column("artifacts_fts")
+            match = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+            # bm25 只能在直接查询 FTS 表的语句中使用，先在子查询中算出相关度（越小越相关）
+            hits = (
+                select(literal_column("rowid").label("id"), func.bm25(fts).label("rank"))
+                .select_from(table("artifacts_fts"))
+                .where(fts.op("MATCH")(match))
+                .subquery()
+            )
+            query = query.join(hits, hits.c.id == Artifact.id)
+            order_by = [hits.c.rank, Artifact.id]
+        else:
+            query = query.filter(*[
+                or_(Artifact.search_tokens.like(f"{token} %"), Artifact.search_tokens.like(f"% {token} %"),
+                    Artifact.search_tokens.like(f"% {token}"), Artifact.search_tokens == token)
+                for token in tokens
+            ])
+            order_by = [Artifact.id]
+
+        # 总数与本页数据在同一条查询中计算
+        rows = (
+            query.add_columns(func.count().over().label("_total"))
+            .order_by(*order_by)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        if not rows:
+            return [], query.count() if skip else 0
+        return [row[0] for row in rows], rows[0][-1]
 
     @staticmethod
     def get_by_id(db: Session, artifact_id: int) -> Artifact | None:
         """
-        根据 ID 获取文物
+        根据 ID 获取文物（读穿缓存）
 
         Args:
             db: 数据库会话
@@ -59,12 +141,15 @@ class ArtifactService:
         Returns:
             文物对象或 None
         """
-        return db.query(Artifact).filter(Artifact.id == artifact_id).first()
+        return cached_row(
+            db, cache_key("artifact", "id", artifact_id), Artifact,
+            lambda: db.query(Artifact).filter(Artifact.id == artifact_id).first(),
+        )
 
     @staticmethod
     def get_by_artifact_id(db: Session, artifact_id: str) -> Artifact | None:
         """
-        根据文物编号获取文物
+        根据文物编号获取文物（读穿缓存）
 
         Args:
             db: 数据库会话
@@ -73,7 +158,10 @@ class ArtifactService:
         Returns:
             文物对象或 None
         """
-        return db.query(Artifact).filter(Artifact.artifact_id == artifact_id).first()
+        return cached_row(
+            db, cache_key("artifact", "code", artifact_id), Artifact,
+            lambda: db.query(Artifact).filter(Artifact.artifact_id == artifact_id).first(),
+        )
 
     @staticmethod
     def create(db: Session, data: ArtifactCreate) -> Artifact:
@@ -113,12 +201,16 @@ class ArtifactService:
         Returns:
             更新后的文物对象
         """
+        # 编号可能被修改，先记下旧的缓存键
+        stale_keys = ArtifactService.cache_keys(artifact)
+
         # 更新字段
         update_data = data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(artifact, field, value)
 
         db.commit()
+        invalidate(*stale_keys)
         db.refresh(artifact)
 
         return artifact
@@ -132,8 +224,10 @@ class ArtifactService:
             db: 数据库会话
             artifact: 要删除的文物对象
         """
+        stale_keys = ArtifactService.cache_keys(artifact)
         db.delete(artifact)
         db.commit()
+        invalidate(*stale_keys)
 
     @staticmethod
     def check_artifact_id_exists(db: Session, artifact_id: str) -> bool:
@@ -148,3 +242,99 @@ class ArtifactService:
             是否存在
         """
         return db.query(Artifact).filter(Artifact.artifact_id == artifact_id).first() is not None
+
+
+class AsyncArtifactService:
+    """文物服务类（异步版本，用于 AsyncSession，见 USE_ASYNC_DB）"""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, artifact_id: int) -> Artifact | None:
+        """
+        根据 ID 获取文物
+
+        Args:
+            db: 异步数据库会话
+            artifact_id: 文物内部 ID
+
+        Returns:
+            文物对象或 None
+        """
+        return await db.get(Artifact, artifact_id)
+
+    @staticmethod
+    async def get_by_artifact_id(db: AsyncSession, artifact_id: str) -> Artifact | None:
+        """
+        根据文物编号获取文物
+
+        Args:
+            db: 异步数据库会话
+            artifact_id: 文物编号（业务主键）
+
+        Returns:
+            文物对象或 None
+        """
+        result = await db.execute(select(Artifact).where(Artifact.artifact_id == artifact_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def create(db: AsyncSession, data: ArtifactCreate) -> Artifact:
+        """
+        创建文物
+
+        Args:
+            db: 异步数据库会话
+            data: 创建数据
+
+        Returns:
+            新创建的文物对象
+
+        Raises:
+            ValueError: 文物编号已存在时
+        """
+        if await AsyncArtifactService.get_by_artifact_id(db, data.artifact_id):
+            raise ValueError(f"文物编号 '{data.artifact_id}' 已存在")
+
+        db_artifact = Artifact(**data.model_dump())
+        db.add(db_artifact)
+        await db.commit()
+        # 加载数据库生成的字段（created_at 等）
+        await db.refresh(db_artifact)
+
+        return db_artifact
+
+    @staticmethod
+    async def update(db: AsyncSession, artifact: Artifact, data: ArtifactUpdate) -> Artifact:
+        """
+        更新文物信息
+
+        Args:
+            db: 异步数据库会话
+            artifact: 要更新的文物对象
+            data: 更新数据
+
+        Returns:
+            更新后的文物对象
+        """
+        stale_keys = ArtifactService.cache_keys(artifact)
+        for field, value in data.model_dump(exclude_unset=True).items():
+            setattr(artifact, field, value)
+
+        await db.commit()
+        invalidate(*stale_keys)
+        await db.refresh(artifact)
+
+        return artifact
+
+    @staticmethod
+    async def delete(db: AsyncSession, artifact: Artifact) -> None:
+        """
+        删除文物
+
+        Args:
+            db: 异步数据库会话
+            artifact: 要删除的文物对象
+        """
+        stale_keys = ArtifactService.cache_keys(artifact)
+        await db.delete(artifact)
+        await db.commit()
+        invalidate(*stale_keys)
@@ -6,25 +6,43 @@
 from datetime import date, datetime
 from typing import Any
 
-from sqlalchemy.orm import Session
-
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import cache_key, cached_row, invalidate, shared_ttl
+from app.core.config import settings
+from app.core.unit_of_work import UnitOfWork
 from app.models.borrow_record import BorrowRecord, BorrowStatus
 from app.models.artifact import Artifact
+from app.models.record_photo import BorrowPhoto
+from app.models.return_record import ReturnRecord
 from app.models.user import User
 from app.schemas.borrow import BorrowRecordCreate
+from app.services.artifact_service import ArtifactService
+from app.utils.content_store import ContentStore
+from app.utils.pagination import TOTAL_EXACT, keyset_paginate
 
 
 class BorrowRecordService:
     """借出记录服务类"""
 
+    @staticmethod
+    def active_cache_key(artifact_id: int) -> str:
+        """文物（内部 ID）的活跃借出记录缓存键，借出、归还、删除记录时失效"""
+        return cache_key("borrow", "active", artifact_id)
+
     @staticmethod
     def get_all(
         db: Session,
         skip: int = 0,
         limit: int = 100,
         artifact_id: str | None = None,
-        status: str | None = None
-    ) -> tuple[list[BorrowRecord], int]:
+        status: str | None = None,
+        cursor: str | None = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[list[BorrowRecord], int | None, str | None]:
         """
         获取借出记录列表
 
@@ -34,11 +52,14 @@ class BorrowRecordService:
             limit: 返回记录数
             artifact_id: 文物编号筛选
             status: 状态筛选
+            cursor: 分页游标（上一页的 next_cursor）
+            total_mode: 总数计算方式（exact/estimate/none）
 
         Returns:
-            (借出记录列表, 总数)
+            (借出记录列表（已加载照片组和文物）, 总数, 下一页游标)
         """
-        query = db.query(BorrowRecord)
+        # 响应中的照片组和文物批量加载，查询次数与每页条数无关
+        query = db.query(BorrowRecord).options(*AsyncBorrowRecordService._with_relations())
 
         # 按文物编号筛选（需要关联查询）
         if artifact_id:
@@ -52,14 +73,49 @@ class BorrowRecordService:
         if not status:
             query = query.filter(BorrowRecord.status == BorrowStatus.BORROWED.value)
 
-        # 按借出日期倒序
-        query = query.order_by(BorrowRecord.borrow_date.desc())
+        # 按 (借出日期, id) 倒序游标分页，总数在同一条查询中计算
+        records, total, next_cursor = keyset_paginate(
+            query, [BorrowRecord.borrow_date, BorrowRecord.id], limit,
+            cursor=cursor, offset=skip, total_mode=total_mode
+        )
 
-        # 获取总数
-        total = query.count()
+        return records, total, next_cursor
 
-        # 分页
-        records = query.offset(skip).limit(limit).all()
+    @staticmethod
+    def get_history(
+        db: Session,
+        artifact_id: int,
+        skip: int = 0,
+        limit: int = 20
+    ) -> tuple[list[BorrowRecord], int]:
+        """
+        获取文物的借出归还历史
+
+        照片组、归还记录及其照片组通过 selectinload 批量加载，
+        查询次数与借出记录数量无关
+
+        Args:
+            db: 数据库会话
+            artifact_id: 文物 ID
+            skip: 跳过记录数
+            limit: 返回记录数
+
+        Returns:
+            (借出记录列表（已加载归还记录和照片）, 总数)
+        """
+        query = (
+            db.query(BorrowRecord)
+            .filter(BorrowRecord.artifact_id == artifact_id)
+            .options(
+                selectinload(BorrowRecord.photos),
+                selectinload(BorrowRecord.return_records).selectinload(ReturnRecord.photos),
+            )
+        )
+
+        # 总数与本页数据在同一条查询中计算
+        records, total, _ = keyset_paginate(
+            query, [BorrowRecord.borrow_date, BorrowRecord.id], limit, offset=skip
+        )
 
         return records, total
 
@@ -90,17 +146,16 @@ class BorrowRecordService:
         Returns:
             借出记录对象或 None
         """
-        query = (
+        if only_active:
+            return BorrowRecordService.get_active_by_artifact_id(db, artifact_id)
+
+        return (
             db.query(BorrowRecord)
             .join(Artifact)
             .filter(Artifact.artifact_id == artifact_id)
+            .first()
         )
 
-        if only_active:
-            query = query.filter(BorrowRecord.status == BorrowStatus.BORROWED.value)
-
-        return query.first()
-
     @staticmethod
     def create(
         db: Session,
@@ -110,6 +165,9 @@ class BorrowRecordService:
         """
         创建借出记录
 
+        照片确认、借出记录和照片组在同一个事务中提交；
+        主键和时间戳由 INSERT ... RETURNING 取回，提交后不再 refresh
+
         Args:
             db: 数据库会话
             data: 创建数据
@@ -119,40 +177,66 @@ class BorrowRecordService:
             新创建的借出记录对象
 
         Raises:
-            ValueError: 文物不存在或已有活跃借出记录时
+            ValueError: 文物不存在、已有活跃借出记录或照片无法确认时（此时会话已回滚）
         """
-        # 查找文物
-        artifact = db.query(Artifact).filter(Artifact.id == data.artifact_id).first()
-        if not artifact:
-            raise ValueError("文物不存在")
+        photo_urls = data.photo_urls or [data.borrow_photo_url]
+        try:
+            with UnitOfWork(db) as uow:
+                ContentStore.claim(db, photo_urls)
+                db_record = BorrowRecord(
+                    artifact_id=data.artifact_id,
+                    borrow_photo_url=data.borrow_photo_url,
+                    borrow_date=data.borrow_date,
+                    expected_return_date=data.expected_return_date,
+                    status=BorrowStatus.BORROWED.value,
+                    operator_id=operator.id
+                )
+                db_record.photos = [
+                    BorrowPhoto(photo_url=url, position=position)
+                    for position, url in enumerate(photo_urls)
+                ]
+
+                # 直接插入：已借出由部分唯一索引 uq_borrow_records_active_artifact 拒绝，文物不存在由外键拒绝
+                db.add(db_record)
+                uow.after_commit(invalidate, BorrowRecordService.active_cache_key(data.artifact_id))
+        except IntegrityError:
+            # 工作单元已回滚，只在失败后查询原因
+            artifact = db.get(Artifact, data.artifact_id)
+            has_active = artifact is not None and db.scalar(
+                BorrowRecordService.active_record_query(data.artifact_id)
+            ) is not None
+            error = BorrowRecordService.conflict_error(artifact, has_active)
+            if error is None:
+                raise
+            raise error from None
 
-        # 检查是否已有活跃的借出记录
-        active_record = (
-            db.query(BorrowRecord)
-            .filter(
-                BorrowRecord.artifact_id == data.artifact_id,
-                BorrowRecord.status == BorrowStatus.BORROWED.value
-            )
-            .first()
-        )
-        if active_record:
-            raise ValueError(f"文物 {artifact.artifact_id} 已借出，尚未归还")
+        return db_record
 
-        # 创建借出记录
-        db_record = BorrowRecord(
-            artifact_id=data.artifact_id,
-            borrow_photo_url=data.borrow_photo_url,
-            borrow_date=data.borrow_date,
-            expected_return_date=data.expected_return_date,
-            status=BorrowStatus.BORROWED.value,
-            operator_id=operator.id
-        )
+    @staticmethod
+    def active_record_query(artifact_id: int):
+        """文物（内部 ID）活跃借出记录 ID 的查询"""
+        return select(BorrowRecord.id).where(
+            BorrowRecord.artifact_id == artifact_id,
+            BorrowRecord.status == BorrowStatus.BORROWED.value
+        ).limit(1)
 
-        db.add(db_record)
-        db.commit()
-        db.refresh(db_record)
+    @staticmethod
+    def conflict_error(artifact: Artifact | None, has_active: bool) -> ValueError | None:
+        """
+        将借出时的完整性错误转换为业务错误（只在插入失败后查询原因）
 
-        return db_record
+        Args:
+            artifact: 重新查询的文物（不存在时为 None）
+            has_active: 文物是否已有活跃借出记录
+
+        Returns:
+            ValueError；文物存在且没有活跃借出记录（其他原因导致的失败）时返回 None
+        """
+        if artifact is None:
+            return ValueError("文物不存在")
+        if has_active:
+            return ValueError(f"文物 {artifact.artifact_id} 已借出，尚未归还")
+        return None
 
     @staticmethod
     def mark_as_returned(db: Session, record: BorrowRecord) -> BorrowRecord:
@@ -168,10 +252,46 @@ class BorrowRecordService:
         """
         record.status = BorrowStatus.RETURNED.value
         db.commit()
+        invalidate(BorrowRecordService.active_cache_key(record.artifact_id))
         db.refresh(record)
 
         return record
 
+    @staticmethod
+    def _return_statement(record_id: int):
+        """将活跃借出记录标记为已归还的 UPDATE（已归还的记录不匹配）"""
+        return (
+            update(BorrowRecord)
+            .where(BorrowRecord.id == record_id, BorrowRecord.status == BorrowStatus.BORROWED.value)
+            .values(status=BorrowStatus.RETURNED.value)
+        )
+
+    @staticmethod
+    def mark_returned_by_id(db: Session, record_id: int) -> int | None:
+        """
+        在当前事务中将借出记录标记为已归还（不提交，供工作单元使用）
+
+        一条 UPDATE ... WHERE status = 'borrowed' RETURNING artifact_id，
+        不需要先查询借出记录；并发归还同一记录时只有一方匹配
+
+        Args:
+            db: 数据库会话
+            record_id: 借出记录 ID
+
+        Returns:
+            文物内部 ID（用于缓存失效）；记录不存在或已归还时返回 None
+        """
+        statement = BorrowRecordService._return_statement(record_id)
+        if db.get_bind().dialect.update_returning:
+            return db.execute(statement.returning(BorrowRecord.artifact_id)).scalar_one_or_none()
+
+        # 不支持 UPDATE ... RETURNING 的数据库
+        record = db.get(BorrowRecord, record_id)
+        if record is None or not record.is_active():
+            return None
+        db.execute(statement)
+        return record.artifact_id
+
     @staticmethod
     def delete(db: Session, record: BorrowRecord) -> None:
         """
@@ -184,13 +304,18 @@ class BorrowRecordService:
         注意:
             会级联删除关联的归还记录
         """
+        stale_key = BorrowRecordService.active_cache_key(record.artifact_id)
         db.delete(record)
         db.commit()
+        invalidate(stale_key)
 
     @staticmethod
     def get_active_by_artifact_id(db: Session, artifact_id: str) -> BorrowRecord | None:
         """
-        根据文物编号获取活跃的借出记录
+        根据文物编号获取活跃的借出记录（读穿缓存，“没有活跃记录”也会缓存）
+
+        借出、归还后缓存立即失效，但进程内缓存的失效只作用于当前 worker，
+        因此只有 redis 缓存使用 CACHE_TTL_SECONDS，进程内缓存最多 ACTIVE_LOAN_LOCAL_CACHE_SECONDS 秒
 
         Args:
             db: 数据库会话
@@ -199,12 +324,155 @@ class BorrowRecordService:
         Returns:
             活跃的借出记录对象或 None
         """
-        return (
-            db.query(BorrowRecord)
+        artifact = ArtifactService.get_by_artifact_id(db, artifact_id)
+        if artifact is None:
+            return None
+
+        return cached_row(
+            db, BorrowRecordService.active_cache_key(artifact.id), BorrowRecord,
+            lambda: (
+                db.query(BorrowRecord)
+                .filter(
+                    BorrowRecord.artifact_id == artifact.id,
+                    BorrowRecord.status == BorrowStatus.BORROWED.value
+                )
+                .first()
+            ),
+            cache_missing=True,
+            ttl=shared_ttl(settings.CACHE_TTL_SECONDS, settings.ACTIVE_LOAN_LOCAL_CACHE_SECONDS),
+        )
+
+
+class AsyncBorrowRecordService:
+    """借出记录服务类（异步版本，用于 AsyncSession，见 USE_ASYNC_DB）"""
+
+    @staticmethod
+    def _with_relations():
+        """预加载响应中用到的关系（异步会话不能隐式懒加载；同步列表查询也用于避免逐行懒加载）"""
+        return (selectinload(BorrowRecord.photos), selectinload(BorrowRecord.artifact))
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, record_id: int) -> BorrowRecord | None:
+        """
+        根据 ID 获取借出记录（已加载照片组和文物）
+
+        Args:
+            db: 异步数据库会话
+            record_id: 借出记录 ID
+
+        Returns:
+            借出记录对象或 None
+        """
+        result = await db.execute(
+            select(BorrowRecord)
+            .where(BorrowRecord.id == record_id)
+            .options(*AsyncBorrowRecordService._with_relations())
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_active_by_artifact_id(db: AsyncSession, artifact_id: str) -> BorrowRecord | None:
+        """
+        根据文物编号获取活跃的借出记录
+
+        Args:
+            db: 异步数据库会话
+            artifact_id: 文物编号
+
+        Returns:
+            活跃的借出记录对象或 None
+        """
+        result = await db.execute(
+            select(BorrowRecord)
             .join(Artifact)
-            .filter(
+            .where(
                 Artifact.artifact_id == artifact_id,
                 BorrowRecord.status == BorrowStatus.BORROWED.value
             )
-            .first()
+            .options(*AsyncBorrowRecordService._with_relations())
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def mark_returned_by_id(db: AsyncSession, record_id: int) -> int | None:
+        """
+        在当前事务中将借出记录标记为已归还（不提交，见 BorrowRecordService.mark_returned_by_id）
+
+        Args:
+            db: 异步数据库会话
+            record_id: 借出记录 ID
+
+        Returns:
+            文物内部 ID；记录不存在或已归还时返回 None
+        """
+        # 异步驱动（aiosqlite / asyncpg）均支持 RETURNING
+        result = await db.execute(
+            BorrowRecordService._return_statement(record_id).returning(BorrowRecord.artifact_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        data: BorrowRecordCreate,
+        operator: User
+    ) -> BorrowRecord:
+        """
+        创建借出记录
+
+        Args:
+            db: 异步数据库会话
+            data: 创建数据
+            operator: 操作员用户
+
+        Returns:
+            新创建的借出记录对象（已加载照片组和文物）
+
+        Raises:
+            ValueError: 文物不存在、已有活跃借出记录或照片无法确认时（此时会话已回滚）
+        """
+        # 确认照片（与记录在同一事务中提交）
+        photo_urls = data.photo_urls or [data.borrow_photo_url]
+        try:
+            await ContentStore.claim_async(db, photo_urls)
+        except ValueError:
+            await db.rollback()
+            raise
+
+        db_record = BorrowRecord(
+            artifact_id=data.artifact_id,
+            borrow_photo_url=data.borrow_photo_url,
+            borrow_date=data.borrow_date,
+            expected_return_date=data.expected_return_date,
+            status=BorrowStatus.BORROWED.value,
+            operator_id=operator.id
+        )
+        db_record.photos = [
+            BorrowPhoto(photo_url=url, position=position)
+            for position, url in enumerate(photo_urls)
+        ]
+
+        # 直接插入，冲突时再查询原因（见 BorrowRecordService.create）
+        db.add(db_record)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            artifact = await db.get(Artifact, data.artifact_id)
+            has_active = artifact is not None and await db.scalar(
+                BorrowRecordService.active_record_query(data.artifact_id)
+            ) is not None
+            error = BorrowRecordService.conflict_error(artifact, has_active)
+            if error is None:
+                raise
+            raise error from None
+        invalidate(BorrowRecordService.active_cache_key(data.artifact_id))
+
+        # 重新查询以加载数据库生成的字段和关系
+        result = await db.execute(
+            select(BorrowRecord)
+            .where(BorrowRecord.id == db_record.id)
+            .options(*AsyncBorrowRecordService._with_relations())
+            .execution_options(populate_existing=True)
         )
+        return result.scalars().one()
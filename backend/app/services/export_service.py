@@ -0,0 +1,237 @@
+"""
+数据导出服务
+
+按主键顺序流式导出文物、借出记录和归还记录（含比对结论）：
+查询使用 yield_per（PostgreSQL 上为服务端游标）分批取行，
+逐行序列化为 NDJSON 或 CSV 并按块输出，可选 gzip 压缩，
+内存占用只与批大小有关，与数据总量无关
+"""
+import csv
+import io
+import json
+import logging
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Engine, Select, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.artifact import Artifact
+from app.models.borrow_record import BorrowRecord
+from app.models.return_record import ReturnRecord
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# 支持的导出格式
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+EXPORT_FORMAT_PATTERN = f"^({FORMAT_NDJSON}|{FORMAT_CSV})$"
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+def _artifacts_query() -> Select:
+    return select(
+        Artifact.id,
+        Artifact.artifact_id,
+        Artifact.name,
+        Artifact.author,
+        Artifact.category,
+        Artifact.size,
+        Artifact.era,
+        Artifact.created_at,
+        Artifact.updated_at,
+    ).order_by(Artifact.id)
+
+
+def _borrow_records_query() -> Select:
+    return (
+        select(
+            BorrowRecord.id,
+            Artifact.artifact_id.label("artifact_code"),
+            Artifact.name.label("artifact_name"),
+            BorrowRecord.borrow_date,
+            BorrowRecord.expected_return_date,
+            BorrowRecord.status,
+            BorrowRecord.borrow_photo_url,
+            User.username.label("operator"),
+            BorrowRecord.created_at,
+        )
+        .join(Artifact, BorrowRecord.artifact_id == Artifact.id)
+        .join(User, BorrowRecord.operator_id == User.id)
+        .order_by(BorrowRecord.id)
+    )
+
+
+def _return_records_query() -> Select:
+    return_operator = aliased(User)
+    return (
+        select(
+            ReturnRecord.id,
+            ReturnRecord.borrow_record_id,
+            Artifact.artifact_id.label("artifact_code"),
+            Artifact.name.label("artifact_name"),
+            BorrowRecord.borrow_date,
+            ReturnRecord.return_date,
+            ReturnRecord.final_conclusion,
+            ReturnRecord.confidence,
+            ReturnRecord.comparison_result,
+            ReturnRecord.return_photo_url,
+            return_operator.username.label("operator"),
+            ReturnRecord.created_at,
+        )
+        .join(BorrowRecord, ReturnRecord.borrow_record_id == BorrowRecord.id)
+        .join(Artifact, BorrowRecord.artifact_id == Artifact.id)
+        .join(return_operator, ReturnRecord.operator_id == return_operator.id)
+        .order_by(ReturnRecord.id)
+    )
+
+
+# 数据集名称 -> 查询构造函数（列顺序即 CSV 列顺序）
+DATASETS: dict[str, Callable[[], Select]] = {
+    "artifacts": _artifacts_query,
+    "borrow-records": _borrow_records_query,
+    "return-records": _return_records_query,
+}
+DATASET_PATTERN = f"^({'|'.join(DATASETS)})$"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化类型 {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+class ExportService:
+    """数据导出服务类"""
+
+    BATCH_SIZE = 1000  # 每次从数据库取出的行数
+    CHUNK_SIZE = 64 * 1024  # 累积到该字节数后输出一块
+
+    @staticmethod
+    def filename(dataset: str, file_format: str, compress: bool) -> str:
+        """生成下载文件名，如 return-records-20261019.ndjson.gz"""
+        name = f"{dataset}-{date.today():%Y%m%d}.{file_format}"
+        return f"{name}.gz" if compress else name
+
+    @staticmethod
+    def media_type(file_format: str, compress: bool) -> str:
+        """导出内容的 MIME 类型"""
+        return GZIP_MEDIA_TYPE if compress else MEDIA_TYPES[file_format]
+
+    @staticmethod
+    def iter_rows(db: Session, dataset: str, batch_size: int = BATCH_SIZE) -> Iterator[dict[str, Any]]:
+        """
+        按主键顺序逐行读取数据集
+
+        Args:
+            db: 数据库会话
+            dataset: 数据集名称（见 DATASETS）
+            batch_size: 每次取出的行数
+
+        Yields:
+            列名 -> 值
+        """
+        result = db.execute(DATASETS[dataset]().execution_options(yield_per=batch_size))
+        for row in result:
+            yield dict(row._mapping)
+
+    @staticmethod
+    def iter_text(rows: Iterator[dict[str, Any]], columns: list[str], file_format: str) -> Iterator[str]:
+        """
+        将行序列化为文本块
+
+        Args:
+            rows: 行迭代器
+            columns: 列名（CSV 表头）
+            file_format: ndjson / csv
+
+        Yields:
+            约 CHUNK_SIZE 大小的文本块
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if file_format == FORMAT_CSV else None
+        if writer is not None:
+            writer.writerow(columns)
+
+        for row in rows:
+            if writer is not None:
+                writer.writerow([_csv_value(row[column]) for column in columns])
+            else:
+                buffer.write(json.dumps(row, ensure_ascii=False, default=_json_default) + "\n")
+            if buffer.tell() >= ExportService.CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def stream(
+        bind: Engine,
+        dataset: str,
+        file_format: str,
+        compress: bool = False,
+        batch_size: int | None = None,
+    ) -> Iterator[bytes]:
+        """
+        流式导出数据集
+
+        使用独立的会话：响应体在请求依赖关闭后才开始发送，不能复用请求会话
+
+        Args:
+            bind: 数据库引擎
+            dataset: 数据集名称（见 DATASETS）
+            file_format: ndjson / csv
+            compress: 是否 gzip 压缩
+            batch_size: 每次从数据库取出的行数（默认 BATCH_SIZE）
+
+        Yields:
+            响应体字节块
+        """
+        batch_size = batch_size or ExportService.BATCH_SIZE
+        started = time.perf_counter()
+        columns = [column.name for column in DATASETS[dataset]().selected_columns]
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+        count = 0
+
+        with Session(bind=bind) as db:
+            def counted_rows() -> Iterator[dict[str, Any]]:
+                nonlocal count
+                for row in ExportService.iter_rows(db, dataset, batch_size):
+                    count += 1
+                    yield row
+
+            for text in ExportService.iter_text(counted_rows(), columns, file_format):
+                data = text.encode("utf-8")
+                if compressor is None:
+                    yield data
+                else:
+                    compressed = compressor.compress(data)
+                    if compressed:
+                        yield compressed
+
+        if compressor is not None:
+            yield compressor.flush()
+
+        logger.info(
+            f"[EXPORT] {dataset} format={file_format} gzip={compress} rows={count} "
+            f"duration_ms={int((time.perf_counter() - started) * 1000)}"
+        )
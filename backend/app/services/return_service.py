@@ -3,14 +3,24 @@
 
 处理归还和 AI 对比相关的业务逻辑
 """
-from datetime import date
+from datetime import date, datetime, timezone
 from typing import Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import invalidate
+from app.core.unit_of_work import AsyncUnitOfWork, UnitOfWork
 from app.models.return_record import ReturnRecord, ConclusionType
+from app.models.comparison_score import ReturnDimensionScore
 from app.models.borrow_record import BorrowRecord
+from app.models.record_photo import ReturnPhoto
 from app.schemas.return_record import ReturnRecordCreate, ComparisonResultSchema
+from app.services.borrow_service import AsyncBorrowRecordService, BorrowRecordService
+from app.utils.content_store import ContentStore
+from app.utils.pagination import TOTAL_EXACT, keyset_paginate
 
 
 class ReturnRecordService:
@@ -21,20 +31,106 @@ class ReturnRecordService:
         db: Session,
         skip: int = 0,
         limit: int = 100,
-        artifact_id: str | None = None
-    ) -> tuple[list[ReturnRecord], int]:
-        """获取归还记录列表"""
+        artifact_id: str | None = None,
+        cursor: str | None = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[list[ReturnRecord], int | None, str | None]:
+        """
+        获取归还记录列表（按 (归还日期, id) 倒序游标分页，返回 (记录, 总数, 下一页游标)）
+
+        响应中的照片组、借出记录及其照片组和文物通过 selectinload 批量加载，查询次数与每页条数无关
+        """
         from app.models.artifact import Artifact
 
-        query = db.query(ReturnRecord).join(BorrowRecord).join(Artifact)
+        query = (
+            db.query(ReturnRecord).join(BorrowRecord).join(Artifact)
+            .options(*AsyncReturnRecordService._with_relations())
+        )
 
         if artifact_id:
             query = query.filter(Artifact.artifact_id == artifact_id)
 
-        total = query.count()
-        records = query.order_by(ReturnRecord.return_date.desc()).offset(skip).limit(limit).all()
+        records, total, next_cursor = keyset_paginate(
+            query, [ReturnRecord.return_date, ReturnRecord.id], limit,
+            cursor=cursor, offset=skip, total_mode=total_mode
+        )
+
+        return records, total, next_cursor
+
+    @staticmethod
+    def search(
+        db: Session,
+        dimension: str | None = None,
+        min_score: int | None = None,
+        max_score: int | None = None,
+        status: str | None = None,
+        min_confidence: int | None = None,
+        max_confidence: int | None = None,
+        final_conclusion: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int = 10,
+        cursor: str | None = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[list[ReturnRecord], int | None, str | None]:
+        """
+        按对比分数筛选归还记录（按 (归还日期, id) 倒序游标分页）
+
+        分数条件查询 return_dimension_scores 的 (dimension, score) / (dimension, status) 索引，
+        置信度条件查询 return_records.confidence 索引，不解析 comparison_result JSON；
+        响应中用到的关系批量加载（见 get_all）
+
+        Args:
+            db: 数据库会话
+            dimension: 维度，不指定时分数/状态条件匹配任一维度
+            min_score: 维度最低分数（含）
+            max_score: 维度最高分数（含）
+            status: 维度状态
+            min_confidence: 最低总体置信度（含）
+            max_confidence: 最高总体置信度（含）
+            final_conclusion: 最终结论
+            date_from: 归还日期起（含）
+            date_to: 归还日期止（含）
+            limit: 每页记录数
+            cursor: 上一页返回的 next_cursor
+            total_mode: 总数计算方式
+
+        Returns:
+            (记录, 总数, 下一页游标)
+        """
+        query = db.query(ReturnRecord).options(*AsyncReturnRecordService._with_relations())
+
+        score_conditions = []
+        if min_score is not None:
+            score_conditions.append(ReturnDimensionScore.score >= min_score)
+        if max_score is not None:
+            score_conditions.append(ReturnDimensionScore.score <= max_score)
+        if status:
+            score_conditions.append(ReturnDimensionScore.status == status)
 
-        return records, total
+        if dimension:
+            # 每条记录每个维度至多一行，直接连接不会产生重复记录
+            query = query.join(ReturnRecord.dimension_scores).filter(
+                ReturnDimensionScore.dimension == dimension, *score_conditions
+            )
+        elif score_conditions:
+            query = query.filter(ReturnRecord.dimension_scores.any(and_(*score_conditions)))
+
+        if min_confidence is not None:
+            query = query.filter(ReturnRecord.confidence >= min_confidence)
+        if max_confidence is not None:
+            query = query.filter(ReturnRecord.confidence <= max_confidence)
+        if final_conclusion:
+            query = query.filter(ReturnRecord.final_conclusion == final_conclusion)
+        if date_from:
+            query = query.filter(ReturnRecord.return_date >= date_from)
+        if date_to:
+            query = query.filter(ReturnRecord.return_date <= date_to)
+
+        return keyset_paginate(
+            query, [ReturnRecord.return_date, ReturnRecord.id], limit,
+            cursor=cursor, total_mode=total_mode
+        )
 
     @staticmethod
     def get_by_id(db: Session, record_id: int) -> ReturnRecord | None:
@@ -42,14 +138,14 @@ class ReturnRecordService:
         return db.query(ReturnRecord).filter(ReturnRecord.id == record_id).first()
 
     @staticmethod
-    def create(
-        db: Session,
+    def build(
         borrow_record_id: int,
         return_photo_url: str,
         comparison_result: dict | None,
-        operator_id: int
+        operator_id: int,
+        photo_urls: list[str] | None = None
     ) -> ReturnRecord:
-        """创建归还记录"""
+        """构造归还记录及照片组（未加入会话）"""
         db_record = ReturnRecord(
             borrow_record_id=borrow_record_id,
             return_photo_url=return_photo_url,
@@ -58,23 +154,106 @@ class ReturnRecordService:
             final_conclusion=comparison_result.get("conclusion") if comparison_result else None,
             operator_id=operator_id
         )
+        db_record.photos = [
+            ReturnPhoto(photo_url=url, position=position)
+            for position, url in enumerate(photo_urls or [return_photo_url])
+        ]
+        return db_record
 
-        db.add(db_record)
-        db.commit()
-        db.refresh(db_record)
+    @staticmethod
+    def create(
+        db: Session,
+        borrow_record_id: int,
+        return_photo_url: str,
+        comparison_result: dict | None,
+        operator_id: int,
+        photo_urls: list[str] | None = None
+    ) -> ReturnRecord:
+        """
+        创建归还记录（photo_urls 为照片组，含主照片 return_photo_url）
+
+        借出状态更新、照片确认、归还记录、照片组和统计汇总在同一个事务中提交；
+        主键和时间戳由 INSERT ... RETURNING 取回，提交后不再 refresh
 
-        # 更新借出记录状态
-        borrow_record = db.query(BorrowRecord).filter(BorrowRecord.id == borrow_record_id).first()
-        if borrow_record:
-            borrow_record.status = "returned"
-            db.commit()
+        Raises:
+            ValueError: 借出记录不存在或已归还、照片无法确认时（事务已回滚）
+        """
+        with UnitOfWork(db) as uow:
+            artifact_id = BorrowRecordService.mark_returned_by_id(db, borrow_record_id)
+            if artifact_id is None:
+                raise ValueError("借出记录不存在或已归还")
+            ContentStore.claim(db, photo_urls or [return_photo_url])
+            db_record = ReturnRecordService.build(
+                borrow_record_id, return_photo_url, comparison_result, operator_id, photo_urls
+            )
+            db.add(db_record)
+            uow.after_commit(invalidate, BorrowRecordService.active_cache_key(artifact_id))
 
         return db_record
 
     @staticmethod
     def update_conclusion(db: Session, record: ReturnRecord, conclusion: ConclusionType) -> ReturnRecord:
-        """更新最终结论"""
-        record.final_conclusion = conclusion.value
-        db.commit()
-        db.refresh(record)
+        """更新最终结论并标记为人工复核（提交后不 refresh，已加载的字段保持可用）"""
+        with UnitOfWork(db):
+            record.final_conclusion = conclusion.value
+            record.reviewed_at = datetime.now(timezone.utc)
         return record
+
+
+class AsyncReturnRecordService:
+    """归还记录服务类（异步版本，用于 AsyncSession，见 USE_ASYNC_DB）"""
+
+    @staticmethod
+    def _with_relations():
+        """预加载响应中用到的关系（异步会话不能隐式懒加载；同步列表查询也用于避免逐行懒加载）"""
+        return (
+            selectinload(ReturnRecord.photos),
+            selectinload(ReturnRecord.borrow_record).selectinload(BorrowRecord.photos),
+            selectinload(ReturnRecord.borrow_record).selectinload(BorrowRecord.artifact),
+        )
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, record_id: int) -> ReturnRecord | None:
+        """根据 ID 获取归还记录（已加载照片组和借出记录）"""
+        result = await db.execute(
+            select(ReturnRecord)
+            .where(ReturnRecord.id == record_id)
+            .options(*AsyncReturnRecordService._with_relations())
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        borrow_record_id: int,
+        return_photo_url: str,
+        comparison_result: dict | None,
+        operator_id: int,
+        photo_urls: list[str] | None = None
+    ) -> ReturnRecord:
+        """
+        创建归还记录并将借出记录标记为已归还（同一事务提交，见 ReturnRecordService.create）
+
+        Raises:
+            ValueError: 借出记录不存在或已归还、照片无法确认时（事务已回滚）
+        """
+        async with AsyncUnitOfWork(db) as uow:
+            artifact_id = await AsyncBorrowRecordService.mark_returned_by_id(db, borrow_record_id)
+            if artifact_id is None:
+                raise ValueError("借出记录不存在或已归还")
+            await ContentStore.claim_async(db, photo_urls or [return_photo_url])
+            db_record = ReturnRecordService.build(
+                borrow_record_id, return_photo_url, comparison_result, operator_id, photo_urls
+            )
+            db.add(db_record)
+            uow.after_commit(invalidate, BorrowRecordService.active_cache_key(artifact_id))
+
+        # 借出记录通常已由调用方连同关系加载（此时 get 直接命中会话，不查询数据库）
+        borrow_record = await db.get(
+            BorrowRecord, borrow_record_id, options=AsyncBorrowRecordService._with_relations()
+        )
+        unloaded = inspect(borrow_record).unloaded
+        if "photos" in unloaded or "artifact" in unloaded:
+            await db.refresh(borrow_record, ["photos", "artifact"])
+        set_committed_value(db_record, "borrow_record", borrow_record)
+        return db_record
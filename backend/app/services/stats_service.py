@@ -0,0 +1,156 @@
+"""
+统计服务层
+
+归还结论统计读取 return_stats 汇总表（由 ReturnRecord 的 ORM 事件增量维护，见 app.models.return_stat），
+逾期借出统计直接查询活跃借出记录（只涉及未归还的少量记录）
+"""
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.artifact import Artifact
+from app.models.borrow_record import BorrowRecord, BorrowStatus
+from app.models.return_record import ConclusionType, ReturnRecord
+from app.models.return_stat import PENDING_CONCLUSION, ReturnStat, month_start
+from app.models.user import User
+from app.schemas.stats import (
+    ConclusionStatsItem,
+    ConclusionStatsResponse,
+    OverdueCategoryItem,
+    OverdueStatsResponse,
+)
+
+# 统计分组方式
+GROUP_BY_PATTERN = "^(month|year|category|operator)$"
+
+CONCLUSIONS = [conclusion.value for conclusion in ConclusionType] + [PENDING_CONCLUSION]
+
+
+class StatsService:
+    """统计服务类"""
+
+    @staticmethod
+    def conclusion_stats(
+        db: Session,
+        group_by: str = "month",
+        date_from: date | None = None,
+        date_to: date | None = None
+    ) -> ConclusionStatsResponse:
+        """
+        按月份 / 年份 / 类别 / 操作员统计归还结论
+
+        Args:
+            db: 数据库会话
+            group_by: month / year / category / operator
+            date_from: 起始日期（按所在月份计）
+            date_to: 截止日期（按所在月份计，含当月）
+
+        Returns:
+            分组统计和合计
+        """
+        if group_by == "month":
+            key_column = ReturnStat.period
+        elif group_by == "year":
+            key_column = func.extract("year", ReturnStat.period)
+        elif group_by == "category":
+            key_column = ReturnStat.category
+        else:
+            key_column = User.username
+
+        query = select(key_column, ReturnStat.conclusion, func.sum(ReturnStat.count))
+        if group_by == "operator":
+            query = query.join(User, ReturnStat.operator_id == User.id)
+        if date_from:
+            query = query.where(ReturnStat.period >= month_start(date_from))
+        if date_to:
+            query = query.where(ReturnStat.period <= month_start(date_to))
+        query = query.group_by(key_column, ReturnStat.conclusion).order_by(key_column)
+
+        items: dict[str, ConclusionStatsItem] = {}
+        total = ConclusionStatsItem(key="all")
+        for key, conclusion, count in db.execute(query):
+            count = int(count or 0)
+            if not count or conclusion not in CONCLUSIONS:
+                continue
+            if group_by == "month":
+                label = key.strftime("%Y-%m")
+            elif group_by == "year":
+                label = str(int(key))
+            else:
+                label = key
+            item = items.setdefault(label, ConclusionStatsItem(key=label))
+            for summary in (item, total):
+                setattr(summary, conclusion, getattr(summary, conclusion) + count)
+                summary.total += count
+
+        return ConclusionStatsResponse(group_by=group_by, items=list(items.values()), total=total)
+
+    @staticmethod
+    def overdue_stats(db: Session, today: date | None = None) -> OverdueStatsResponse:
+        """
+        统计逾期未归还的借出记录（预计归还日期早于今天且仍为借出状态）
+
+        Args:
+            db: 数据库会话
+            today: 统计日期（默认今天）
+
+        Returns:
+            逾期总数、最早预计归还日期和按类别统计
+        """
+        today = today or date.today()
+        rows = db.execute(
+            select(Artifact.category, func.count(), func.min(BorrowRecord.expected_return_date))
+            .join(Artifact, BorrowRecord.artifact_id == Artifact.id)
+            .where(
+                BorrowRecord.status == BorrowStatus.BORROWED.value,
+                BorrowRecord.expected_return_date < today,
+            )
+            .group_by(Artifact.category)
+            .order_by(func.count().desc())
+        ).all()
+
+        oldest = [row[2] for row in rows if row[2] is not None]
+        return OverdueStatsResponse(
+            total=sum(row[1] for row in rows),
+            oldest_expected_return_date=min(oldest) if oldest else None,
+            by_category=[OverdueCategoryItem(category=row[0], count=row[1]) for row in rows],
+        )
+
+    @staticmethod
+    def rebuild(db: Session, batch_size: int = 1000) -> int:
+        """
+        按现有归还记录重建汇总表（在一个事务中清空并重新写入）
+
+        Args:
+            db: 数据库会话
+            batch_size: 每次读取的归还记录数
+
+        Returns:
+            汇总行数
+        """
+        counts: Counter[tuple[date, str, int, str]] = Counter()
+        result = db.execute(
+            select(
+                ReturnRecord.return_date,
+                func.coalesce(ReturnRecord.artifact_category, Artifact.category),
+                ReturnRecord.operator_id,
+                ReturnRecord.final_conclusion,
+            )
+            .join(BorrowRecord, ReturnRecord.borrow_record_id == BorrowRecord.id)
+            .join(Artifact, BorrowRecord.artifact_id == Artifact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for return_date, category, operator_id, conclusion in result:
+            counts[(month_start(return_date), category, operator_id, conclusion or PENDING_CONCLUSION)] += 1
+
+        db.execute(delete(ReturnStat))
+        if counts:
+            db.execute(insert(ReturnStat), [
+                {"period": period, "category": category, "operator_id": operator_id,
+                 "conclusion": conclusion, "count": count}
+                for (period, category, operator_id, conclusion), count in counts.items()
+            ])
+        db.commit()
+        return len(counts)
@@ -0,0 +1,323 @@
+"""
+上传文件清理服务
+
+对比 uploads 目录与借出/归还记录（含照片组）中引用的照片路径，
+删除过期的临时文件和不再被任何记录引用的孤立文件。
+内容寻址存储中过期未确认的上传引用先释放，仍有引用（ref_count > 0）的文件不删除；
+多个工作进程同时启用时，通过锁保证同一时间只有一个进程在清理
+"""
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from sqlalchemy import delete, select, text, union
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.borrow_record import BorrowRecord
+from app.models.record_photo import BorrowPhoto, ReturnPhoto
+from app.models.return_record import ReturnRecord
+from app.models.stored_file import StoredFile
+from app.schemas.admin import UploadSweepReport
+from app.utils.content_store import ContentStore
+from app.utils.file import TEMP_DIR
+from app.utils.resumable_upload import RESUMABLE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class UploadSweeper:
+    """上传文件清理服务类"""
+
+    BATCH_SIZE = 500  # 每批删除的文件数
+    LOCK_KEY = 0x75706C64  # PostgreSQL 咨询锁的键
+    LOCK_FILE = ".sweep.lock"  # 其他数据库使用的锁文件（位于 uploads 目录下，隐藏文件不会被清理）
+
+    @staticmethod
+    @contextmanager
+    def exclusive(db: Session) -> Iterator[bool]:
+        """
+        清理锁：同一时间只允许一个进程清理
+
+        PostgreSQL 在独立连接上持有会话级咨询锁；其他数据库（SQLite 只能单机部署）对锁文件加 flock。
+        都不阻塞，拿不到锁时返回 False
+
+        Args:
+            db: 数据库会话（只用于取得数据库连接）
+
+        Yields:
+            是否拿到锁
+        """
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql":
+            with bind.connect() as connection:
+                acquired = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": UploadSweeper.LOCK_KEY})
+                try:
+                    yield bool(acquired)
+                finally:
+                    if acquired:
+                        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": UploadSweeper.LOCK_KEY})
+                        connection.commit()
+            return
+
+        if fcntl is None:
+            yield True
+            return
+
+        settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        with open(settings.UPLOAD_DIR / UploadSweeper.LOCK_FILE, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def referenced_paths_query():
+        """所有记录引用的照片路径"""
+        return union(
+            select(BorrowRecord.borrow_photo_url),
+            select(ReturnRecord.return_photo_url),
+            select(BorrowPhoto.photo_url),
+            select(ReturnPhoto.photo_url),
+        )
+
+    @staticmethod
+    def collect_referenced(db: Session) -> set[str]:
+        """
+        获取所有被记录引用的照片路径
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            路径集合（相对于 uploads 目录）
+        """
+        result = db.execute(UploadSweeper.referenced_paths_query().execution_options(yield_per=5000))
+        return {path for (path,) in result if path}
+
+    @staticmethod
+    def filter_referenced(db: Session, paths: list[str]) -> set[str]:
+        """
+        删除前再次确认，返回 paths 中当前仍被引用的路径
+
+        Args:
+            db: 数据库会话
+            paths: 待确认的路径
+
+        Returns:
+            仍被引用的路径集合
+        """
+        referenced: set[str] = set()
+        for i in range(0, len(paths), UploadSweeper.BATCH_SIZE):
+            batch = paths[i:i + UploadSweeper.BATCH_SIZE]
+            query = union(
+                select(BorrowRecord.borrow_photo_url).where(BorrowRecord.borrow_photo_url.in_(batch)),
+                select(ReturnRecord.return_photo_url).where(ReturnRecord.return_photo_url.in_(batch)),
+                select(BorrowPhoto.photo_url).where(BorrowPhoto.photo_url.in_(batch)),
+                select(ReturnPhoto.photo_url).where(ReturnPhoto.photo_url.in_(batch)),
+            )
+            referenced.update(path for (path,) in db.execute(query))
+        return referenced
+
+    @staticmethod
+    def _scan_dir(path: str) -> tuple[list[tuple[str, float, int]], list[str]]:
+        """扫描单个目录，返回 (文件列表 [(路径, 修改时间, 大小)], 子目录列表)"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # 跳过隐藏文件和目录（.gitkeep、缩略图缓存等）
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        files.append((entry.path, stat.st_mtime, stat.st_size))
+        except FileNotFoundError:
+            pass
+        return files, subdirs
+
+    @staticmethod
+    def scan(root: Path, executor: ThreadPoolExecutor) -> list[tuple[str, float, int]]:
+        """
+        并行扫描上传目录
+
+        每个子目录作为独立任务提交到线程池，发现的子目录继续提交，
+        大目录（如 cas 分片）可以同时扫描
+
+        Args:
+            root: 上传根目录
+            executor: 线程池
+
+        Returns:
+            [(相对路径, 修改时间, 大小)]
+        """
+        root_prefix = len(str(root)) + 1
+        files: list[tuple[str, float, int]] = []
+        pending: set[Future] = {executor.submit(UploadSweeper._scan_dir, str(root))}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, subdirs = future.result()
+                files.extend(
+                    (path[root_prefix:].replace(os.sep, "/"), mtime, size)
+                    for path, mtime, size in found
+                )
+                pending.update(executor.submit(UploadSweeper._scan_dir, d) for d in subdirs)
+
+        return files
+
+    @staticmethod
+    def _remove(path: Path, cutoff: float) -> int:
+        """删除文件，返回释放的字节数（文件已不存在或扫描后被更新过时返回 0）"""
+        try:
+            stat = path.stat()
+            if stat.st_mtime >= cutoff:
+                return 0
+            path.unlink()
+            return stat.st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def sweep(db: Session, dry_run: bool = False, now: float | None = None) -> UploadSweepReport:
+        """
+        执行一次清理
+
+        - uploads/temp 中超过 TEMP_UPLOAD_TTL_HOURS 的文件，以及同样时间内没有新分片的断点续传
+        - 其他目录中未被任何记录引用、且超过 ORPHAN_UPLOAD_GRACE_HOURS 的文件
+          （宽限期避免误删刚上传、尚未写入记录的文件）
+        - 内容寻址存储中超过 TEMP_UPLOAD_TTL_HOURS 仍未确认的上传引用先释放（计入 expired_temp），
+          文件只在引用计数归零（ref_count <= 0）或没有计数记录时删除
+
+        其他进程正在清理时直接返回（skipped=True）
+
+        Args:
+            db: 数据库会话
+            dry_run: 只统计不删除
+            now: 当前时间戳（测试用）
+
+        Returns:
+            清理结果
+        """
+        with UploadSweeper.exclusive(db) as acquired:
+            if not acquired:
+                logger.info("[SWEEP] Another process is sweeping uploads, skipped")
+                return UploadSweepReport(
+                    dry_run=dry_run, skipped=True, scanned=0, referenced=0, expired_temp=0,
+                    orphaned=0, deleted=0, bytes_freed=0, duration_ms=0,
+                )
+            return UploadSweeper._sweep(db, dry_run, now)
+
+    @staticmethod
+    def _sweep(db: Session, dry_run: bool, now: float | None) -> UploadSweepReport:
+        """执行一次清理（调用方已持有清理锁）"""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        temp_cutoff = now - settings.TEMP_UPLOAD_TTL_HOURS * 3600
+        orphan_cutoff = now - settings.ORPHAN_UPLOAD_GRACE_HOURS * 3600
+        root = settings.UPLOAD_DIR
+
+        # 内容寻址存储中过期未确认的上传：释放引用，计数归零的文件随之删除
+        expired_content = ContentStore.expire_unclaimed(
+            db, datetime.fromtimestamp(temp_cutoff, timezone.utc), dry_run=dry_run
+        )
+        expired_paths = {path for path, _ in expired_content}
+
+        referenced = UploadSweeper.collect_referenced(db)
+
+        with ThreadPoolExecutor(max_workers=settings.UPLOAD_SWEEP_WORKERS) as executor:
+            files = UploadSweeper.scan(root, executor)
+
+            expired_temp = []
+            orphaned = []
+            cutoffs = {}
+            for relative_path, mtime, _ in files:
+                if relative_path in referenced or relative_path in expired_paths:
+                    continue
+                if relative_path.startswith((f"{TEMP_DIR}/", f"{RESUMABLE_DIR}/")):
+                    if mtime < temp_cutoff:
+                        expired_temp.append(relative_path)
+                        cutoffs[relative_path] = temp_cutoff
+                elif mtime < orphan_cutoff:
+                    orphaned.append(relative_path)
+                    cutoffs[relative_path] = orphan_cutoff
+
+            deleted = 0 if dry_run else len(expired_content)
+            bytes_freed = 0 if dry_run else sum(size for _, size in expired_content)
+            if not dry_run:
+                candidates = expired_temp + orphaned
+                for i in range(0, len(candidates), UploadSweeper.BATCH_SIZE):
+                    batch = candidates[i:i + UploadSweeper.BATCH_SIZE]
+
+                    # 扫描期间可能有新记录引用了这些文件（如临时文件被确认）
+                    still_referenced = UploadSweeper.filter_referenced(db, batch)
+                    batch = [path for path in batch if path not in still_referenced]
+
+                    # 内容寻址存储：只删除计数已归零的记录，删除后仍有记录的路径（ref_count > 0）保留文件。
+                    # 删除的记录在文件删除完成、事务提交前保持锁定，与 ContentStore.release 相同
+                    cas_paths = [path for path in batch if ContentStore.is_content_addressed(path)]
+                    if cas_paths:
+                        db.execute(delete(StoredFile).where(StoredFile.path.in_(cas_paths), StoredFile.ref_count <= 0))
+                        live = set(db.scalars(select(StoredFile.path).where(StoredFile.path.in_(cas_paths))))
+                        batch = [path for path in batch if path not in live]
+
+                    freed = list(executor.map(
+                        UploadSweeper._remove,
+                        (root / path for path in batch),
+                        (cutoffs[path] for path in batch),
+                    ))
+                    db.commit()
+                    deleted += sum(1 for size in freed if size)
+                    bytes_freed += sum(freed)
+
+        report = UploadSweepReport(
+            dry_run=dry_run,
+            scanned=len(files),
+            referenced=len(referenced),
+            expired_temp=len(expired_temp) + len(expired_content),
+            orphaned=len(orphaned),
+            deleted=deleted,
+            bytes_freed=bytes_freed,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+        logger.info(f"[SWEEP] {report.model_dump()}")
+        return report
+
+    @staticmethod
+    async def run_periodically() -> None:
+        """后台定期执行清理（在应用生命周期内运行）"""
+        def sweep_once() -> None:
+            db = SessionLocal()
+            try:
+                UploadSweeper.sweep(db)
+            finally:
+                db.close()
+
+        while True:
+            await asyncio.sleep(settings.UPLOAD_SWEEP_INTERVAL_MINUTES * 60)
+            try:
+                await run_in_threadpool(sweep_once)
+            except Exception as e:
+                logger.error(f"[SWEEP] Upload sweep failed: {type(e).__name__}: {e}", exc_info=True)
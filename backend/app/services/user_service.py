@@ -0,0 +1,82 @@
+"""
+用户服务层
+
+提供用户查询和保存的数据库操作（密码哈希在调用方通过 app.core.security 的异步函数完成）
+"""
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+class UserService:
+    """用户服务类"""
+
+    @staticmethod
+    def get_by_id(db: Session, user_id: int) -> User | None:
+        """
+        根据 ID 获取用户
+
+        Args:
+            db: 数据库会话
+            user_id: 用户 ID
+
+        Returns:
+            用户对象或 None
+        """
+        return db.query(User).filter(User.id == user_id).first()
+
+    @staticmethod
+    def get_by_username(db: Session, username: str) -> User | None:
+        """
+        根据用户名获取用户
+
+        Args:
+            db: 数据库会话
+            username: 用户名
+
+        Returns:
+            用户对象或 None
+        """
+        return db.query(User).filter(User.username == username).first()
+
+    @staticmethod
+    def create(db: Session, username: str, password_hash: str, role: str) -> User:
+        """
+        创建用户
+
+        Args:
+            db: 数据库会话
+            username: 用户名
+            password_hash: 密码哈希
+            role: 角色
+
+        Returns:
+            新创建的用户对象
+        """
+        user = User(username=username, password_hash=password_hash, role=role)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    @staticmethod
+    def update(db: Session, user: User, role: str | None = None, password_hash: str | None = None) -> User:
+        """
+        更新用户角色或密码哈希
+
+        Args:
+            db: 数据库会话
+            user: 用户对象
+            role: 新角色（None 表示不修改）
+            password_hash: 新密码哈希（None 表示不修改）
+
+        Returns:
+            更新后的用户对象
+        """
+        if role is not None:
+            user.role = role
+        if password_hash is not None:
+            user.password_hash = password_hash
+        db.commit()
+        db.refresh(user)
+        return user
@@ -0,0 +1,51 @@
+"""
+AI 对比结果解析
+
+从 ReturnRecord.comparison_result（JSON）中取出总体置信度和各维度分数/状态，
+写入 return_records.confidence 和 return_dimension_scores，便于按分数建索引查询。
+早期或手工录入的结果可能缺字段或类型不对，无法解析的值记为 None / 跳过
+"""
+from typing import Any
+
+# 对比维度（与 ai_service.config.DIMENSIONS 保持一致）
+DIMENSIONS = ["seal", "brushwork", "paper", "inscription", "composition", "watermark"]
+DIMENSION_PATTERN = f"^({'|'.join(DIMENSIONS)})$"
+
+# 维度状态（与 ai_service.config.DimensionStatus 保持一致）
+DIMENSION_STATUSES = ["normal", "suspicious", "abnormal"]
+DIMENSION_STATUS_PATTERN = f"^({'|'.join(DIMENSION_STATUSES)})$"
+
+
+def _as_int(value: Any) -> int | None:
+    """分数转为整数（布尔值和无法转换的值返回 None）"""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_scores(comparison_result: Any) -> tuple[int | None, list[tuple[str, int | None, str | None]]]:
+    """
+    解析对比结果
+
+    Args:
+        comparison_result: ReturnRecord.comparison_result
+
+    Returns:
+        (总体置信度, [(维度, 分数, 状态)])
+    """
+    if not isinstance(comparison_result, dict):
+        return None, []
+
+    dimensions = comparison_result.get("dimensions")
+    scores = []
+    if isinstance(dimensions, dict):
+        for dimension, detail in dimensions.items():
+            if not isinstance(dimension, str) or not isinstance(detail, dict):
+                continue
+            status = detail.get("status")
+            scores.append((dimension[:30], _as_int(detail.get("score")), status if isinstance(status, str) else None))
+
+    return _as_int(comparison_result.get("confidence")), scores
@@ -0,0 +1,319 @@
+"""
+内容寻址存储
+
+按文件内容的 sha256 命名并分片存放上传文件（uploads/cas/ab/cd/abcd...jpg），
+相同内容只保存一份，通过 stored_files 表维护引用计数。
+引用计数用原子的 UPDATE 在独立的短事务中增减，不提交调用方会话。
+每次上传的引用先记为未确认（unclaimed），创建记录时在记录的事务中转为记录的引用（claim），
+过期未确认的引用由清理任务释放（expire_unclaimed）
+"""
+import os
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.stored_file import StoredFile
+
+# 内容寻址存储的根目录（相对于 uploads 目录）
+CAS_DIR = "cas"
+
+# 照片无法确认时的错误信息
+UNCLAIMED_PHOTO_MISSING = "临时照片不存在或已过期，请重新上传"
+
+
+class ContentStore:
+    """内容寻址存储"""
+
+    @staticmethod
+    def relative_path_for(sha256: str, ext: str) -> str:
+        """
+        计算文件的存储路径
+
+        Args:
+            sha256: 文件内容 sha256
+            ext: 扩展名（含点号）
+
+        Returns:
+            相对于 uploads 目录的路径
+        """
+        return f"{CAS_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext.lower()}"
+
+    @staticmethod
+    def is_content_addressed(relative_path: str) -> bool:
+        """是否为内容寻址存储中的文件"""
+        return relative_path.startswith(f"{CAS_DIR}/")
+
+    @staticmethod
+    def sha256_of(relative_path: str) -> str | None:
+        """
+        从存储路径中取出内容哈希
+
+        下游缓存（特征、对比结果）可直接以此为键
+
+        Args:
+            relative_path: 相对于 uploads 目录的路径
+
+        Returns:
+            sha256，非内容寻址路径返回 None
+        """
+        if not ContentStore.is_content_addressed(relative_path):
+            return None
+        return Path(relative_path).stem
+
+    @staticmethod
+    def _session(db: Session) -> Session:
+        """
+        引用计数使用独立的短事务会话
+
+        与调用方会话连接同一数据库，提交时不会连带提交调用方未完成的改动
+        """
+        return Session(bind=db.get_bind())
+
+    @staticmethod
+    def _adjust(session: Session, sha256: str, delta: int, unclaimed: int = 0) -> tuple[int, str] | None:
+        """
+        原子地调整引用计数（UPDATE ... SET ref_count = ref_count + delta），并锁定该行到事务结束
+
+        Args:
+            session: 引用计数会话
+            sha256: 文件内容 sha256
+            delta: 计数增量
+            unclaimed: 未确认引用数的增量（为负时要求有足够的未确认引用，否则不调整）
+
+        Returns:
+            (调整后的计数, 存储路径)，记录不存在或未确认引用不足时返回 None
+        """
+        conditions = [StoredFile.sha256 == sha256]
+        values = {"ref_count": StoredFile.ref_count + delta}
+        if unclaimed > 0:
+            values.update(unclaimed=StoredFile.unclaimed + unclaimed, unclaimed_at=datetime.now(timezone.utc))
+        elif unclaimed < 0:
+            conditions.append(StoredFile.unclaimed >= -unclaimed)
+            values.update(unclaimed=StoredFile.unclaimed + unclaimed)
+
+        statement = update(StoredFile).where(*conditions).values(**values)
+        if session.get_bind().dialect.update_returning:
+            row = session.execute(statement.returning(StoredFile.ref_count, StoredFile.path)).one_or_none()
+            return tuple(row) if row is not None else None
+
+        # 不支持 UPDATE ... RETURNING 的数据库：先锁定再更新
+        row = session.execute(
+            select(StoredFile.ref_count, StoredFile.path).where(*conditions).with_for_update()
+        ).one_or_none()
+        if row is None:
+            return None
+        session.execute(statement)
+        return row.ref_count + delta, row.path
+
+    @staticmethod
+    def ingest(db: Session, source: Path, sha256: str, size: int, ext: str) -> str:
+        """
+        将已校验的文件纳入存储，引用计数 +1（记为未确认，创建记录时 claim）
+
+        内容已存在时直接删除 source 并复用已有文件。
+        计数在独立的短事务中完成，不提交调用方会话
+
+        Args:
+            db: 数据库会话（只用于取得数据库连接）
+            source: 已写入磁盘并校验通过的临时文件
+            sha256: 文件内容 sha256
+            size: 文件字节数
+            ext: 扩展名（含点号）
+
+        Returns:
+            存储路径（相对于 uploads 目录）
+        """
+        with ContentStore._session(db) as session:
+            while True:
+                adjusted = ContentStore._adjust(session, sha256, 1, unclaimed=1)
+                if adjusted is not None:
+                    relative_path = adjusted[1]
+                    target = settings.UPLOAD_DIR / relative_path
+                    if target.exists():
+                        os.remove(source)
+                    else:
+                        # 记录存在但文件丢失：用新上传的内容恢复
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        os.replace(source, target)
+                    session.commit()
+                    return relative_path
+
+                session.add(StoredFile(
+                    sha256=sha256, path=ContentStore.relative_path_for(sha256, ext), size=size, ref_count=1,
+                    unclaimed=1, unclaimed_at=datetime.now(timezone.utc),
+                ))
+                try:
+                    session.flush()
+                except IntegrityError:
+                    # 并发上传了相同内容，改为在对方创建的记录上计数
+                    session.rollback()
+                    continue
+                break
+
+            # 记录已写入并锁定，并发的 release 不会在文件移入后将其删除
+            relative_path = ContentStore.relative_path_for(sha256, ext)
+            target = settings.UPLOAD_DIR / relative_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+            try:
+                session.commit()
+            except Exception:
+                target.unlink(missing_ok=True)
+                raise
+            return relative_path
+
+    @staticmethod
+    def contains(db: Session, relative_path: str) -> bool:
+        """
+        文件是否仍在存储中且有未确认的引用（确认临时上传前的预检查，最终以 claim 为准）
+
+        Args:
+            db: 数据库会话（只用于取得数据库连接）
+            relative_path: 存储路径
+
+        Returns:
+            记录存在、文件未丢失且有未确认的引用时返回 True
+        """
+        sha256 = ContentStore.sha256_of(relative_path)
+        if sha256 is None:
+            return False
+
+        with ContentStore._session(db) as session:
+            stored = session.get(StoredFile, sha256)
+            return (
+                stored is not None
+                and stored.unclaimed > 0
+                and stored.path == relative_path
+                and (settings.UPLOAD_DIR / relative_path).exists()
+            )
+
+    @staticmethod
+    def _claim_statements(photo_urls: Iterable[str]):
+        """
+        确认照片的 UPDATE（每张内容寻址照片一条）
+
+        UPDATE ... SET unclaimed = unclaimed - 1 WHERE path = :path AND unclaimed > 0：
+        一个未确认引用转为记录的引用（引用计数不变），没有未确认引用时不匹配
+        """
+        for url in photo_urls:
+            if ContentStore.is_content_addressed(url):
+                yield (
+                    update(StoredFile)
+                    .where(StoredFile.path == url, StoredFile.unclaimed > 0)
+                    .values(unclaimed=StoredFile.unclaimed - 1)
+                    .execution_options(synchronize_session=False)
+                )
+
+    @staticmethod
+    def claim(db: Session, photo_urls: Iterable[str]) -> None:
+        """
+        在记录的事务中确认照片（不提交，创建记录失败回滚时一并撤销）
+
+        同一次上传只能被一条记录确认一次，并发确认时只有一方匹配
+
+        Args:
+            db: 创建记录的数据库会话
+            photo_urls: 记录的照片路径（非内容寻址的路径跳过）
+
+        Raises:
+            ValueError: 照片已被确认、已过期被释放或不存在时（调用方回滚事务）
+        """
+        for statement in ContentStore._claim_statements(photo_urls):
+            if db.execute(statement).rowcount != 1:
+                raise ValueError(UNCLAIMED_PHOTO_MISSING)
+
+    @staticmethod
+    async def claim_async(db: AsyncSession, photo_urls: Iterable[str]) -> None:
+        """在记录的事务中确认照片（异步会话，见 claim）"""
+        for statement in ContentStore._claim_statements(photo_urls):
+            if (await db.execute(statement)).rowcount != 1:
+                raise ValueError(UNCLAIMED_PHOTO_MISSING)
+
+    @staticmethod
+    def release(db: Session, relative_path: str, unclaimed: bool = False) -> bool:
+        """
+        释放一次引用，计数归零时删除文件
+
+        计数减一、删除记录和文件在同一事务中完成，期间该行保持锁定：
+        并发的 ingest 要么先完成计数（本次不会归零），要么等本事务结束后重新建立记录和文件
+
+        Args:
+            db: 数据库会话（只用于取得数据库连接）
+            relative_path: 存储路径
+            unclaimed: 释放的是尚未被记录确认的上传（已过期被清理任务释放时不再重复释放）
+
+        Returns:
+            文件是否被删除
+        """
+        sha256 = ContentStore.sha256_of(relative_path)
+        if sha256 is None:
+            return False
+
+        with ContentStore._session(db) as session:
+            adjusted = ContentStore._adjust(session, sha256, -1, unclaimed=-int(unclaimed))
+            if adjusted is None:
+                return False
+
+            ref_count, path = adjusted
+            if ref_count > 0:
+                session.commit()
+                return False
+
+            session.execute(delete(StoredFile).where(StoredFile.sha256 == sha256))
+            (settings.UPLOAD_DIR / path).unlink(missing_ok=True)
+            session.commit()
+            return True
+
+    @staticmethod
+    def expire_unclaimed(db: Session, before: datetime, dry_run: bool = False) -> list[tuple[str, int]]:
+        """
+        释放 before 之前上传、至今仍未确认的引用，计数归零的记录和文件一并删除
+
+        与 release 相同，计数调整、删除记录和文件在同一事务中完成
+
+        Args:
+            db: 数据库会话（只用于取得数据库连接）
+            before: 最近一次未确认上传早于此时间的才释放
+            dry_run: 只统计不修改
+
+        Returns:
+            被删除（dry_run 时为将被删除）的文件 [(存储路径, 字节数)]
+        """
+        expired = (StoredFile.unclaimed > 0, StoredFile.unclaimed_at < before)
+        remaining = StoredFile.ref_count - StoredFile.unclaimed
+
+        with ContentStore._session(db) as session:
+            if dry_run:
+                return [tuple(row) for row in session.execute(
+                    select(StoredFile.path, StoredFile.size).where(*expired, remaining <= 0)
+                )]
+
+            statement = update(StoredFile).values(ref_count=remaining, unclaimed=0, unclaimed_at=None)
+            if session.get_bind().dialect.update_returning:
+                rows = session.execute(
+                    statement.where(*expired).returning(StoredFile.ref_count, StoredFile.path, StoredFile.size)
+                ).all()
+            else:
+                # 不支持 UPDATE ... RETURNING 的数据库：先锁定再更新
+                rows = session.execute(
+                    select(remaining, StoredFile.path, StoredFile.size, StoredFile.sha256)
+                    .where(*expired).with_for_update()
+                ).all()
+                if rows:
+                    session.execute(statement.where(StoredFile.sha256.in_([row.sha256 for row in rows])))
+
+            freed = [(path, size) for ref_count, path, size, *_ in rows if ref_count <= 0]
+            if freed:
+                session.execute(delete(StoredFile).where(
+                    StoredFile.path.in_([path for path, _ in freed]), StoredFile.ref_count <= 0
+                ))
+                for path, _ in freed:
+                    (settings.UPLOAD_DIR / path).unlink(missing_ok=True)
+            session.commit()
+            return freed
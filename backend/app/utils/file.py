@@ -3,16 +3,23 @@
 
 处理文件上传、验证和存储
 """
+import hashlib
 import os
 import uuid
-from pathlib import Path
-from typing import Any
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO
 
 from fastapi import UploadFile, HTTPException, status
 from PIL import Image
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.utils.content_store import ContentStore
+
+# 临时上传目录（相对于 uploads 目录），预览确认前的照片存放于此
+TEMP_DIR = "temp"
 
 
 class FileUploadException(Exception):
@@ -20,11 +27,20 @@ class FileUploadException(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class SavedUpload:
+    """已保存的上传文件"""
+    relative_path: str  # 相对于 uploads 目录的路径
+    sha256: str         # 文件内容的 sha256（十六进制）
+    size: int           # 文件字节数
+
+
 class FileUploadService:
     """文件上传服务类"""
 
     ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
     MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE * 1024 * 1024  # 转换为字节
+    CHUNK_SIZE = settings.UPLOAD_CHUNK_SIZE  # 每次读取的字节数
 
     @staticmethod
     def validate_file(file: UploadFile) -> None:
@@ -54,7 +70,8 @@ class FileUploadService:
     @staticmethod
     async def validate_and_save_upload(
         file: UploadFile,
-        subdirectory: str = "borrow"
+        subdirectory: str = "borrow",
+        db: Session | None = None
     ) -> str:
         """
         验证并保存上传的文件
@@ -62,10 +79,40 @@ class FileUploadService:
         Args:
             file: 上传的文件对象
             subdirectory: 子目录名称（borrow/return/annotations）
+            db: 数据库会话（启用内容寻址存储时用于维护引用计数）
 
         Returns:
             保存后的文件路径（相对于 uploads 目录）
 
+        Raises:
+            HTTPException: 文件验证或保存失败时
+        """
+        saved = await FileUploadService.save_upload(file, subdirectory, db)
+        return saved.relative_path
+
+    @staticmethod
+    async def save_upload(
+        file: UploadFile,
+        subdirectory: str = "borrow",
+        db: Session | None = None
+    ) -> SavedUpload:
+        """
+        流式保存上传的文件
+
+        按 CHUNK_SIZE 分块读取，边读边计算 sha256 并检查大小，超过限制立即中止；
+        磁盘写入和图片校验在线程池中执行，不阻塞事件循环。
+        先写入 .part 临时文件，校验通过后原子重命名，避免出现不完整的文件。
+        启用 UPLOAD_CONTENT_ADDRESSED 且传入 db 时，文件按 sha256 存入 uploads/cas/
+        并去重，subdirectory 不再生效
+
+        Args:
+            file: 上传的文件对象
+            subdirectory: 子目录名称（borrow/return/temp）
+            db: 数据库会话（内容寻址存储需要）
+
+        Returns:
+            保存结果（相对路径、sha256、字节数）
+
         Raises:
             HTTPException: 文件验证或保存失败时
         """
@@ -80,61 +127,323 @@ class FileUploadService:
         ext = Path(file.filename).suffix
         unique_filename = f"{uuid.uuid4()}{ext}"
         file_path = target_dir / unique_filename
+        part_path = file_path.with_name(f"{unique_filename}.part")
+
+        digest = hashlib.sha256()
+        size = 0
 
-        # 保存文件
         try:
-            contents = await file.read()
-
-            # 检查文件大小
-            if len(contents) > FileUploadService.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"文件过大。最大允许 {settings.MAX_UPLOAD_SIZE}MB"
-                )
-
-            # 写入文件
-            with open(file_path, "wb") as f:
-                f.write(contents)
-
-            # 验证是否为有效图片（如果是图片文件）
-            if ext in {".jpg", ".jpeg", ".png", ".gif", ".webp"}:
-                try:
-                    with Image.open(file_path) as img:
-                        img.verify()
-                except Exception as e:
-                    # 删除无效文件
-                    os.remove(file_path)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"无效的图片文件: {str(e)}"
-                    )
+            f = await run_in_threadpool(open, part_path, "wb")
+            try:
+                while chunk := await file.read(FileUploadService.CHUNK_SIZE):
+                    size += len(chunk)
+
+                    # 检查文件大小（超限立即中止，不再读取剩余内容）
+                    if size > FileUploadService.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"文件过大。最大允许 {settings.MAX_UPLOAD_SIZE}MB"
+                        )
+
+                    await run_in_threadpool(FileUploadService._write_chunk, f, digest, chunk)
+            finally:
+                await run_in_threadpool(f.close)
+
+            sha256 = digest.hexdigest()
+            relative_path = await run_in_threadpool(
+                FileUploadService._store, part_path, file_path, subdirectory, sha256, size, db
+            )
 
             # 返回相对路径
-            relative_path = f"{subdirectory}/{unique_filename}"
-            return relative_path
+            return SavedUpload(relative_path=relative_path, sha256=sha256, size=size)
 
         except HTTPException:
+            FileUploadService._remove_quietly(part_path)
             raise
         except Exception as e:
             # 清理部分写入的文件
-            if file_path.exists():
-                os.remove(file_path)
+            FileUploadService._remove_quietly(part_path)
+            FileUploadService._remove_quietly(file_path)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"文件保存失败: {str(e)}"
             )
 
     @staticmethod
-    def delete_file(file_path: str) -> bool:
+    async def save_photos(
+        files: list[UploadFile] | None,
+        temp_paths: list[str] | None,
+        subdirectory: str,
+        db: Session | None = None
+    ) -> list[tuple[str, str | None]]:
+        """
+        保存一组照片：新上传的文件和/或已上传到临时目录的照片
+
+        任一照片失败时撤销本组已保存的照片
+
+        Args:
+            files: 上传的文件对象列表
+            temp_paths: 已上传照片的路径列表（/upload 接口返回的 photo_path）
+            subdirectory: 目标子目录（borrow/return）
+            db: 数据库会话
+
+        Returns:
+            [(保存后的路径, 原临时路径或 None)]，临时照片在前
+
+        Raises:
+            HTTPException: 参数不合法、文件验证或保存失败时
+        """
+        files = files or []
+        temp_paths = temp_paths or []
+        if not files and not temp_paths:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="请上传照片或提供已上传的照片路径"
+            )
+        if len(files) + len(temp_paths) > settings.MAX_PHOTOS_PER_RECORD:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"照片过多。每条记录最多 {settings.MAX_PHOTOS_PER_RECORD} 张"
+            )
+        if len(set(temp_paths)) != len(temp_paths):
+            # 每次上传只能确认一次，同一路径重复出现会占用其他上传的引用
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="照片路径重复"
+            )
+
+        saved: list[tuple[str, str | None]] = []
+        try:
+            for temp_path in temp_paths:
+                path = await run_in_threadpool(FileUploadService.promote_temp_upload, temp_path, subdirectory, db)
+                saved.append((path, temp_path))
+            for file in files:
+                saved.append((await FileUploadService.validate_and_save_upload(file, subdirectory, db), None))
+        except HTTPException:
+            await run_in_threadpool(FileUploadService.discard_photos, saved, db)
+            raise
+
+        return saved
+
+    @staticmethod
+    def discard_photos(saved: list[tuple[str, str | None]], db: Session | None = None) -> None:
+        """
+        撤销 save_photos（创建记录失败时）：临时照片放回临时目录，新上传的照片删除
+
+        Args:
+            saved: save_photos 的返回值
+            db: 数据库会话
+        """
+        for path, temp_path in saved:
+            if temp_path is not None:
+                FileUploadService.restore_temp_upload(path, temp_path)
+            else:
+                # 记录未创建，新上传照片的引用仍未确认
+                FileUploadService.delete_file(path, db, unclaimed=True)
+
+    @staticmethod
+    def promote_temp_upload(temp_path: str, subdirectory: str, db: Session | None = None) -> str:
+        """
+        将临时目录中的照片移动到正式目录
+
+        同一文件系统内 os.replace 只是重命名，不复制文件内容；
+        内容寻址存储中的照片已在最终位置，上传时持有的未确认引用在创建记录时转交给记录
+
+        Args:
+            temp_path: 临时照片路径（temp/xxx.jpg 或 cas/...）
+            subdirectory: 目标子目录（borrow/return）
+            db: 数据库会话
+
+        Returns:
+            移动后的文件路径（相对于 uploads 目录）
+
+        Raises:
+            HTTPException: 路径不合法或文件不存在（已过期被清理）时
+        """
+        not_found = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="临时照片不存在或已过期，请重新上传"
+        )
+
+        if ContentStore.is_content_addressed(temp_path):
+            # 照片已在最终位置，创建记录时在同一事务中确认（ContentStore.claim），这里只做预检查
+            if db is None or not ContentStore.contains(db, temp_path):
+                raise not_found
+            return temp_path
+
+        parts = PurePosixPath(temp_path).parts
+        if (
+            len(parts) != 2
+            or parts[0] != TEMP_DIR
+            or parts[1].startswith(".")
+            or Path(parts[1]).suffix.lower() not in FileUploadService.ALLOWED_EXTENSIONS
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的临时照片路径"
+            )
+
+        filename = parts[1]
+        target_dir = settings.UPLOAD_DIR / subdirectory
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / filename
+
+        try:
+            os.replace(settings.UPLOAD_DIR / TEMP_DIR / filename, target)
+        except FileNotFoundError:
+            raise not_found
+
+        # 刷新修改时间，避免在记录提交前被清理任务当作孤立文件
+        os.utime(target)
+        return f"{subdirectory}/{filename}"
+
+    @staticmethod
+    def restore_temp_upload(promoted_path: str, temp_path: str) -> None:
+        """
+        撤销 promote_temp_upload（创建记录失败时），照片放回临时目录以便重试
+
+        内容寻址存储中的照片没有移动，确认随记录的事务回滚，无需处理
+
+        Args:
+            promoted_path: promote_temp_upload 返回的路径
+            temp_path: 原临时照片路径
+        """
+        if ContentStore.is_content_addressed(promoted_path):
+            return
+
+        try:
+            os.replace(settings.UPLOAD_DIR / promoted_path, settings.UPLOAD_DIR / temp_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def store_local_file(
+        source: Path,
+        filename: str,
+        subdirectory: str = TEMP_DIR,
+        db: Session | None = None,
+        max_size: int | None = None
+    ) -> SavedUpload:
+        """
+        校验并保存已写入磁盘的文件（如断点续传拼接完成的文件）
+
+        与 save_upload 使用相同的校验和存储规则，成功后 source 被移走；
+        在线程池中调用
+
+        Args:
+            source: 已写入磁盘的文件
+            filename: 原始文件名（用于校验扩展名）
+            subdirectory: 子目录名称
+            db: 数据库会话（内容寻址存储需要）
+            max_size: 文件大小上限（字节），默认 MAX_FILE_SIZE
+
+        Returns:
+            保存结果（相对路径、sha256、字节数）
+
+        Raises:
+            HTTPException: 文件验证失败时
+        """
+        ext = Path(filename).suffix
+        if ext.lower() not in FileUploadService.ALLOWED_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"不支持的文件类型。允许的类型: {', '.join(FileUploadService.ALLOWED_EXTENSIONS)}"
+            )
+
+        size = source.stat().st_size
+        if size > (max_size or FileUploadService.MAX_FILE_SIZE):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="文件过大"
+            )
+
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            while chunk := f.read(FileUploadService.CHUNK_SIZE):
+                digest.update(chunk)
+
+        target_dir = settings.UPLOAD_DIR / subdirectory
+        target_dir.mkdir(parents=True, exist_ok=True)
+        file_path = target_dir / f"{uuid.uuid4()}{ext}"
+
+        sha256 = digest.hexdigest()
+        relative_path = FileUploadService._store(source, file_path, subdirectory, sha256, size, db)
+        return SavedUpload(relative_path=relative_path, sha256=sha256, size=size)
+
+    @staticmethod
+    def _store(
+        source: Path,
+        file_path: Path,
+        subdirectory: str,
+        sha256: str,
+        size: int,
+        db: Session | None
+    ) -> str:
+        """验证图片并移动到最终位置，返回相对路径（在线程池中执行）"""
+        FileUploadService.verify_image(source)
+
+        if settings.UPLOAD_CONTENT_ADDRESSED and db is not None:
+            # 引用记为未确认，创建记录时确认，过期未确认时由清理任务释放
+            return ContentStore.ingest(db, source, sha256, size, file_path.suffix)
+
+        os.replace(source, file_path)
+        return f"{subdirectory}/{file_path.name}"
+
+    @staticmethod
+    def _write_chunk(f: BinaryIO, digest: Any, chunk: bytes) -> None:
+        """写入一个分块并更新哈希（在线程池中执行）"""
+        digest.update(chunk)
+        f.write(chunk)
+
+    @staticmethod
+    def verify_image(file_path: Path) -> None:
+        """
+        验证文件是否为有效图片
+
+        Args:
+            file_path: 文件绝对路径
+
+        Raises:
+            HTTPException: 不是有效图片时
+        """
+        try:
+            with Image.open(file_path) as img:
+                img.verify()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"无效的图片文件: {str(e)}"
+            )
+
+    @staticmethod
+    def _remove_quietly(file_path: Path) -> None:
+        """删除文件，忽略不存在等错误"""
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def delete_file(file_path: str, db: Session | None = None, unclaimed: bool = False) -> bool:
         """
         删除文件
 
+        内容寻址存储中的文件可能被多条记录共享，只释放一次引用，
+        引用计数归零时才真正删除（需要传入 db）
+
         Args:
             file_path: 文件路径（相对于 uploads 目录）
+            db: 数据库会话
+            unclaimed: 是否为尚未确认的临时上传
 
         Returns:
             是否删除成功
         """
+        if ContentStore.is_content_addressed(file_path):
+            if db is None:
+                return False
+            return ContentStore.release(db, file_path, unclaimed=unclaimed)
+
         try:
             full_path = settings.UPLOAD_DIR / file_path
             if full_path.exists() and full_path.is_file():
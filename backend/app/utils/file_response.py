@@ -0,0 +1,54 @@
+"""
+上传文件响应
+
+按 UPLOAD_SERVE_MODE 决定文件由谁发送：
+- static：应用直接读取文件并返回（FileResponse）
+- x-accel：应用只校验请求并返回 X-Accel-Redirect 头，由 nginx 以 sendfile 发送文件，
+  Python 进程不再读取和传输图片内容
+"""
+import mimetypes
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Response, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+
+# 上传文件名唯一（uuid 或内容 sha256），内容不会变化，可以长期缓存；
+# 访问需要登录，只允许浏览器缓存，不允许共享缓存（代理、CDN）保存
+UPLOAD_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def use_x_accel() -> bool:
+    """是否由 nginx 发送上传文件"""
+    return settings.UPLOAD_SERVE_MODE == "x-accel"
+
+
+def upload_file_response(
+    file_path: Path,
+    media_type: str | None = None,
+    headers: dict[str, str] | None = None
+) -> Response:
+    """
+    返回 uploads 目录中的文件
+
+    Args:
+        file_path: 文件绝对路径（必须位于 uploads 目录中，由调用方校验）
+        media_type: MIME 类型，默认按扩展名推断
+        headers: 额外的响应头（缓存控制、ETag 等）
+
+    Returns:
+        FileResponse 或带 X-Accel-Redirect 头的空响应
+    """
+    media_type = media_type or mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    headers = dict(headers or {})
+
+    if not use_x_accel():
+        return FileResponse(file_path, media_type=media_type, headers=headers)
+
+    relative_path = file_path.resolve().relative_to(settings.UPLOAD_DIR.resolve()).as_posix()
+    prefix = settings.UPLOAD_ACCEL_PREFIX.rstrip("/")
+    headers["X-Accel-Redirect"] = f"{prefix}/{quote(relative_path)}"
+    # nginx 重定向后保留 Content-Type 和 Cache-Control，ETag/Last-Modified/Range 由 nginx 处理
+    return Response(status_code=status.HTTP_200_OK, media_type=media_type, headers=headers)
@@ -0,0 +1,284 @@
+"""
+图片缩略图缓存
+
+按需生成缩放后的图片（宽度、格式、质量），生成一次后保存在磁盘缓存中，
+缓存总大小超过上限时按最近最少使用（LRU）淘汰。
+宽度和质量对齐到固定档位，无损格式不区分质量，避免相近的参数各自生成一份缓存
+"""
+import hashlib
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.utils.content_store import ContentStore
+
+# 输出格式：格式名 -> (PIL 格式, MIME 类型, 扩展名)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "png": ("PNG", "image/png", ".png"),
+}
+
+# 有损格式（质量参数生效）
+LOSSY_FORMATS = {"webp", "jpeg"}
+
+# EXIF 方向标签
+ORIENTATION_TAG = 0x0112
+
+# 淘汰时清理到上限的比例，避免每次写入都触发扫描
+EVICTION_TARGET_RATIO = 0.9
+
+
+@dataclass(frozen=True)
+class Derivative:
+    """缩略图（对齐后的参数和缓存位置，文件不一定已生成）"""
+    source: Path          # 原图绝对路径
+    cache_path: Path      # 缓存文件路径
+    etag: str             # ETag（不含引号）
+    media_type: str       # MIME 类型
+    width: int            # 对齐后的宽度
+    pil_format: str       # PIL 格式
+    quality: int | None   # 对齐后的质量（无损格式为 None）
+
+
+class ImageDerivativeCache:
+    """缩略图磁盘缓存"""
+
+    _lock = threading.Lock()
+    _total_size: int | None = None  # 缓存总字节数（首次写入时扫描得到，之后增量维护）
+
+    @staticmethod
+    def resolve_source(relative_path: str) -> Path:
+        """
+        解析原图路径，禁止访问 uploads 目录之外的文件
+
+        Args:
+            relative_path: 相对于 uploads 目录的路径
+
+        Returns:
+            原图绝对路径
+
+        Raises:
+            FileNotFoundError: 文件不存在或路径非法时
+        """
+        upload_dir = settings.UPLOAD_DIR.resolve()
+        source = (upload_dir / relative_path).resolve()
+        cache_dir = settings.IMAGE_CACHE_DIR.resolve()
+
+        if upload_dir not in source.parents or cache_dir == source or cache_dir in source.parents:
+            raise FileNotFoundError(relative_path)
+        if not source.is_file():
+            raise FileNotFoundError(relative_path)
+        return source
+
+    @staticmethod
+    def snap_width(width: int) -> int:
+        """将请求宽度对齐到允许的宽度档位（向上取最近的一档）"""
+        widths = sorted(settings.IMAGE_DERIVATIVE_WIDTHS)
+        for allowed in widths:
+            if allowed >= width:
+                return allowed
+        return widths[-1]
+
+    @staticmethod
+    def snap_quality(fmt: str, quality: int) -> int | None:
+        """将请求质量对齐到最近的档位（距离相同时取较高的一档），无损格式返回 None（质量不影响输出）"""
+        if fmt not in LOSSY_FORMATS:
+            return None
+        qualities = sorted(settings.IMAGE_DERIVATIVE_QUALITIES, reverse=True)
+        return min(qualities, key=lambda allowed: abs(allowed - quality))
+
+    @staticmethod
+    def etag_for(relative_path: str, source: Path, width: int, fmt: str, quality: int | None) -> str:
+        """
+        计算缩略图的强 ETag
+
+        内容寻址的原图直接使用其 sha256，其他原图使用大小和修改时间
+
+        Args:
+            relative_path: 原图相对路径
+            source: 原图绝对路径
+            width: 宽度
+            fmt: 输出格式
+            quality: 输出质量（无损格式为 None，不计入）
+
+        Returns:
+            ETag（不含引号）
+        """
+        identity = ContentStore.sha256_of(relative_path)
+        if identity is None:
+            stat = source.stat()
+            identity = f"{relative_path}:{stat.st_size}:{stat.st_mtime_ns}"
+        key = f"{identity}:{width}:{fmt}" if quality is None else f"{identity}:{width}:{fmt}:{quality}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def lookup(relative_path: str, width: int, fmt: str, quality: int) -> Derivative:
+        """
+        对齐参数并计算缩略图的 ETag 和缓存位置（不解码图片，可用于先判断 304）
+
+        Args:
+            relative_path: 原图相对路径
+            width: 请求宽度（对齐到允许的档位）
+            fmt: 输出格式（webp/jpeg/png）
+            quality: 请求质量（1-95，对齐到允许的档位，无损格式忽略）
+
+        Returns:
+            缩略图信息
+
+        Raises:
+            FileNotFoundError: 原图不存在时
+        """
+        pil_format, media_type, ext = DERIVATIVE_FORMATS[fmt]
+        width = ImageDerivativeCache.snap_width(width)
+        quality = ImageDerivativeCache.snap_quality(fmt, quality)
+        source = ImageDerivativeCache.resolve_source(relative_path)
+        etag = ImageDerivativeCache.etag_for(relative_path, source, width, fmt, quality)
+        cache_path = settings.IMAGE_CACHE_DIR / etag[:2] / f"{etag}{ext}"
+        return Derivative(source, cache_path, etag, media_type, width, pil_format, quality)
+
+    @staticmethod
+    def ensure(derivative: Derivative) -> Path:
+        """
+        返回缩略图缓存文件，不存在时生成
+
+        Args:
+            derivative: lookup 的返回值
+
+        Returns:
+            缓存文件路径
+        """
+        cache_path = derivative.cache_path
+        try:
+            # 命中：更新修改时间，作为 LRU 的访问时间
+            os.utime(cache_path)
+            return cache_path
+        except FileNotFoundError:
+            pass
+
+        ext = cache_path.suffix
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{uuid.uuid4().hex}{ext}")
+        try:
+            ImageDerivativeCache._render(
+                derivative.source, tmp_path, derivative.width, derivative.pil_format, derivative.quality
+            )
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        ImageDerivativeCache._account(size, keep=cache_path)
+        return cache_path
+
+    @staticmethod
+    def get_or_create(relative_path: str, width: int, fmt: str, quality: int) -> tuple[Path, str, str]:
+        """
+        获取缩略图，不存在时生成
+
+        Args:
+            relative_path: 原图相对路径
+            width: 请求宽度（会对齐到允许的档位）
+            fmt: 输出格式（webp/jpeg/png）
+            quality: 输出质量（1-95，会对齐到允许的档位）
+
+        Returns:
+            (缓存文件路径, ETag, MIME 类型)
+
+        Raises:
+            FileNotFoundError: 原图不存在时
+        """
+        derivative = ImageDerivativeCache.lookup(relative_path, width, fmt, quality)
+        return ImageDerivativeCache.ensure(derivative), derivative.etag, derivative.media_type
+
+    @staticmethod
+    def _render(source: Path, target: Path, width: int, pil_format: str, quality: int | None) -> None:
+        """生成缩略图（JPEG 使用 draft 模式直接按缩小比例解码）"""
+        with Image.open(source) as img:
+            # EXIF 方向为 5-8 时图片需要旋转 90°，解码尺寸按旋转后的宽度计算
+            rotated = img.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8)
+            display_width, display_height = (img.height, img.width) if rotated else img.size
+            if display_width > width:
+                height = max(1, round(display_height * width / display_width))
+                img.draft("RGB", (height, width) if rotated else (width, height))
+            img = ImageOps.exif_transpose(img)
+
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+            if pil_format == "JPEG" and img.mode != "RGB":
+                img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+            options = {"quality": quality} if pil_format in ("JPEG", "WEBP") else {"optimize": True}
+            img.save(target, format=pil_format, **options)
+
+    @staticmethod
+    def _account(added: int, keep: Path) -> None:
+        """记录新增的缓存大小，超过上限时淘汰（保留刚生成的 keep）"""
+        limit = settings.IMAGE_CACHE_MAX_SIZE * 1024 * 1024
+        with ImageDerivativeCache._lock:
+            if ImageDerivativeCache._total_size is None:
+                ImageDerivativeCache._total_size = sum(size for _, _, size in ImageDerivativeCache._scan())
+            else:
+                ImageDerivativeCache._total_size += added
+
+            if ImageDerivativeCache._total_size > limit:
+                ImageDerivativeCache._total_size = ImageDerivativeCache._evict(
+                    int(limit * EVICTION_TARGET_RATIO), keep
+                )
+
+    @staticmethod
+    def _scan() -> list[tuple[float, str, int]]:
+        """扫描缓存目录，返回 (修改时间, 路径, 大小) 列表"""
+        entries = []
+        try:
+            shards = list(os.scandir(settings.IMAGE_CACHE_DIR))
+        except FileNotFoundError:
+            return entries
+
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    @staticmethod
+    def _evict(target_size: int, keep: Path) -> int:
+        """
+        按最近最少使用淘汰，直到总大小不超过 target_size
+
+        Args:
+            target_size: 目标总字节数
+            keep: 不淘汰的文件（正在返回给客户端）
+
+        Returns:
+            淘汰后的总字节数
+        """
+        entries = sorted(ImageDerivativeCache._scan())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= target_size:
+                break
+            if path == str(keep):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
@@ -0,0 +1,218 @@
+"""
+游标分页（keyset pagination）
+
+按 (排序键, id) 定位下一页的起点：WHERE (排序键, id) < (上一页最后一行) ORDER BY 排序键, id LIMIT n，
+配合同序的复合索引，任意深度的页都只需读取 n 行，不像 OFFSET 那样扫描并丢弃前面所有记录。
+
+游标是上一页最后一行排序键的 base64 编码，对客户端不透明。
+总数与本页数据在同一条 SQL 中计算，也可以取近似值或不计算（见 keyset_paginate）
+"""
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+from app.core.config import settings
+
+# 列表总数的计算方式
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATE = "estimate"
+TOTAL_NONE = "none"
+TOTAL_MODE_PATTERN = f"^({TOTAL_EXACT}|{TOTAL_ESTIMATE}|{TOTAL_NONE})$"
+
+# 近似总数缓存：{(SQL, 参数): (过期时间, 总数)}
+TOTAL_CACHE_MAX_ENTRIES = 256
+_total_cache: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+_total_cache_lock = threading.Lock()
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    将排序键编码为游标
+
+    Args:
+        values: 排序键的值（与排序列一一对应）
+
+    Returns:
+        URL 安全的游标字符串
+    """
+    data = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list[InstrumentedAttribute]) -> list[Any]:
+    """
+    解析游标，按列类型还原排序键
+
+    Args:
+        cursor: 游标字符串
+        columns: 排序列
+
+    Returns:
+        排序键的值
+
+    Raises:
+        HTTPException: 游标无效时
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if not isinstance(data, list) or len(data) != len(columns):
+            raise ValueError("cursor length mismatch")
+
+        values = []
+        for column, value in zip(columns, data):
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError("cursor type mismatch")
+            values.append(value)
+        return values
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+def _count_statement(query: Query) -> Select:
+    """筛选后记录总数的查询"""
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+def _explain_statement(statement: Select, dialect) -> tuple[str, Any]:
+    """
+    生成 EXPLAIN 语句及参数
+
+    筛选值作为绑定参数传给驱动（exec_driver_sql 不再解析 :name），
+    不内联到 SQL 中，用户输入中的引号、冒号不会影响语句
+
+    Args:
+        statement: 计数语句
+        dialect: 数据库方言
+
+    Returns:
+        (驱动参数风格的 SQL, 参数)
+    """
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+def _estimate_total(db: Session, query: Query) -> int:
+    """
+    估算筛选后的记录总数，结果缓存 LIST_TOTAL_CACHE_SECONDS 秒
+
+    PostgreSQL 使用执行计划的行数估计（不扫描数据），其他数据库执行一次精确计数；
+    缓存期内同样的筛选条件不再访问数据库
+    """
+    statement = _count_statement(query)
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+
+    now = time.monotonic()
+    with _total_cache_lock:
+        cached = _total_cache.get(key)
+        if cached and cached[0] > now:
+            _total_cache.move_to_end(key)
+            return cached[1]
+
+    if db.get_bind().dialect.name == "postgresql":
+        explain_sql, params = _explain_statement(statement, db.get_bind().dialect)
+        plan = db.connection().exec_driver_sql(explain_sql, params).scalar()
+        # count(*) 节点之下的扫描/连接节点带有筛选后的行数估计
+        node = plan[0]["Plan"]
+        while node.get("Plans") and node["Node Type"] in ("Aggregate", "Subquery Scan"):
+            node = node["Plans"][0]
+        total = int(node["Plan Rows"])
+    else:
+        total = db.execute(statement).scalar_one()
+
+    with _total_cache_lock:
+        _total_cache[key] = (now + settings.LIST_TOTAL_CACHE_SECONDS, total)
+        _total_cache.move_to_end(key)
+        while len(_total_cache) > TOTAL_CACHE_MAX_ENTRIES:
+            _total_cache.popitem(last=False)
+    return total
+
+
+def keyset_paginate(
+    query: Query,
+    columns: list[InstrumentedAttribute],
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = True,
+    offset: int = 0,
+    total_mode: str = TOTAL_EXACT,
+) -> tuple[list[Any], int | None, str | None]:
+    """
+    按游标获取一页记录及总数
+
+    总数的计算方式（total_mode）：
+    - exact: 精确总数，与本页数据在同一条 SQL 中计算（第一页用 count(*) OVER ()，
+      带游标时用标量子查询），只需一次数据库往返
+    - estimate: 近似总数（短时缓存 / PostgreSQL 行数估计），适合频繁轮询的列表
+    - none: 不计算总数，返回 None
+
+    Args:
+        query: 已加好筛选条件、未排序的查询
+        columns: 排序列，最后一列必须唯一（通常为主键 id）
+        limit: 每页记录数
+        cursor: 上一页返回的 next_cursor，None 表示第一页
+        descending: 是否倒序
+        offset: 跳过记录数（兼容旧的 skip 分页，与游标同时使用时从游标位置起跳过）
+        total_mode: 总数计算方式
+
+    Returns:
+        (本页记录, 总数, 下一页游标)，没有下一页时游标为 None
+    """
+    filtered = query
+    if cursor:
+        key = tuple_(*columns)
+        last = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < last if descending else key > last)
+
+    if total_mode == TOTAL_EXACT:
+        if cursor:
+            # 窗口函数只能统计游标之后的记录，总数改用同一语句中的标量子查询
+            total_column = _count_statement(filtered).scalar_subquery()
+        else:
+            total_column = func.count().over()
+        query = query.add_columns(total_column.label("_total"))
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    query = query.order_by(*order_by)
+    if offset:
+        query = query.offset(offset)
+    # 多取一行判断是否还有下一页
+    rows = query.limit(limit + 1).all()
+
+    total = None
+    if total_mode == TOTAL_EXACT:
+        if rows:
+            total = rows[0][-1]
+            items = [row[0] for row in rows]
+        else:
+            # 空页没有携带总数的行；超出末尾的页较少见，单独计数
+            items = []
+            total = filtered.session.execute(_count_statement(filtered)).scalar_one() if (cursor or offset) else 0
+    else:
+        items = rows
+        if total_mode == TOTAL_ESTIMATE:
+            total = _estimate_total(filtered.session, filtered)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+    return items, total, next_cursor
@@ -0,0 +1,263 @@
+"""
+断点续传上传
+
+类似 tus 协议：创建上传会话 -> 按偏移量 PATCH 分片 -> 查询偏移量（断线后续传）-> 完成。
+未完成的上传保存在 uploads/resumable/ 中（<id>.part 数据 + <id>.json 元信息），
+完成时交给 FileUploadService 按普通上传的规则校验和存储
+"""
+import json
+import os
+import re
+import threading
+import uuid
+import weakref
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils.file import TEMP_DIR, FileUploadService, SavedUpload
+
+# 未完成上传的存放目录（相对于 uploads 目录）
+RESUMABLE_DIR = "resumable"
+
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """按位置写入完整数据（Windows 没有 os.pwrite 时退化为 lseek + write）"""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+class ResumableUploadService:
+    """断点续传上传服务类"""
+
+    # 每个上传会话一把锁，防止同一会话的分片并发写入
+    _locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+    _locks_guard = threading.Lock()
+
+    @staticmethod
+    def _paths(upload_id: str) -> tuple[Path, Path]:
+        """返回 (数据文件, 元信息文件) 路径"""
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="上传会话不存在")
+        directory = settings.UPLOAD_DIR / RESUMABLE_DIR
+        return directory / f"{upload_id}.part", directory / f"{upload_id}.json"
+
+    @staticmethod
+    def _lock_for(upload_id: str) -> threading.Lock:
+        with ResumableUploadService._locks_guard:
+            lock = ResumableUploadService._locks.get(upload_id)
+            if lock is None:
+                lock = threading.Lock()
+                ResumableUploadService._locks[upload_id] = lock
+            return lock
+
+    @staticmethod
+    def create(filename: str, size: int, owner_id: int) -> dict:
+        """
+        创建上传会话
+
+        Args:
+            filename: 原始文件名
+            size: 文件总字节数
+            owner_id: 创建者用户 ID
+
+        Returns:
+            上传状态（upload_id, filename, size, offset）
+
+        Raises:
+            HTTPException: 文件类型不支持或超过大小上限时
+        """
+        if Path(filename).suffix.lower() not in FileUploadService.ALLOWED_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"不支持的文件类型。允许的类型: {', '.join(FileUploadService.ALLOWED_EXTENSIONS)}"
+            )
+        if size > settings.MAX_RESUMABLE_UPLOAD_SIZE * 1024 * 1024:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"文件过大。最大允许 {settings.MAX_RESUMABLE_UPLOAD_SIZE}MB"
+            )
+
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = ResumableUploadService._paths(upload_id)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = {"filename": filename, "size": size, "owner_id": owner_id}
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        part_path.touch()
+
+        return {"upload_id": upload_id, "filename": filename, "size": size, "offset": 0}
+
+    @staticmethod
+    def status(upload_id: str, owner_id: int) -> dict:
+        """
+        查询上传状态
+
+        Args:
+            upload_id: 上传会话 ID
+            owner_id: 当前用户 ID
+
+        Returns:
+            上传状态（upload_id, filename, size, offset）
+
+        Raises:
+            HTTPException: 会话不存在或不属于当前用户时
+        """
+        part_path, meta_path = ResumableUploadService._paths(upload_id)
+        meta = ResumableUploadService._load_meta(meta_path, owner_id)
+        try:
+            offset = part_path.stat().st_size
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="上传会话不存在")
+
+        return {"upload_id": upload_id, "filename": meta["filename"], "size": meta["size"], "offset": offset}
+
+    @staticmethod
+    def _load_meta(meta_path: Path, owner_id: int) -> dict:
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="上传会话不存在")
+        if meta["owner_id"] != owner_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="上传会话不存在")
+        return meta
+
+    @staticmethod
+    async def append(upload_id: str, offset: int, chunks: AsyncIterator[bytes], owner_id: int) -> int:
+        """
+        在指定偏移量写入分片
+
+        offset 必须等于已接收的字节数，否则返回 409（客户端应先 HEAD 查询偏移量）。
+        数据边接收边写入，连接中断时已写入的部分保留，可从新的偏移量续传
+
+        Args:
+            upload_id: 上传会话 ID
+            offset: 分片起始位置（Upload-Offset）
+            chunks: 请求体数据流
+            owner_id: 当前用户 ID
+
+        Returns:
+            写入后的偏移量
+
+        Raises:
+            HTTPException: 会话不存在、偏移量不匹配或超出文件大小时
+        """
+        part_path, meta_path = ResumableUploadService._paths(upload_id)
+        meta = await run_in_threadpool(ResumableUploadService._load_meta, meta_path, owner_id)
+
+        lock = ResumableUploadService._lock_for(upload_id)
+        if not lock.acquire(blocking=False):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="该上传正在写入中")
+
+        try:
+            try:
+                fd = await run_in_threadpool(os.open, part_path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+            except FileNotFoundError:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="上传会话不存在")
+
+            try:
+                current = os.fstat(fd).st_size
+                if offset != current:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=f"偏移量不匹配，当前已接收 {current} 字节"
+                    )
+
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if offset + len(chunk) > meta["size"]:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="分片超出声明的文件大小"
+                        )
+                    await run_in_threadpool(_pwrite, fd, chunk, offset)
+                    offset += len(chunk)
+            finally:
+                os.close(fd)
+                # 有新分片时刷新元信息的修改时间，活跃的上传不会被清理任务当作过期
+                meta_path.touch()
+        finally:
+            lock.release()
+
+        return offset
+
+    @staticmethod
+    def complete(upload_id: str, owner_id: int, db: Session | None = None) -> SavedUpload:
+        """
+        完成上传：校验图片并存入临时目录（或内容寻址存储）
+
+        Args:
+            upload_id: 上传会话 ID
+            owner_id: 当前用户 ID
+            db: 数据库会话（内容寻址存储需要）
+
+        Returns:
+            保存结果，relative_path 可作为创建记录时的 photo_path
+
+        Raises:
+            HTTPException: 会话不存在、数据未传完或文件校验失败时
+        """
+        part_path, meta_path = ResumableUploadService._paths(upload_id)
+        meta = ResumableUploadService._load_meta(meta_path, owner_id)
+
+        lock = ResumableUploadService._lock_for(upload_id)
+        if not lock.acquire(blocking=False):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="该上传正在写入中")
+
+        try:
+            received = part_path.stat().st_size
+            if received != meta["size"]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"上传未完成，已接收 {received}/{meta['size']} 字节"
+                )
+
+            try:
+                saved = FileUploadService.store_local_file(
+                    part_path,
+                    meta["filename"],
+                    subdirectory=TEMP_DIR,
+                    db=db,
+                    max_size=settings.MAX_RESUMABLE_UPLOAD_SIZE * 1024 * 1024,
+                )
+            except HTTPException:
+                # 内容无效，重新上传也不会通过，直接丢弃
+                ResumableUploadService._discard(part_path, meta_path)
+                raise
+
+            meta_path.unlink(missing_ok=True)
+            return saved
+        finally:
+            lock.release()
+
+    @staticmethod
+    def abort(upload_id: str, owner_id: int) -> None:
+        """
+        取消上传并删除已接收的数据
+
+        Args:
+            upload_id: 上传会话 ID
+            owner_id: 当前用户 ID
+        """
+        part_path, meta_path = ResumableUploadService._paths(upload_id)
+        ResumableUploadService._load_meta(meta_path, owner_id)
+        ResumableUploadService._discard(part_path, meta_path)
+
+    @staticmethod
+    def _discard(part_path: Path, meta_path: Path) -> None:
+        part_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
@@ -0,0 +1,67 @@
+"""
+全文检索分词
+
+中文没有空格分词，PostgreSQL 的 simple 配置和 SQLite FTS5 的 unicode61 分词器
+都会把一整段汉字当作一个词。这里预先把汉字切成单字和二元组（bigram），
+用空格连接后存入 search_tokens 列，数据库只需按空格分词即可：
+
+    "王羲之 兰亭序" -> "王 羲 之 王羲 羲之 兰 亭 序 兰亭 亭序"
+
+查询时按同样规则切分：单字查询匹配单字，两个字以上只用二元组（相邻字全部命中），
+字母数字按整词匹配
+"""
+import re
+
+# 汉字（含扩展 A 区和兼容汉字）及字母数字词
+_TOKEN_PATTERN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+|[0-9a-z]+")
+_CJK_PATTERN = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+
+
+def _runs(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _bigrams(run: str) -> list[str]:
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def index_tokens(*fields: str | None) -> str:
+    """
+    生成用于建立索引的分词文本
+
+    Args:
+        *fields: 参与检索的字段值（None 忽略）
+
+    Returns:
+        空格分隔的词（去重，保持首次出现顺序）
+    """
+    tokens: dict[str, None] = {}
+    for field in fields:
+        if not field:
+            continue
+        for run in _runs(field):
+            if _CJK_PATTERN.match(run):
+                tokens.update(dict.fromkeys(run))
+                tokens.update(dict.fromkeys(_bigrams(run)))
+            else:
+                tokens[run] = None
+    return " ".join(tokens)
+
+
+def query_tokens(query: str) -> list[str]:
+    """
+    切分检索关键词
+
+    Args:
+        query: 用户输入的关键词
+
+    Returns:
+        必须全部命中的词列表（为空表示没有可检索的内容）
+    """
+    tokens: dict[str, None] = {}
+    for run in _runs(query):
+        if _CJK_PATTERN.match(run) and len(run) > 1:
+            tokens.update(dict.fromkeys(_bigrams(run)))
+        else:
+            tokens[run] = None
+    return list(tokens)